@@ -0,0 +1,55 @@
+"""Benchmark: informe diario sobre millones de decisiones por bloques
+
+Uso: python -m benchmarks.bench_analytics
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+
+from src.data.analytics import daily_report
+
+DISEASES = ['Infarto Agudo Miocardio', 'Asma Bronquial', 'Neumonia', 'Migrana',
+            'Gastroenteritis', 'Resfriado Comun']
+SYMPTOMS = [('dolor', 'dolor'), ('pecho', 'respiratorio'), ('tos', 'respiratorio'),
+            ('mareo', 'cardiovascular'), ('cabeza', 'neurologico'), ('nausea', 'digestivo')]
+
+
+def write_decisions(path: str, count: int, seed: int = 0):
+    """Escribe decisiones sintéticas en JSONL (formato de los registros de auditoría)."""
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as output:
+        for _ in range(count):
+            symptoms = [
+                {'symptom': name, 'category': category, 'severity': rng.choice(['leve', 'moderado', 'severo'])}
+                for name, category in rng.sample(SYMPTOMS, rng.randint(1, 4))
+            ]
+            record = {
+                'timestamp': 1.7e9 + rng.uniform(0, 30 * 86400),
+                'triage_level': rng.randint(1, 5),
+                'diseases': [{'disease': rng.choice(DISEASES), 'confidence': rng.random()}],
+                'symptoms': symptoms,
+                'rules_version': 'benchmark'
+            }
+            output.write(json.dumps(record) + '\n')
+
+
+def run_benchmark(count: int = 1000000, chunk_size: int = 100000):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'decisions.jsonl')
+        write_decisions(path, count)
+        
+        started = time.perf_counter()
+        report = daily_report(path, chunk_size=chunk_size)
+        seconds = time.perf_counter() - started
+        
+        print(f"Decisiones: {report['decision_count']:,} (bloques de {chunk_size:,})")
+        print(f"Tiempo total: {seconds:.2f} s ({count / seconds:,.0f} decisiones/s)")
+        print(f"Días: {len(report['level_distribution'])}, "
+              f"tasa media de nivel 1: {report['level_1_rate'].mean():.3f}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
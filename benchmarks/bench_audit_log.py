@@ -0,0 +1,53 @@
+"""Benchmark: registros de auditoría sostenidos por segundo
+
+Uso: python -m benchmarks.bench_audit_log
+"""
+
+import tempfile
+import time
+
+import numpy as np
+
+from src.data.audit_log import AuditLog, replay
+
+SAMPLE_RECORD = {
+    'input': 'dolor de pecho severo, dificultad para respirar, sudoración, nausea',
+    'symptoms': [
+        {'symptom': 'dolor', 'category': 'dolor', 'severity': 'severo', 'urgency_level': 3},
+        {'symptom': 'pecho', 'category': 'respiratorio', 'severity': 'severo', 'urgency_level': 3},
+        {'symptom': 'respirar', 'category': 'respiratorio', 'severity': 'severo', 'urgency_level': 3}
+    ],
+    'diseases': [{'disease': 'Infarto Agudo Miocardio', 'confidence': 0.61}],
+    'triage_level': 1,
+    'rules_version': 'benchmark'
+}
+
+
+def run_benchmark(records: int = 200000, fsync_interval: float = 0.05):
+    """Mide el coste de record() en el hilo llamante y el throughput hasta disco."""
+    with tempfile.TemporaryDirectory() as directory:
+        log = AuditLog(directory, fsync_interval=fsync_interval, max_segment_bytes=16 * 1024 * 1024)
+        call_ns = np.empty(records, dtype=np.int64)
+        
+        started = time.perf_counter()
+        for i in range(records):
+            call_started = time.perf_counter_ns()
+            log.record(dict(SAMPLE_RECORD, case=i))
+            call_ns[i] = time.perf_counter_ns() - call_started
+        log.close()
+        seconds = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        replayed = sum(1 for _ in replay(directory))
+        replay_seconds = time.perf_counter() - started
+        
+        print(f"Registros: {records:,} (fsync cada {fsync_interval * 1000:.0f} ms)")
+        print(f"Throughput sostenido: {records / seconds:,.0f} registros/s")
+        print(f"record() p50/p99: {np.percentile(call_ns, 50) / 1000:.1f} / "
+              f"{np.percentile(call_ns, 99) / 1000:.1f} µs")
+        print(f"fsync agrupados: {log.fsync_count}, segmentos: {len(log.segments())}")
+        print(f"Replay (mmap): {replayed / replay_seconds:,.0f} registros/s")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,50 @@
+"""Benchmark: extracción, triaje y predicción por lotes frente a texto a texto
+
+Uso: python -m benchmarks.bench_batch_extraction
+"""
+
+import time
+
+from src.chatbot.symptom_analyzer import SymptomAnalyzer
+from src.chatbot.disease_predictor import DiseasePredictor
+from src.chatbot.triage_classifier import TriageClassifier
+from src.data.synthetic import generate_complaints
+
+
+def run_benchmark(count: int = 20000):
+    """Compara throughput de ambos caminos (sin cachés) y cuenta las discrepancias."""
+    analyzer, predictor, classifier = SymptomAnalyzer(), DiseasePredictor(), TriageClassifier()
+    texts = generate_complaints(analyzer, classifier, count=count, seed=1)
+
+    started = time.perf_counter()
+    per_text = [analyzer.extract_symptoms(text) for text in texts]
+    extract_seconds = time.perf_counter() - started
+    single_levels = [classifier.classify_level(symptoms) for symptoms in per_text]
+    single_predictions = [predictor._predict([s['symptom'] for s in symptoms]) if symptoms else []
+                          for symptoms in per_text]
+    single_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    batch = analyzer.extract_symptoms_batch(texts)
+    batch_extract_seconds = time.perf_counter() - started
+    batch_levels = classifier.classify_levels(batch)
+    batch_predictions = predictor.predict_diseases_batch(batch)
+    batch_seconds = time.perf_counter() - started
+
+    mismatches = sum(1 for i in range(count) if (
+        batch.symptoms(i) != per_text[i] or batch_levels[i] != single_levels[i] or
+        batch_predictions[i] != single_predictions[i]
+    ))
+
+    print(f"Textos: {count}")
+    print(f"Extracción texto a texto: {count / extract_seconds:,.0f} textos/s")
+    print(f"Extracción por lotes:     {count / batch_extract_seconds:,.0f} textos/s "
+          f"({extract_seconds / batch_extract_seconds:.1f}x)")
+    print(f"Extracción + triaje + predicción texto a texto: {count / single_seconds:,.0f} textos/s")
+    print(f"Extracción + triaje + predicción por lotes:     {count / batch_seconds:,.0f} textos/s "
+          f"({single_seconds / batch_seconds:.1f}x)")
+    print(f"Discrepancias: {mismatches}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,36 @@
+"""Benchmark: classify_level frente a classify_triage en re-puntuación masiva
+
+Uso: python -m benchmarks.bench_classify_level
+"""
+
+import time
+
+from src.chatbot.symptom_analyzer import SymptomAnalyzer
+from src.chatbot.triage_classifier import TriageClassifier
+from src.data.synthetic import generate_symptom_sets
+
+
+def run_benchmark(count: int = 200000):
+    """Compara throughput y verifica que ambos caminos den el mismo nivel."""
+    classifier = TriageClassifier()
+    corpus = generate_symptom_sets(SymptomAnalyzer(), classifier, count=count, seed=1)
+    
+    started = time.perf_counter()
+    full_levels = [classifier.classify_triage(symptoms)['triage_level'] for symptoms in corpus]
+    full_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    fast_levels = classifier.classify_levels(corpus)
+    fast_seconds = time.perf_counter() - started
+    
+    mismatches = sum(1 for a, b in zip(full_levels, fast_levels) if a != b)
+    
+    print(f"Casos: {count}")
+    print(f"classify_triage: {count / full_seconds:,.0f} casos/s")
+    print(f"classify_levels: {count / fast_seconds:,.0f} casos/s")
+    print(f"Aceleración: {full_seconds / fast_seconds:.1f}x")
+    print(f"Discrepancias: {mismatches}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
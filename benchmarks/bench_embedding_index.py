@@ -0,0 +1,91 @@
+"""Benchmark: recuperación densa (LSA + top-k por bloques) frente a TF-IDF exacto
+
+Uso: python -m benchmarks.bench_embedding_index
+"""
+
+import random
+import time
+
+import numpy as np
+
+from src.chatbot.disease_predictor import DiseasePredictor
+from src.data.synthetic import generate_knowledge_base
+from src.models.embedding_index import DenseDiseaseIndex
+
+
+def _percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+
+def _sample_queries(predictor, count: int, terms: int, seed: int = 1):
+    """Consultas formadas por subconjuntos de síntomas de condiciones al azar."""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        data = predictor.medical_knowledge[rng.choice(predictor.disease_names)]
+        texts.append(' '.join(rng.sample(data['symptoms'], min(terms, len(data['symptoms'])))))
+    return texts
+
+
+def _recall(exact_scores: np.ndarray, dense_top: np.ndarray, k: int) -> float:
+    exact_top = np.argpartition(-exact_scores, k - 1, axis=1)[:, :k]
+    hits = [len(set(e.tolist()) & set(d.tolist())) for e, d in zip(exact_top, dense_top)]
+    return float(np.mean(hits)) / k
+
+
+def knowledge_base_recall(k: int = 3, queries: int = 500):
+    """Recall sobre la base de conocimiento real (con estructura léxica)."""
+    predictor = DiseasePredictor()
+    index = DenseDiseaseIndex.build(predictor.disease_vectors, predictor.disease_names)
+    query = predictor.vectorizer.transform(_sample_queries(predictor, queries, 3))
+    exact = (query @ predictor.disease_vectors.T).toarray()
+    dense_top, _ = index.search(query, k)
+    print(f"Base real ({len(predictor.disease_names)} enfermedades, {index.embeddings.shape[1]} dims): "
+          f"recall@{k} {_recall(exact, dense_top, k):.3f}")
+
+
+def run_benchmark(conditions: int = 100000, dimensions: int = 128, queries: int = 500, k: int = 10):
+    predictor = DiseasePredictor()
+    predictor.medical_knowledge = generate_knowledge_base(conditions=conditions)
+    predictor._prepare_disease_vectors()
+
+    start = time.perf_counter()
+    index = DenseDiseaseIndex.build(predictor.disease_vectors, predictor.disease_names, dimensions=dimensions)
+    print(f"Índice LSA {index.embeddings.shape} construido en {time.perf_counter() - start:.1f} s "
+          f"({index.embeddings.nbytes / 1024 / 1024:.1f} MiB de vectores float32)")
+
+    texts = _sample_queries(predictor, queries, 4)
+
+    exact_times, dense_times, recalls = [], [], []
+    for text in texts:
+        query = predictor.vectorizer.transform([text])
+
+        started = time.perf_counter()
+        scores = (predictor.disease_vectors @ query.T).toarray().ravel()
+        exact_top = np.argpartition(-scores, k - 1)[:k]
+        exact_times.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        dense_top, _ = index.search(query, k)
+        dense_times.append(time.perf_counter() - started)
+
+        recalls.append(len(set(exact_top.tolist()) & set(dense_top[0].tolist())) / k)
+
+    print(f"{conditions:,} condiciones, {queries} consultas, top-{k}")
+    print(f"TF-IDF exacto: p50 {_percentile_ms(exact_times, 50):.2f} ms, p99 {_percentile_ms(exact_times, 99):.2f} ms")
+    print(f"Denso (LSA):   p50 {_percentile_ms(dense_times, 50):.2f} ms, p99 {_percentile_ms(dense_times, 99):.2f} ms")
+    print(f"Recall@{k} frente al exacto: {np.mean(recalls):.3f} "
+          "(vocabulario aleatorio, sin estructura latente: cota inferior)")
+
+    # Lote de consultas: un producto por bloque para todas a la vez
+    batch = predictor.vectorizer.transform(texts)
+    started = time.perf_counter()
+    index.search(batch, k)
+    elapsed = time.perf_counter() - started
+    print(f"Denso en lote: {elapsed / queries * 1000:.3f} ms por consulta")
+
+    knowledge_base_recall()
+
+
+if __name__ == "__main__":
+    run_benchmark()
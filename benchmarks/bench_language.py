@@ -0,0 +1,58 @@
+"""Benchmark: identificador de n-gramas frente a langdetect
+
+Uso: python -m benchmarks.bench_language
+"""
+
+import time
+
+from src.utils.language import LanguageRouter, load_language_pack
+
+TEXTS = {
+    'es': ["Mi abuelo tiene dolor en el pecho y le cuesta respirar desde hace una hora",
+           "llevo dos días con diarrea, vómitos y dolor de barriga",
+           "me duele mucho la cabeza y veo borroso"],
+    'en': ["My grandfather has chest pain and struggles to breathe since an hour ago",
+           "I have had diarrhea, vomiting and a stomach ache for two days",
+           "my head hurts a lot and my vision is blurry"],
+    'pt': ["Meu avô está com dor no peito e dificuldade para respirar há uma hora",
+           "estou com diarreia, vômitos e dor de barriga há dois dias",
+           "minha cabeça dói muito e estou vendo embaçado"],
+}
+
+
+def _measure(label, detect, repeat):
+    samples = [(language, text) for language, texts in TEXTS.items() for text in texts]
+    correct = sum(detect(text) == language for language, text in samples)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _, text in samples:
+            detect(text)
+    elapsed = (time.perf_counter() - started) / (repeat * len(samples))
+    print(f"{label:<22} {elapsed * 1e6:9.1f} µs/texto  aciertos {correct}/{len(samples)}")
+
+
+def run_benchmark(repeat: int = 200):
+    started = time.perf_counter()
+    router = LanguageRouter()
+    print(f"Carga de perfiles: {(time.perf_counter() - started) * 1000:.1f} ms")
+    _measure("n-gramas (perfiles)", router.detect, repeat)
+
+    started = time.perf_counter()
+    load_language_pack('en')
+    print(f"Carga perezosa del paquete 'en': {(time.perf_counter() - started) * 1000:.1f} ms")
+    started = time.perf_counter()
+    for _ in range(repeat):
+        router.route(TEXTS['en'][0])
+    print(f"Enrutado + traducción: {(time.perf_counter() - started) / repeat * 1e6:.1f} µs/texto")
+
+    try:
+        from langdetect import DetectorFactory, detect
+    except ImportError:
+        print("langdetect no instalado; se omite la comparación")
+        return
+    DetectorFactory.seed = 0
+    _measure("langdetect", detect, max(1, repeat // 20))
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,91 @@
+"""Benchmark: coste por documento de la lematización frente a solo palabras clave
+
+Uso: python -m benchmarks.bench_lemmatizer
+"""
+
+import random
+import time
+
+from src.chatbot.symptom_analyzer import SymptomAnalyzer
+from src.utils.lemmatizer import Lemmatizer
+
+PHRASES = [
+    "estoy {adj} y con {noun} desde {time}",
+    "me {verb} mucho la {part} {time}",
+    "llevo {time} {gerund} sin parar",
+    "tengo {noun} {intensity} y {noun}",
+]
+WORDS = {
+    'adj': ['mareada', 'mareado', 'cansada', 'confundido', 'sudorosa'],
+    'noun': ['vómitos', 'náuseas', 'palpitaciones', 'calambres', 'punzadas', 'fiebre', 'tos'],
+    'time': ['ayer', 'esta mañana', 'hace tres días', 'anoche'],
+    'verb': ['duele', 'duelen', 'arde', 'molesta', 'pica'],
+    'part': ['cabeza', 'barriga', 'pierna', 'espalda', 'garganta'],
+    'gerund': ['vomitando', 'tosiendo', 'temblando', 'sudando'],
+    'intensity': ['fuerte', 'leve', 'intenso', 'constante'],
+}
+
+
+def generate_texts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        template = rng.choice(PHRASES)
+        fields = {key: rng.choice(values) for key, values in WORDS.items()}
+        texts.append(template.format(**fields))
+    return texts
+
+
+def _rate(label: str, count: int, elapsed: float, baseline: float = None):
+    per_doc = elapsed / count * 1e6
+    ratio = f", x{per_doc / baseline:.1f} frente a solo palabras clave" if baseline else ""
+    print(f"{label:<38} {count / elapsed:>9,.0f} docs/s  {per_doc:>8.1f} µs/doc{ratio}")
+    return per_doc
+
+
+def run_benchmark(count: int = 5000):
+    texts = generate_texts(count)
+
+    keyword_only = SymptomAnalyzer()
+    started = time.perf_counter()
+    for text in texts:
+        keyword_only.extract_symptoms(text)
+    baseline = _rate("Solo palabras clave", count, time.perf_counter() - started)
+
+    if keyword_only.nlp is None:
+        print("Modelo spaCy no disponible; no se mide la lematización.")
+        return
+
+    analyzer = SymptomAnalyzer(lemmatize=True)
+    lemmatizer = analyzer.lemmatizer
+
+    # Sin caché: todos los documentos pasan por el modelo (sin parser ni NER)
+    lemmatizer.cache_size = 0
+    lemmatizer.cache.clear()
+    started = time.perf_counter()
+    for text in texts[:1000]:
+        analyzer.extract_symptoms(text)
+    _rate("Lematización por texto, sin caché", 1000, time.perf_counter() - started, baseline)
+
+    # Con caché: el vocabulario repetido evita el modelo
+    lemmatizer.cache_size = 50000
+    lemmatizer.hits = lemmatizer.misses = 0
+    started = time.perf_counter()
+    for text in texts:
+        analyzer.extract_symptoms(text)
+    _rate("Lematización por texto, caché LRU", count, time.perf_counter() - started, baseline)
+    print(f"  textos resueltos desde la caché: {lemmatizer.hit_rate():.1%}")
+
+    # Modo masivo sin caché: nlp.pipe por lotes, en uno y en varios procesos
+    # (el arranque de cada proceso solo se amortiza con lotes grandes)
+    bulk_texts = texts * 4
+    for n_process in (1, 2, 4):
+        bulk = Lemmatizer(keyword_only.nlp, cache_size=0)
+        started = time.perf_counter()
+        bulk.lemmatize_batch(bulk_texts, n_process=n_process)
+        _rate(f"Lote nlp.pipe, n_process={n_process}", len(bulk_texts),
+              time.perf_counter() - started, baseline)
+
+
+if __name__ == "__main__":
+    run_benchmark()
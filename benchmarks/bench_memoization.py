@@ -0,0 +1,47 @@
+"""Benchmark: memoización de predicción y triaje con tráfico repetitivo
+
+Uso: python -m benchmarks.bench_memoization
+"""
+
+import random
+import time
+
+from src.chatbot import SymptomAnalyzer, DiseasePredictor, TriageClassifier
+from src.data.synthetic import generate_symptom_sets
+
+
+def zipf_requests(symptom_sets, count: int, seed: int = 0):
+    """Solicitudes con popularidad tipo Zipf: pocos cuadros se repiten mucho."""
+    rng = random.Random(seed)
+    weights = [1.0 / rank for rank in range(1, len(symptom_sets) + 1)]
+    return rng.choices(symptom_sets, weights=weights, k=count)
+
+
+def _run(predictor, classifier, requests):
+    started = time.perf_counter()
+    for symptoms in requests:
+        classifier.classify_triage(symptoms)
+        predictor.predict_diseases([s['symptom'] for s in symptoms])
+    return time.perf_counter() - started
+
+
+def run_benchmark(distinct: int = 2000, count: int = 20000):
+    analyzer = SymptomAnalyzer()
+    classifier = TriageClassifier()
+    requests = zipf_requests(generate_symptom_sets(analyzer, classifier, distinct), count)
+
+    baseline = _run(DiseasePredictor(cache_size=0), TriageClassifier(cache_size=0), requests)
+    print(f"Sin memoización: {count / baseline:,.0f} solicitudes/s")
+
+    predictor, classifier = DiseasePredictor(), TriageClassifier()
+    memoized = _run(predictor, classifier, requests)
+    print(f"Con memoización: {count / memoized:,.0f} solicitudes/s (x{baseline / memoized:.1f})")
+
+    for stage, cache in (('triaje', classifier.triage_cache), ('enfermedades', predictor.prediction_cache)):
+        stats = cache.stats()
+        print(f"  {stage:<13} aciertos {stats['hit_rate']:.1%} ({stats['hits']:,}/{stats['hits'] + stats['misses']:,}), "
+              f"entradas {stats['size']:,}/{stats['maxsize']:,}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
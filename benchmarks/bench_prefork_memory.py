@@ -0,0 +1,86 @@
+"""Benchmark: memoria única por worker del servidor pre-fork con y sin gc.freeze
+
+Uso: python -m benchmarks.bench_prefork_memory
+"""
+
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from src.service.prefork import process_memory
+
+SAMPLE_TEXTS = [
+    'dolor de pecho severo, dificultad para respirar, sudoración, nausea',
+    'dificultad para respirar, tos, silbido en el pecho',
+    'tos leve, secreción nasal, dolor de garganta leve',
+    'mareo, vision borrosa y dolor de cabeza intenso'
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def _post(url: str, payload: dict) -> dict:
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def _get(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def measure(freeze: bool, workers: int, requests: int) -> list:
+    """Arranca un servidor, lo calienta y devuelve la memoria de cada worker."""
+    port = _free_port()
+    command = [sys.executable, '-m', 'src.service.prefork', '--port', str(port),
+               '--workers', str(workers), '--max-requests', str(requests * 10)]
+    if not freeze:
+        command.append('--no-freeze')
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    
+    try:
+        base = f'http://127.0.0.1:{port}'
+        for _ in range(100):
+            try:
+                _get(base + '/health')
+                break
+            except OSError:
+                time.sleep(0.1)
+        
+        for i in range(requests):
+            _post(base + '/triage', {'text': SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]})
+        
+        pids = set()
+        for _ in range(workers * 50):
+            pids.add(_get(base + '/health')['pid'])
+            if len(pids) == workers:
+                break
+        
+        return [dict(process_memory(pid), pid=pid) for pid in sorted(pids)]
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_benchmark(workers: int = 4, requests: int = 2000):
+    for freeze in (False, True):
+        report = measure(freeze, workers, requests)
+        uss = [entry['uss_kb'] for entry in report]
+        pss = [entry['pss_kb'] for entry in report]
+        print(f"gc.freeze={'sí' if freeze else 'no'}: {len(report)} workers, "
+              f"USS medio {sum(uss) / len(uss) / 1024:.1f} MiB, "
+              f"PSS medio {sum(pss) / len(pss) / 1024:.1f} MiB, "
+              f"RSS medio {sum(e['rss_kb'] for e in report) / len(report) / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,46 @@
+"""Benchmark: coste del perfilado por muestreo en process_patient_input
+
+Uso: python -m benchmarks.bench_profiling
+"""
+
+import os
+import tempfile
+import time
+
+os.environ.setdefault('TRIAGE_AUDIT_LOG_DIR', tempfile.mkdtemp(prefix='audit_'))
+
+from main import MedicalTriageChatbot
+from src.chatbot import SymptomAnalyzer, DiseasePredictor, TriageClassifier
+from src.utils.profiling import RequestProfiler
+
+TEXTS = [
+    "tengo dolor de pecho y dificultad para respirar",
+    "fiebre alta y tos desde hace tres días",
+    "me duele la cabeza y tengo náuseas",
+    "dolor de garganta leve",
+]
+
+
+def _throughput(bot, count: int) -> float:
+    # Sin caché de resultados: se mide el trabajo completo de cada solicitud
+    bot.classifier.triage_cache.maxsize = 0
+    bot.predictor.prediction_cache.maxsize = 0
+    started = time.perf_counter()
+    for i in range(count):
+        bot.process_patient_input(TEXTS[i % len(TEXTS)])
+    return count / (time.perf_counter() - started)
+
+
+def run_benchmark(count: int = 5000):
+    components = (SymptomAnalyzer, DiseasePredictor, TriageClassifier)
+    output_dir = tempfile.mkdtemp(prefix='profiles_')
+
+    for label, sample_every in (('Desactivado', 0), ('1 de cada 1000', 1000), ('1 de cada 100', 100)):
+        bot = MedicalTriageChatbot(profiler=RequestProfiler(output_dir, sample_every, components))
+        rate = _throughput(bot, count)
+        print(f"{label:<15} {rate:,.0f} solicitudes/s ({bot.profiler.samples} perfiles)")
+    print(f"Perfiles en {output_dir}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
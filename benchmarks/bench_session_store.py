@@ -0,0 +1,72 @@
+"""Benchmark: sesiones concurrentes en SQLite (WAL) con escrituras agrupadas frente a una transacción por escritura
+
+Uso: python -m benchmarks.bench_session_store
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from src.data.session_store import SessionStore
+
+SAMPLE_RESULT = {
+    'symptoms': [{'symptom': 'dolor', 'category': 'dolor', 'severity': 'severo', 'urgency_level': 3},
+                 {'symptom': 'pecho', 'category': 'respiratorio', 'severity': 'severo', 'urgency_level': 3}],
+    'diseases': [{'disease': 'Infarto Agudo Miocardio', 'confidence': 0.61}],
+    'triage': {'triage_level': 1, 'triage_name': 'Resucitación', 'reasoning': ['Síntomas críticos']}
+}
+
+
+def run_mixed(store: SessionStore, threads: int, sessions: int, operations: int, write_ratio: float):
+    """Cada hilo atiende sus propias sesiones; tras cada escritura comprueba que la lee."""
+    latencies = [[] for _ in range(threads)]
+    stale = [0] * threads
+
+    def worker(index):
+        rng = random.Random(index)
+        own = [f"s{index}-{i}" for i in range(sessions // threads)]
+        visits = {}
+        for _ in range(operations):
+            session_id = rng.choice(own)
+            started = time.perf_counter_ns()
+            if rng.random() < write_ratio:
+                visits[session_id] = visits.get(session_id, 0) + 1
+                store.update_patient(session_id, visits=visits[session_id])
+                store.record_result(session_id, SAMPLE_RESULT)
+            session = store.get(session_id)
+            latencies[index].append(time.perf_counter_ns() - started)
+            if session['patient'].get('visits', 0) != visits.get(session_id, 0):
+                stale[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    store.flush()
+    seconds = time.perf_counter() - started
+    return seconds, np.concatenate([np.array(l) for l in latencies]), sum(stale)
+
+
+def run_benchmark(threads: int = 8, sessions: int = 400, operations: int = 2000, write_ratio: float = 0.3):
+    """Urgencias grandes: cientos de pacientes activos y varios hilos de la aplicación a la vez."""
+    total = threads * operations
+    print(f"Hilos: {threads}, sesiones activas: {sessions}, operaciones: {total:,} "
+          f"({write_ratio:.0%} con escritura)")
+    for label, flush_interval in (("Una transacción por escritura", 0), ("Escrituras agrupadas (20 ms)", 0.02)):
+        with tempfile.TemporaryDirectory() as directory:
+            with SessionStore(os.path.join(directory, 'sessions.db'), flush_interval=flush_interval) as store:
+                seconds, latencies, stale = run_mixed(store, threads, sessions, operations, write_ratio)
+                commits = store.commits
+            print(f"{label}: {total / seconds:,.0f} operaciones/s, p50/p99 "
+                  f"{np.percentile(latencies, 50) / 1000:.0f} / {np.percentile(latencies, 99) / 1000:.0f} µs, "
+                  f"transacciones: {commits:,}, lecturas desactualizadas: {stale}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,66 @@
+"""Benchmark: memoria por worker con índice propio frente a índice compartido
+
+Uso: python -m benchmarks.bench_shared_knowledge
+"""
+
+import multiprocessing
+import os
+
+from src.chatbot.disease_predictor import DiseasePredictor
+from src.data.synthetic import generate_knowledge_base
+from src.models.shared_knowledge import SharedKnowledgeBase, attach
+from src.service.prefork import process_memory
+
+
+def build_large_predictor() -> DiseasePredictor:
+    """Predictor que entrena su propio índice TF-IDF sobre la base sintética."""
+    predictor = DiseasePredictor()
+    predictor.medical_knowledge = generate_knowledge_base()
+    predictor._prepare_disease_vectors()
+    return predictor
+
+
+def _worker(mode, descriptor, ready, done):
+    if mode == 'propio':
+        predictor = build_large_predictor()
+    else:
+        predictor = DiseasePredictor(shared_index=attach(descriptor))
+        # La tabla descriptiva sigue siendo por proceso; solo las matrices se comparten
+        predictor.medical_knowledge = generate_knowledge_base()
+    for i in range(50):
+        predictor.predict_diseases([f"termino{i}", f"termino{i * 7}", "dolor"])
+    ready.put((os.getpid(), predictor.disease_vectors.nnz))
+    done.wait()
+
+
+def measure(mode: str, workers: int, descriptor=None):
+    context = multiprocessing.get_context('spawn')
+    ready, done = context.Queue(), context.Event()
+    processes = [context.Process(target=_worker, args=(mode, descriptor, ready, done)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    reports = [ready.get(timeout=600) for _ in processes]
+    memory = [process_memory(pid) for pid, _ in reports]
+    done.set()
+    for process in processes:
+        process.join()
+    
+    uss = sum(entry['uss_kb'] for entry in memory) / len(memory) / 1024
+    pss = sum(entry['pss_kb'] for entry in memory) / len(memory) / 1024
+    print(f"Índice {mode:>10}: {workers} workers, USS medio {uss:.1f} MiB, PSS medio {pss:.1f} MiB")
+
+
+def run_benchmark(workers: int = 4):
+    predictor = build_large_predictor()
+    knowledge_base = SharedKnowledgeBase(predictor)
+    print(f"Matriz de enfermedades: {predictor.disease_vectors.shape}, "
+          f"bloque compartido: {knowledge_base.shm.size / 1024 / 1024:.1f} MiB")
+    try:
+        measure('propio', workers)
+        measure('compartido', workers, knowledge_base.descriptor)
+    finally:
+        knowledge_base.unlink()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,75 @@
+"""Benchmark: corrección por borrado simétrico frente a recorrer todo el vocabulario
+
+Uso: python -m benchmarks.bench_spelling
+"""
+
+import random
+import string
+import time
+
+from src.chatbot import SymptomAnalyzer, DiseasePredictor, TriageClassifier
+from src.utils.spelling import SymSpellIndex, medical_vocabulary, edit_distance
+
+
+def _typos(terms, count: int, seed: int = 0):
+    rng = random.Random(seed)
+    tokens = []
+    for _ in range(count):
+        term = list(rng.choice(terms))
+        for _ in range(rng.randint(1, 2)):
+            term[rng.randrange(len(term))] = rng.choice(string.ascii_lowercase)
+        tokens.append(''.join(term))
+    return tokens
+
+
+def _naive(tokens, terms, index):
+    for token in tokens:
+        limit = index.allowed_distance(token)
+        min((edit_distance(token, term, limit), term) for term in terms)
+
+
+def measure(label: str, terms, count: int = 2000):
+    started = time.perf_counter()
+    index = SymSpellIndex(terms, cache_size=0)
+    build = time.perf_counter() - started
+    tokens = _typos(index.terms, count)
+
+    started = time.perf_counter()
+    for token in tokens:
+        index.lookup(token)
+    symspell = (time.perf_counter() - started) / count * 1e6
+
+    naive_count = min(count, 200)
+    started = time.perf_counter()
+    _naive(tokens[:naive_count], index.terms, index)
+    naive = (time.perf_counter() - started) / naive_count * 1e6
+
+    print(f"{label}: {len(index.terms):,} términos, {len(index.deletes):,} variantes "
+          f"(construcción {build:.2f} s)")
+    print(f"  borrado simétrico {symspell:8.1f} µs/token, exhaustivo {naive:10.1f} µs/token "
+          f"(x{naive / symspell:.0f})")
+
+    # Con caché: el vocabulario de los pacientes se repite mucho
+    cached = SymSpellIndex(terms)
+    repeated = tokens[:200] * (count // 200)
+    for token in tokens[:200]:
+        cached.lookup(token)
+    started = time.perf_counter()
+    for token in repeated:
+        cached.lookup(token)
+    print(f"  con caché de tokens {(time.perf_counter() - started) / len(repeated) * 1e6:.2f} µs/token")
+
+
+def run_benchmark():
+    analyzer = SymptomAnalyzer()
+    vocabulary = medical_vocabulary(analyzer, TriageClassifier(), DiseasePredictor())
+    measure("Vocabulario médico", vocabulary)
+
+    rng = random.Random(1)
+    large = {''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+             for _ in range(20000)}
+    measure("Vocabulario sintético", large | vocabulary)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,81 @@
+"""Benchmark: hospitales en un registro compartido frente a instancias separadas
+
+Uso: python -m benchmarks.bench_tenants
+"""
+
+import time
+import tracemalloc
+
+from src.chatbot.disease_predictor import DiseasePredictor
+from src.chatbot.pipeline import TriagePipeline
+from src.chatbot.symptom_analyzer import SymptomAnalyzer
+from src.chatbot.tenants import TenantRegistry, apply_knowledge_override
+from src.chatbot.triage_classifier import TriageClassifier
+from src.data.synthetic import generate_knowledge_base
+
+
+def build_packs(count: int, knowledge):
+    """Paquetes pequeños; uno de cada `count // 2` añade una enfermedad (índice propio)."""
+    diseases = list(knowledge)
+    packs = {}
+    for i in range(count):
+        pack = {
+            'triage': {'level_3_criteria': {'add': [f'criterio local {i}']}},
+            'priors': {diseases[i % len(diseases)]: 1.5}
+        }
+        if i % max(1, count // 2) == 0:
+            pack['knowledge'] = {f'local_{i}': {'symptoms': ['dolor', 'fiebre'], 'severity': 'leve',
+                                                'description': f'Condición local {i}', 'recommendations': []}}
+        packs[f'hospital_{i}'] = pack
+    return packs
+
+
+def build_separate(packs, knowledge):
+    """Un clasificador y un predictor propios por hospital."""
+    instances = {}
+    for name, pack in packs.items():
+        classifier = TriageClassifier()
+        classifier.level_3_criteria += pack['triage']['level_3_criteria']['add']
+        classifier._compile_level_rules()
+        predictor = DiseasePredictor()
+        predictor.medical_knowledge = apply_knowledge_override(knowledge, pack.get('knowledge'))
+        predictor._prepare_disease_vectors()
+        instances[name] = (classifier, predictor)
+    return instances
+
+
+def measure(label: str, build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - started
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{label}: {seconds:.1f} s de arranque, {allocated / 2**20:.1f} MiB")
+    return result
+
+
+def run_benchmark(tenants: int = 20, conditions: int = 2000):
+    knowledge = generate_knowledge_base(conditions=conditions, vocabulary=20000)
+    analyzer = SymptomAnalyzer()
+    predictor = DiseasePredictor()
+    predictor.medical_knowledge = knowledge
+    predictor._prepare_disease_vectors()
+    base = TriagePipeline(analyzer, predictor, TriageClassifier())
+    packs = build_packs(tenants, knowledge)
+
+    print(f"Hospitales: {tenants}, enfermedades por hospital: {conditions}")
+    measure("Instancias separadas", lambda: build_separate(packs, knowledge))
+    registry = measure("Registro compartido ", lambda: TenantRegistry(base, packs))
+    print(f"Índices de enfermedades distintos: {registry.shared_stats()['disease_indexes']}")
+
+    names = registry.names()
+    lookups = 1000000
+    started = time.perf_counter()
+    for i in range(lookups):
+        registry.pipeline(names[i % len(names)])
+    print(f"Selección de hospital: {(time.perf_counter() - started) / lookups * 1e6:.3f} µs por solicitud")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,48 @@
+"""Benchmark: análisis de complejidad frente a la extracción de síntomas
+
+scan_text recorre cada texto dos veces (palabras y oraciones; términos
+médicos); se mide también el coste de cada pasada por separado.
+
+Uso: python -m benchmarks.bench_text_complexity
+"""
+
+import time
+
+from src.chatbot.symptom_analyzer import SymptomAnalyzer
+from src.chatbot.triage_classifier import TriageClassifier
+from src.data.synthetic import generate_complaints
+from src.utils.preprocessing import MedicalTextPreprocessor, _TOKENS
+from src.utils.text_folding import fold_text
+
+
+def timed(function, texts) -> float:
+    started = time.perf_counter()
+    function(texts)
+    return time.perf_counter() - started
+
+
+def run_benchmark(count: int = 20000):
+    """Throughput del análisis (texto a texto y por lotes) y de la extracción, sin cachés."""
+    analyzer, preprocessor = SymptomAnalyzer(), MedicalTextPreprocessor()
+    texts = generate_complaints(analyzer, TriageClassifier(), count=count, seed=1)
+
+    extract_seconds = timed(lambda batch: [analyzer.extract_symptoms(text) for text in batch], texts)
+    single_seconds = timed(lambda batch: [preprocessor.analyze_text_complexity(text) for text in batch], texts)
+    batch_seconds = timed(preprocessor.analyze_text_complexity_batch, texts)
+
+    folded = [fold_text(text) for text in texts]
+    tokens_seconds = timed(lambda batch: [_TOKENS.findall(text) for text in batch], folded)
+    terms_seconds = timed(lambda batch: [preprocessor.term_matcher.find(text) for text in batch], folded)
+
+    print(f"Textos: {count}")
+    print(f"Extracción de síntomas:      {count / extract_seconds:,.0f} textos/s")
+    print(f"Complejidad texto a texto:   {count / single_seconds:,.0f} textos/s "
+          f"({single_seconds / extract_seconds:.2f}x el coste de la extracción)")
+    print(f"Complejidad por lotes:       {count / batch_seconds:,.0f} textos/s "
+          f"({batch_seconds / extract_seconds:.2f}x el coste de la extracción)")
+    print(f"  pasada de palabras y oraciones: {tokens_seconds / count * 1e6:.1f} µs/texto, "
+          f"pasada de términos: {terms_seconds / count * 1e6:.1f} µs/texto")
+
+
+if __name__ == "__main__":
+    run_benchmark()
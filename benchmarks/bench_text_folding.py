@@ -0,0 +1,53 @@
+"""Benchmark: plegado con tablas precalculadas frente a unicodedata.normalize
+
+Uso: python -m benchmarks.bench_text_folding
+"""
+
+import random
+import time
+import unicodedata
+
+from src.utils.text_folding import FOLD_TABLE, fold_text
+
+SAMPLE_WORDS = [
+    'Dolor', 'de', 'pecho', 'CORAZÓN', 'náuseas', 'vómito', 'difícil', 'respirar',
+    'mareo', 'señora', 'años', 'pingüino', 'está', 'AYUDA', 'fiebre', 'cabeza', 'tensión',
+]
+
+
+def normalize_and_filter(text: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def normalize_and_encode(text: str) -> str:
+    # Variante habitual: descarta todo lo que no es ASCII (también ñ y ü descompuestas)
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def run_benchmark(count: int = 20000, words: int = 40):
+    rng = random.Random(0)
+    accented = [' '.join(rng.choice(SAMPLE_WORDS) for _ in range(words)) for _ in range(count)]
+    ascii_only = [text.encode('ascii', 'ignore').decode('ascii') for text in accented]
+
+    for name, texts in (("Textos con acentos", accented), ("Textos solo ASCII", ascii_only)):
+        print(f"== {name} ==")
+        _measure(texts)
+
+
+def _measure(texts):
+    count = len(texts)
+    total_mb = sum(len(text.encode('utf-8')) for text in texts) / 1024 / 1024
+    for label, function in (("fold_text (tablas precalculadas)", fold_text),
+                            ("str.translate (tabla completa)", lambda text: text.translate(FOLD_TABLE)),
+                            ("normalize + filtro combining", normalize_and_filter),
+                            ("normalize + encode ascii", normalize_and_encode)):
+        started = time.perf_counter()
+        for text in texts:
+            function(text)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<36} {count / elapsed:>10,.0f} textos/s  {total_mb / elapsed:6.1f} MB/s")
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,51 @@
+"""Benchmark: cola de triaje con decenas de miles de pacientes
+
+Uso: python -m benchmarks.bench_triage_queue
+"""
+
+import random
+import time
+
+from src.chatbot.triage_queue import TriageQueue
+
+
+def run_benchmark(patients: int = 50000, reassessments: int = 20000, seed: int = 0):
+    """Mide inserciones, re-priorizaciones, detección de vencimientos y extracciones."""
+    rng = random.Random(seed)
+    now = [0.0]
+    queue = TriageQueue(clock=lambda: now[0])
+    sites = [f"sede_{i}" for i in range(8)]
+    
+    started = time.perf_counter()
+    for i in range(patients):
+        queue.push(f"p{i}", rng.randint(1, 5), arrival_time=rng.uniform(0, 3600),
+                   site=rng.choice(sites))
+    push_seconds = time.perf_counter() - started
+    
+    ids = [f"p{i}" for i in range(patients)]
+    started = time.perf_counter()
+    for patient_id in rng.sample(ids, reassessments):
+        queue.reprioritize(patient_id, rng.randint(1, 5))
+    reprioritize_seconds = time.perf_counter() - started
+    
+    # Avanzar el reloj minuto a minuto durante dos horas
+    started = time.perf_counter()
+    breached = 0
+    for minute in range(1, 121):
+        breached += len(queue.check_overdue(now=3600 + minute * 60))
+    overdue_seconds = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    while queue:
+        queue.pop()
+    pop_seconds = time.perf_counter() - started
+    
+    print(f"Pacientes: {patients:,}")
+    print(f"push:          {patients / push_seconds:>12,.0f} ops/s")
+    print(f"reprioritize:  {reassessments / reprioritize_seconds:>12,.0f} ops/s")
+    print(f"check_overdue: {overdue_seconds * 1000 / 120:>12.3f} ms/minuto simulado ({breached:,} vencidos)")
+    print(f"pop:           {patients / pop_seconds:>12,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    run_benchmark()
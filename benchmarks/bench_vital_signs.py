@@ -0,0 +1,46 @@
+"""Benchmark: re-puntuación NEWS2 vectorizada de un flujo de monitorización
+
+Uso: python -m benchmarks.bench_vital_signs
+"""
+
+import time
+
+import numpy as np
+
+from src.chatbot.vital_signs import VitalSignsScorer
+
+
+def generate_readings(count: int, seed: int = 0):
+    """Genera lecturas de cabecera aleatorias con valores plausibles."""
+    rng = np.random.default_rng(seed)
+    return {
+        'heart_rate': rng.integers(30, 170, count),
+        'respiratory_rate': rng.integers(5, 40, count),
+        'spo2': rng.integers(80, 101, count),
+        'temperature': rng.normal(37.0, 1.0, count).round(1),
+        'systolic_bp': rng.integers(60, 240, count),
+        'consciousness': rng.choice(list('AAAAAAAAACVPU'), count),
+        'on_oxygen': rng.random(count) < 0.1,
+        'age': rng.integers(0, 100, count)
+    }
+
+
+def run_benchmark(batch_sizes=(1000, 10000, 100000, 1000000), repeats: int = 5):
+    """Mide lecturas por segundo para distintos tamaños de lote."""
+    scorer = VitalSignsScorer()
+    
+    for size in batch_sizes:
+        readings = generate_readings(size)
+        scorer.score_batch(**readings)  # Calentamiento
+        
+        started = time.perf_counter()
+        for _ in range(repeats):
+            scorer.score_batch(**readings)
+        seconds = (time.perf_counter() - started) / repeats
+        
+        print(f"Lote {size:>9,}: {seconds * 1000:8.2f} ms/llamada, "
+              f"{size / seconds:>14,.0f} lecturas/s")
+
+
+if __name__ == "__main__":
+    run_benchmark()
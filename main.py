@@ -1,29 +1,239 @@
+import os
+import time
+import uuid
 import streamlit as st
 from src.chatbot.symptom_analyzer import SymptomAnalyzer
 from src.chatbot.disease_predictor import DiseasePredictor
 from src.chatbot.triage_classifier import TriageClassifier
+from src.chatbot.pipeline import TriagePipeline
+from src.chatbot.triage_queue import TriageQueue
+from src.data.audit_log import AuditLog, AuditLogError, build_audit_record
+from src.data.session_store import SessionStore
+from src.utils.spelling import SymSpellIndex, medical_vocabulary
+from src.utils.preprocessing import MedicalTextPreprocessor
+from src.utils.profiling import RequestProfiler
+
+def build_profiler():
+    """Perfilador configurado por entorno (TRIAGE_PROFILE_SAMPLE), sin manejador de señal."""
+    return RequestProfiler.from_env(
+        components=(SymptomAnalyzer, DiseasePredictor, TriageClassifier, MedicalTextPreprocessor)
+    )
 
 class MedicalTriageChatbot:
-    def __init__(self):
-        self.analyzer = SymptomAnalyzer()
+    def __init__(self, optional_stages=TriagePipeline.OPTIONAL_STAGES,
+                 skip_diseases_on_level_1=False, audit_log=None, spell_correction=False,
+                 languages=('es',), profiler=None):
+        # languages: idiomas aceptados; los paquetes de en/pt se cargan al primer uso
+        self.analyzer = SymptomAnalyzer(languages=languages)
         self.predictor = DiseasePredictor()
         self.classifier = TriageClassifier()
-    
-    def process_patient_input(self, symptoms_text):
-        # Análisis de síntomas
-        symptoms = self.analyzer.extract_symptoms(symptoms_text)
         
-        # Predicción de enfermedades
-        diseases = self.predictor.predict_diseases([s['symptom'] for s in symptoms])
+        # Corrección de errores de escritura (caveza, corason) antes de extraer síntomas
+        if spell_correction:
+            self.analyzer.spelling_index = SymSpellIndex(
+                medical_vocabulary(self.analyzer, self.classifier, self.predictor)
+            )
         
-        # Clasificación de triaje
-        triage_result = self.classifier.classify_triage(symptoms)
+        # Pipeline por etapas: extracción y triaje siempre, el resto según presupuesto
+        self.pipeline = TriagePipeline(
+            self.analyzer, self.predictor, self.classifier,
+            optional_stages=optional_stages,
+            skip_diseases_on_level_1=skip_diseases_on_level_1
+        )
         
-        return {
-            'symptoms': symptoms,
-            'diseases': diseases,
-            'triage': triage_result
+        # Registro de auditoría opcional (escritura en segundo plano)
+        self.audit_log = audit_log
+        # Último fallo al registrar; el triaje sigue, pero la interfaz lo muestra
+        self.audit_error = None
+        
+        # Perfilado por muestreo (TRIAGE_PROFILE_SAMPLE=N); SIGUSR2 solo con el de get_profiler
+        self.profiler = profiler or build_profiler()
+    
+    def process_patient_input(self, symptoms_text, budget_ms=None, vital_signs=None):
+        # budget_ms: plazo de la solicitud; None ejecuta todas las etapas
+        # vital_signs: lecturas opcionales que pueden escalar el triaje (NEWS2)
+        if self.profiler.enabled and self.profiler.should_sample():
+            result = self.profiler.call(self.pipeline.run, symptoms_text,
+                                        budget_ms=budget_ms, vital_signs=vital_signs)
+        else:
+            result = self.pipeline.run(symptoms_text, budget_ms=budget_ms, vital_signs=vital_signs)
+        self._audit(symptoms_text, result)
+        return result
+    
+    def stream_patient_input(self, symptoms_text, budget_ms=None, vital_signs=None):
+        # Entrega (etapa, resultado) en orden: síntomas, triaje, enfermedades, consejo...
+        if self.profiler.enabled and self.profiler.should_sample():
+            stages = self.profiler.stream(self.pipeline.stream, symptoms_text,
+                                          budget_ms=budget_ms, vital_signs=vital_signs)
+        else:
+            stages = self.pipeline.stream(symptoms_text, budget_ms=budget_ms, vital_signs=vital_signs)
+        result = {}
+        for stage, value in stages:
+            result[stage] = value
+            yield stage, value
+        self._audit(symptoms_text, result)
+    
+    def _audit(self, symptoms_text, result):
+        if self.audit_log is not None:
+            try:
+                self.audit_log.record(
+                    build_audit_record(symptoms_text, result, self.classifier.rules_version)
+                )
+                self.audit_error = None
+            except AuditLogError as exc:
+                self.audit_error = exc
+
+def render_symptoms(symptoms):
+    if symptoms:
+        for symptom in symptoms:
+            severity_color = {
+                'leve': '🟢',
+                'moderado': '🟡', 
+                'severo': '🔴'
+            }.get(symptom['severity'], '⚪')
+            st.write(f"{severity_color} **{symptom['symptom']}**")
+            st.write(f"   Categoría: {symptom['category']}")
+            st.write(f"   Severidad: {symptom['severity']}")
+    else:
+        st.info("No se detectaron síntomas específicos")
+
+def render_diseases(diseases):
+    if diseases:
+        for disease in diseases[:5]:  # Top 5
+            confidence = disease['confidence'] * 100
+            st.write(f"**{disease['disease']}**")
+            st.progress(confidence / 100)
+            st.write(f"Confianza: {confidence:.1f}%")
+            st.write("---")
+    else:
+        st.info("No se pudieron identificar enfermedades específicas")
+
+def render_triage(triage):
+    # Color según nivel
+    level_colors = {
+        1: "🔴",
+        2: "🟠", 
+        3: "🟡",
+        4: "🟢",
+        5: "🔵"
+    }
+    
+    color = level_colors.get(triage['triage_level'], "⚪")
+    
+    st.markdown(f"""
+    ### {color} Nivel {triage['triage_level']}
+    **{triage['triage_name']}**
+    
+    **Tiempo máximo de espera**: {triage['max_wait_time']}
+    
+    **Recomendación**:
+    {triage['recommendation']}
+    """)
+    
+    if 'vital_signs' in triage:
+        st.write(f"**NEWS2**: {triage['vital_signs']['news2_score']}")
+    
+    # Alerta según severidad
+    if triage['triage_level'] <= 2:
+        st.error("⚠️ ATENCIÓN INMEDIATA REQUERIDA")
+    elif triage['triage_level'] == 3:
+        st.warning("⚠️ Atención prioritaria necesaria")
+    else:
+        st.info("ℹ️ Atención médica recomendada")
+
+def render_advice(advice):
+    if advice:
+        st.subheader("💡 Recomendaciones")
+        st.text(advice)
+
+def render_pipeline_info(pipeline_info):
+    degraded = pipeline_info.get('degraded_stages', [])
+    if degraded:
+        st.caption("Etapas degradadas: " +
+                   ", ".join(f"{d['stage']} ({d['status']}, {d['reason']})" for d in degraded))
+    
+    # Aciertos de la memoización por etapa (acumulados en esta sesión)
+    cache = pipeline_info.get('cache', {})
+    if cache:
+        st.caption("Resultados reutilizados: " +
+                   ", ".join(f"{stage} {stats['hit_rate']:.0%}" for stage, stats in cache.items()))
+
+def render_waiting_room(queue):
+    st.markdown("---")
+    st.header("🕒 Sala de Espera")
+    
+    if len(queue) and st.button("👩‍⚕️ Atender siguiente paciente"):
+        entry = queue.pop()
+        st.success(f"Atendiendo a {entry.patient_id} (Nivel {entry.triage_level})")
+    
+    # Avanza la rueda de temporizadores; solo revisa los ticks transcurridos
+    now = time.time()
+    queue.check_overdue(now)
+    
+    if not len(queue):
+        st.info("No hay pacientes en espera")
+        return
+    
+    counts = queue.counts_by_level()
+    for column, level in zip(st.columns(len(counts)), sorted(counts)):
+        column.metric(f"Nivel {level}", counts[level])
+    
+    overdue = queue.overdue()
+    if overdue:
+        st.error("⚠️ Pacientes fuera de plazo: " + ", ".join(entry.patient_id for entry in overdue))
+    
+    st.table([
+        {
+            'Paciente': entry.patient_id,
+            'Nombre': entry.data.get('name') or '-',
+            'Nivel': entry.triage_level,
+            'Espera (min)': int(entry.waited_seconds(now) // 60),
+            'Estado': '⏰ Vencido' if entry.is_overdue(now) else '✅ En plazo'
         }
+        for entry in queue.entries()
+    ])
+
+@st.cache_resource
+def get_profiler():
+    # Un perfilador por proceso, compartido por todas las sesiones. Solo este instala
+    # SIGUSR2, y solo si se crea en el hilo principal: bajo Streamlit el script corre
+    # en otro hilo y allí únicamente sirve TRIAGE_PROFILE_SAMPLE
+    profiler = build_profiler()
+    profiler.install_signal_handler()
+    return profiler
+
+@st.cache_resource
+def get_audit_log():
+    # Un solo escritor por proceso para todas las sesiones del navegador
+    return AuditLog(os.environ.get('TRIAGE_AUDIT_LOG_DIR', 'audit_logs'))
+
+@st.cache_resource
+def get_session_store():
+    # Un almacén por proceso; varios procesos pueden compartir el mismo fichero
+    return SessionStore(os.environ.get('TRIAGE_SESSION_DB', os.path.join('sessions', 'sessions.db')))
+
+def restore_session(store):
+    # La sesión viaja en la URL (?session=...): sobrevive a reinicios y a cambios de proceso
+    if 'session_id' not in st.session_state:
+        session_id = st.query_params.get('session') or uuid.uuid4().hex
+        st.query_params['session'] = session_id
+        st.session_state.session_id = session_id
+        
+        session = store.get(session_id)
+        st.session_state.patient_name = session['patient'].get('name', '')
+        st.session_state.patient_age = session['patient'].get('age', 30)
+        if session['last_result'] is not None:
+            st.session_state.last_result = session['last_result']
+    return st.session_state.session_id
+
+# Sección de la interfaz donde se dibuja cada etapa del pipeline
+SECTION_RENDERERS = {
+    'symptoms': render_symptoms,
+    'diseases': render_diseases,
+    'triage': render_triage,
+    'advice': render_advice,
+    'pipeline': render_pipeline_info
+}
 
 def main():
     st.set_page_config(
@@ -48,7 +258,20 @@ def main():
     # Inicializar chatbot
     if 'chatbot' not in st.session_state:
         with st.spinner("Cargando sistema de IA médica..."):
-            st.session_state.chatbot = MedicalTriageChatbot()
+            st.session_state.chatbot = MedicalTriageChatbot(
+                audit_log=get_audit_log(), languages=('es', 'en', 'pt'), profiler=get_profiler(),
+                # Corrección ortográfica desactivada hasta validarla sin regresiones en el corpus etiquetado
+                spell_correction=os.environ.get('TRIAGE_SPELL_CORRECTION') == '1'
+            )
+    
+    # Datos del paciente y último resultado persistentes (SQLite)
+    session_store = get_session_store()
+    session_id = restore_session(session_store)
+    
+    # Sala de espera: pacientes pendientes por nivel de triaje y hora de llegada
+    if 'triage_queue' not in st.session_state:
+        st.session_state.triage_queue = TriageQueue()
+        st.session_state.patient_counter = 0
     
     # Columnas principales
     col1, col2 = st.columns([2, 1])
@@ -58,8 +281,31 @@ def main():
         
         # Información del paciente
         st.subheader("Información del Paciente")
-        nombre = st.text_input("Nombre del paciente (opcional)")
-        edad = st.number_input("Edad", min_value=0, max_value=120, value=30)
+        nombre = st.text_input("Nombre del paciente (opcional)", value=st.session_state.patient_name)
+        edad = st.number_input("Edad", min_value=0, max_value=120, value=st.session_state.patient_age)
+        
+        # Signos vitales (opcionales): pueden escalar el nivel de triaje
+        # Solo se pasan si se midieron: la edad sola no es una puntuación NEWS2
+        vital_signs = None
+        with st.expander("🩺 Signos vitales (opcional)"):
+            if st.checkbox("Registrar signos vitales"):
+                vital_signs = {'age': edad}
+                vcol1, vcol2 = st.columns(2)
+                with vcol1:
+                    vital_signs['heart_rate'] = st.number_input("Frecuencia cardíaca (lpm)", 20, 250, 80)
+                    vital_signs['respiratory_rate'] = st.number_input("Frecuencia respiratoria (rpm)", 4, 60, 16)
+                    vital_signs['spo2'] = st.number_input("SpO2 (%)", 50, 100, 98)
+                    vital_signs['on_oxygen'] = st.checkbox("Con oxígeno suplementario")
+                with vcol2:
+                    vital_signs['temperature'] = st.number_input("Temperatura (°C)", 30.0, 43.0, 36.8, step=0.1)
+                    vital_signs['systolic_bp'] = st.number_input("Presión sistólica (mmHg)", 50, 250, 120)
+                    vital_signs['consciousness'] = st.selectbox(
+                        "Nivel de conciencia (ACVPU)", ['A', 'C', 'V', 'P', 'U'],
+                        format_func=lambda code: {
+                            'A': 'A - Alerta', 'C': 'C - Confusión nueva', 'V': 'V - Responde a la voz',
+                            'P': 'P - Responde al dolor', 'U': 'U - No responde'
+                        }[code]
+                    )
         
         # Entrada de síntomas
         st.subheader("Descripción de Síntomas")
@@ -72,20 +318,12 @@ def main():
         # Botón de análisis
         if st.button("🔍 Analizar Síntomas", type="primary"):
             if symptoms_input.strip():
-                with st.spinner("Analizando síntomas con IA..."):
-                    try:
-                        # Procesar entrada
-                        result = st.session_state.chatbot.process_patient_input(symptoms_input)
-                        
-                        # Guardar resultado en session state
-                        st.session_state.last_result = result
-                        st.session_state.patient_name = nombre
-                        st.session_state.patient_age = edad
-                        
-                        st.success("✅ Análisis completado")
-                        
-                    except Exception as e:
-                        st.error(f"Error en el análisis: {str(e)}")
+                # El análisis se ejecuta en la sección de resultados, etapa por etapa
+                st.session_state.pending_input = symptoms_input
+                st.session_state.pending_vital_signs = vital_signs
+                st.session_state.patient_name = nombre
+                st.session_state.patient_age = edad
+                session_store.update_patient(session_id, name=nombre, age=edad)
             else:
                 st.warning("Por favor, ingrese una descripción de síntomas.")
     
@@ -107,16 +345,16 @@ def main():
             ("5", "🔵", "No urgente", "120 min")
         ]
         
-        for level, color, name, time in levels:
-            st.write(f"{color} **Nivel {level}**: {name} ({time})")
+        for level, color, name, wait in levels:
+            st.write(f"{color} **Nivel {level}**: {name} ({wait})")
     
-    # Mostrar resultados si existen
-    if 'last_result' in st.session_state:
+    # Mostrar resultados (en curso o del último análisis)
+    pending_input = st.session_state.pop('pending_input', None)
+    pending_vital_signs = st.session_state.pop('pending_vital_signs', None)
+    if pending_input is not None or 'last_result' in st.session_state:
         st.markdown("---")
         st.header("📋 Resultados del Análisis")
         
-        result = st.session_state.last_result
-        
         # Información del paciente
         if st.session_state.patient_name:
             st.write(f"**Paciente**: {st.session_state.patient_name}")
@@ -127,63 +365,72 @@ def main():
         
         with col1:
             st.subheader("🔍 Síntomas Detectados")
-            if result['symptoms']:
-                for symptom in result['symptoms']:
-                    severity_color = {
-                        'leve': '🟢',
-                        'moderado': '🟡', 
-                        'severo': '🔴'
-                    }.get(symptom['severity'], '⚪')
-                    st.write(f"{severity_color} **{symptom['symptom']}**")
-                    st.write(f"   Categoría: {symptom['category']}")
-                    st.write(f"   Severidad: {symptom['severity']}")
-            else:
-                st.info("No se detectaron síntomas específicos")
+            symptoms_slot = st.empty()
         
         with col2:
             st.subheader("🧠 Posibles Enfermedades")
-            if result['diseases']:
-                for disease in result['diseases'][:5]:  # Top 5
-                    confidence = disease['confidence'] * 100
-                    st.write(f"**{disease['disease']}**")
-                    st.progress(confidence / 100)
-                    st.write(f"Confianza: {confidence:.1f}%")
-                    st.write("---")
-            else:
-                st.info("No se pudieron identificar enfermedades específicas")
+            diseases_slot = st.empty()
         
         with col3:
             st.subheader("🚨 Clasificación de Triaje")
-            triage = result['triage']
-            
-            # Color según nivel
-            level_colors = {
-                1: "🔴",
-                2: "🟠", 
-                3: "🟡",
-                4: "🟢",
-                5: "🔵"
-            }
-            
-            color = level_colors.get(triage['triage_level'], "⚪")
-            
-            st.markdown(f"""
-            ### {color} Nivel {triage['triage_level']}
-            **{triage['triage_name']}**
-            
-            **Tiempo máximo de espera**: {triage['max_wait_time']}
-            
-            **Recomendación**:
-            {triage['recommendation']}
-            """)
+            triage_slot = st.empty()
+        
+        slots = {
+            'symptoms': symptoms_slot,
+            'diseases': diseases_slot,
+            'triage': triage_slot,
+            'advice': st.empty(),
+            'pipeline': st.empty()
+        }
+        
+        if pending_input is not None:
+            for slot in (symptoms_slot, diseases_slot, triage_slot):
+                slot.caption("Analizando...")
             
-            # Alerta según severidad
-            if triage['triage_level'] <= 2:
-                st.error("⚠️ ATENCIÓN INMEDIATA REQUERIDA")
-            elif triage['triage_level'] == 3:
-                st.warning("⚠️ Atención prioritaria necesaria")
-            else:
-                st.info("ℹ️ Atención médica recomendada")
+            try:
+                # Cada etapa se muestra en cuanto termina: el triaje llega antes que el ranking
+                result = {}
+                stream = st.session_state.chatbot.stream_patient_input(
+                    pending_input, vital_signs=pending_vital_signs
+                )
+                for stage, value in stream:
+                    result[stage] = value
+                    if stage in slots:
+                        with slots[stage].container():
+                            SECTION_RENDERERS[stage](value)
+                
+                # Limpiar secciones de etapas deshabilitadas
+                for stage, slot in slots.items():
+                    if stage not in result:
+                        slot.empty()
+                
+                # Guardar resultado en session state
+                st.session_state.last_result = result
+                if st.session_state.chatbot.audit_error is not None:
+                    st.error(f"⚠️ El análisis no quedó en el registro de auditoría: "
+                             f"{st.session_state.chatbot.audit_error}")
+                session_store.record_result(session_id, result)
+                st.success("✅ Análisis completado")
+                
+                # Registrar al paciente en la sala de espera
+                st.session_state.patient_counter += 1
+                st.session_state.triage_queue.push(
+                    f"P{st.session_state.patient_counter:04d}",
+                    result['triage']['triage_level'],
+                    data={'name': st.session_state.patient_name,
+                          'age': st.session_state.patient_age}
+                )
+                
+            except Exception as e:
+                st.error(f"Error en el análisis: {str(e)}")
+        else:
+            result = st.session_state.last_result
+            for stage, slot in slots.items():
+                if stage in result:
+                    with slot.container():
+                        SECTION_RENDERERS[stage](result[stage])
+    
+    render_waiting_room(st.session_state.triage_queue)
     
     # Footer
     st.markdown("---")
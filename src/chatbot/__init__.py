@@ -1,11 +1,23 @@
 """Chatbot module for medical triage system"""
 
 from .symptom_analyzer import SymptomAnalyzer
+from .symptom_batch import SymptomBatch
 from .disease_predictor import DiseasePredictor
 from .triage_classifier import TriageClassifier
+from .vital_signs import VitalSignsScorer
+from .triage_queue import TriageQueue
+from .pipeline import TriagePipeline, PipelineStage, Deadline
+from .tenants import TenantRegistry
 
 __all__ = [
     'SymptomAnalyzer',
+    'SymptomBatch',
     'DiseasePredictor',
-    'TriageClassifier'
+    'TriageClassifier',
+    'VitalSignsScorer',
+    'TriageQueue',
+    'TriagePipeline',
+    'PipelineStage',
+    'Deadline',
+    'TenantRegistry'
 ]
\ No newline at end of file
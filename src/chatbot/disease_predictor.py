@@ -2,12 +2,21 @@ import random
 from typing import List, Dict, Any
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+from scipy.sparse import csr_matrix, vstack
 import numpy as np
 
+from ..models.embedding_index import DenseDiseaseIndex
+from ..utils.memoization import MemoCache, MISSING, freeze
+
 class DiseasePredictor:
     """Predictor de enfermedades basado en síntomas."""
     
-    def __init__(self):
+    def __init__(self, shared_index=None, retrieval: str = 'exact',
+                 embedding_index=None, top_k: int = 20, cache_size: int = 4096):
+        # Predicciones memorizadas por multiconjunto de síntomas (se vacía al reentrenar)
+        self.prediction_cache = MemoCache(cache_size)
+        
         # Base de conocimiento médico simplificada
         self.medical_knowledge = {
             'infarto_agudo_miocardio': {
@@ -133,9 +142,33 @@ class DiseasePredictor:
             }
         }
         
-        # Inicializar vectorizador TF-IDF
-        self.vectorizer = TfidfVectorizer()
-        self._prepare_disease_vectors()
+        # Factor multiplicativo por enfermedad (alineado con disease_names) que
+        # un paquete de hospital puede fijar; None equivale a 1.0 para todas
+        self.disease_priors = None
+        
+        # Índice compartido entre procesos (ver src.models.shared_knowledge):
+        # evita entrenar y duplicar las matrices TF-IDF en cada worker
+        self.shared_index = shared_index
+        if shared_index is not None:
+            self.vectorizer = None
+            self.disease_names = list(shared_index.disease_names)
+            self.disease_vectors = shared_index.disease_vectors
+        else:
+            # Inicializar vectorizador TF-IDF
+            self.vectorizer = TfidfVectorizer()
+            self._prepare_disease_vectors()
+        
+        # Recuperación: 'exact' puntúa todas las enfermedades con TF-IDF;
+        # 'dense' busca solo las top_k en el índice de embeddings (LSA)
+        if retrieval not in ('exact', 'dense'):
+            raise ValueError(f"Modo de recuperación desconocido: {retrieval}")
+        self.retrieval = retrieval
+        self.top_k = top_k
+        self.embedding_index = None
+        if retrieval == 'dense':
+            self.embedding_index = embedding_index or DenseDiseaseIndex.build(
+                self.disease_vectors, self.disease_names
+            )
     
     def _prepare_disease_vectors(self):
         """Prepara vectores TF-IDF para las enfermedades."""
@@ -143,30 +176,108 @@ class DiseasePredictor:
         self.disease_names = []
         
         for disease, info in self.medical_knowledge.items():
-            # Crear texto combinando síntomas y descripción
-            text = ' '.join(info['symptoms']) + ' ' + info['description']
-            disease_texts.append(text)
+            disease_texts.append(self.disease_text(info))
             self.disease_names.append(disease)
         
         # Entrenar vectorizador
         self.disease_vectors = self.vectorizer.fit_transform(disease_texts)
+        
+        # La base de conocimiento cambió: las predicciones memorizadas ya no valen
+        self.prediction_cache.clear()
+    
+    @staticmethod
+    def disease_text(info: Dict[str, Any]) -> str:
+        """Texto indexado de una enfermedad: síntomas y descripción."""
+        return ' '.join(info['symptoms']) + ' ' + info['description']
     
     def predict_diseases(self, symptoms: List[str]) -> List[Dict[str, Any]]:
-        """Predice posibles enfermedades basadas en los síntomas."""
+        """Predice posibles enfermedades basadas en los síntomas.
+        
+        El resultado es compartido entre llamadas con los mismos síntomas y es
+        de solo lectura (tupla de FrozenDict).
+        """
         if not symptoms:
             return []
         
+        # El resultado no depende del orden pero sí de las repeticiones (frecuencia TF-IDF)
+        key = tuple(sorted(symptoms))
+        predictions = self.prediction_cache.get(key)
+        if predictions is MISSING:
+            predictions = freeze(self._predict(symptoms))
+            self.prediction_cache.put(key, predictions)
+        return predictions
+    
+    def predict_diseases_batch(self, symptom_batch) -> List[List[Dict[str, Any]]]:
+        """Predicciones para cada documento de un SymptomBatch.
+        
+        Las consultas TF-IDF de todo el lote se obtienen multiplicando la matriz
+        de presencia por la de términos de cada síntoma, y las similitudes con
+        una sola multiplicación de matrices. Mismo resultado que
+        predict_diseases por documento, sin pasar por la caché (en modo denso
+        las similitudes float32 pueden variar en el último bit con el tamaño
+        del lote).
+        """
+        names = [symptom_batch.symptom_names(i) for i in range(len(symptom_batch))]
+        if not symptom_batch.presence.nnz:
+            return [[] for _ in names]
+        
+        queries = self._batch_query_vectors(symptom_batch)
+        if self.embedding_index is not None:
+            indices, scores = self.embedding_index.search(queries, self.top_k)
+            rows = (zip(i.tolist(), s.astype(np.float64)) for i, s in zip(indices, scores))
+        elif self.shared_index is not None:
+            rows = (enumerate(row) for row in (self.disease_vectors @ queries.T).T.toarray())
+        else:
+            rows = (enumerate(row) for row in cosine_similarity(queries, self.disease_vectors))
+        
+        return [self._rank(symptoms, candidates) if symptoms else []
+                for symptoms, candidates in zip(names, rows)]
+    
+    def _batch_query_vectors(self, symptom_batch):
+        """Vectores TF-IDF (una fila por documento) de los síntomas del lote."""
+        if self.shared_index is not None:
+            return vstack([self.shared_index.transform(text) for text in symptom_batch.symptom_texts()],
+                          format='csr')
+        
+        # Recuentos de términos: presencia (documentos x síntomas) @ términos de cada síntoma
+        analyzer = self.vectorizer.build_analyzer()
+        vocabulary = self.vectorizer.vocabulary_
+        rows, columns = [], []
+        for j, (keyword, _) in enumerate(symptom_batch.columns):
+            for token in analyzer(keyword):
+                if token in vocabulary:
+                    rows.append(j)
+                    columns.append(vocabulary[token])
+        terms = csr_matrix((np.ones(len(rows)), (rows, columns)),
+                           shape=(len(symptom_batch.columns), len(vocabulary)))
+        counts = (symptom_batch.presence.astype(np.float64) @ terms).tocsr()
+        counts.sort_indices()
+        
+        # Mismos pasos que TfidfVectorizer.transform sobre los recuentos
+        if self.vectorizer.sublinear_tf:
+            np.log(counts.data, counts.data)
+            counts.data += 1.0
+        counts.data *= self.vectorizer.idf_[counts.indices]
+        if self.vectorizer.norm is not None:
+            counts = normalize(counts, norm=self.vectorizer.norm, copy=False)
+        return counts
+    
+    def _predict(self, symptoms: List[str]) -> List[Dict[str, Any]]:
         # Crear texto de consulta con los síntomas
         query_text = ' '.join(symptoms)
-        query_vector = self.vectorizer.transform([query_text])
-        
-        # Calcular similitudes
-        similarities = cosine_similarity(query_vector, self.disease_vectors)[0]
         
+        # Calcular similitudes (todas las enfermedades, o las top-k en modo denso)
+        return self._rank(symptoms, self._score_candidates(query_text))
+    
+    def _rank(self, symptoms: List[str], candidates) -> List[Dict[str, Any]]:
+        """Top 5 predicciones a partir de pares (índice de enfermedad, similitud)."""
         # Crear lista de predicciones
+        priors = self.disease_priors
         predictions = []
-        for i, disease in enumerate(self.disease_names):
-            confidence = similarities[i]
+        for i, confidence in candidates:
+            disease = self.disease_names[i]
+            if priors is not None:
+                confidence = min(confidence * priors[i], 1.0)
             
             # Solo incluir si la confianza es mayor a un umbral
             if confidence > 0.1:  # Umbral mínimo
@@ -189,6 +300,27 @@ class DiseasePredictor:
         
         return predictions[:5]  # Retornar top 5
     
+    def _score_candidates(self, query_text: str):
+        """Pares (índice de enfermedad, similitud) a considerar para la consulta."""
+        if self.embedding_index is not None:
+            indices, scores = self.embedding_index.search(self._query_vector(query_text), self.top_k)
+            return zip(indices[0].tolist(), scores[0].astype(np.float64))
+        
+        return enumerate(self._similarities(query_text))
+    
+    def _query_vector(self, query_text: str):
+        if self.shared_index is not None:
+            return self.shared_index.transform(query_text)
+        return self.vectorizer.transform([query_text])
+    
+    def _similarities(self, query_text: str) -> np.ndarray:
+        """Similitud coseno entre la consulta y cada enfermedad."""
+        if self.shared_index is not None:
+            return self.shared_index.similarities(query_text)
+        
+        query_vector = self.vectorizer.transform([query_text])
+        return cosine_similarity(query_vector, self.disease_vectors)[0]
+    
     def _get_matching_symptoms(self, patient_symptoms: List[str], disease_symptoms: List[str]) -> List[str]:
         """Obtiene los síntomas que coinciden entre el paciente y la enfermedad."""
         matching = []
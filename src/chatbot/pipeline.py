@@ -0,0 +1,208 @@
+"""Pipeline de triaje por etapas con presupuesto de latencia por solicitud."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import List, Dict, Any, AsyncIterator, Callable, Iterator, Optional, Tuple
+
+
+class Deadline:
+    """Plazo absoluto de una solicitud medido con reloj monotónico."""
+
+    def __init__(self, budget_ms: Optional[float] = None):
+        self.budget_ms = budget_ms
+        self.started_at = time.perf_counter()
+        if budget_ms is None:
+            self.expires_at = None
+        else:
+            self.expires_at = self.started_at + budget_ms / 1000.0
+
+    def remaining_ms(self) -> float:
+        """Milisegundos restantes antes del plazo (infinito si no hay plazo)."""
+        if self.expires_at is None:
+            return float('inf')
+        return (self.expires_at - time.perf_counter()) * 1000.0
+
+    def elapsed_ms(self) -> float:
+        """Milisegundos transcurridos desde el inicio de la solicitud."""
+        return (time.perf_counter() - self.started_at) * 1000.0
+
+    def expired(self) -> bool:
+        return self.remaining_ms() <= 0
+
+
+@dataclass
+class PipelineStage:
+    """Etapa del pipeline. Las etapas obligatorias se ejecutan siempre."""
+    name: str
+    run: Callable[[Dict[str, Any]], Any]
+    mandatory: bool = False
+    estimated_ms: float = 1.0
+    fallback: Optional[Callable[[Dict[str, Any]], Any]] = None
+    empty: Callable[[], Any] = lambda: None
+
+
+class TriagePipeline:
+    """Ejecuta extracción, triaje y etapas opcionales respetando un plazo.
+
+    La extracción de síntomas y el triaje son obligatorios. La predicción de
+    enfermedades, los consejos y el sentimiento se omiten (o se reducen a su
+    versión degradada) cuando el tiempo estimado de la etapa no cabe en el
+    presupuesto restante.
+    """
+
+    MANDATORY_STAGES = ('symptoms', 'triage')
+    OPTIONAL_STAGES = ('diseases', 'advice', 'sentiment')
+
+    # Peso de la última medición en la estimación de duración de cada etapa
+    ESTIMATE_SMOOTHING = 0.2
+
+    def __init__(self, analyzer, predictor, classifier,
+                 optional_stages=OPTIONAL_STAGES,
+                 skip_diseases_on_level_1: bool = False):
+        unknown = set(optional_stages) - set(self.OPTIONAL_STAGES)
+        if unknown:
+            raise ValueError(f"Etapas opcionales desconocidas: {sorted(unknown)}")
+
+        self.analyzer = analyzer
+        self.predictor = predictor
+        self.classifier = classifier
+        self.skip_diseases_on_level_1 = skip_diseases_on_level_1
+
+        self.stages = [
+            stage for stage in self._build_stages()
+            if stage.mandatory or stage.name in optional_stages
+        ]
+        self.estimates = {stage.name: stage.estimated_ms for stage in self.stages}
+
+    def _build_stages(self) -> List[PipelineStage]:
+        """Define las etapas en orden de ejecución (y de entrega al consumidor)."""
+        return [
+            PipelineStage('symptoms', self._extract_symptoms, mandatory=True, empty=list),
+            PipelineStage('triage', self._classify_triage, mandatory=True),
+            PipelineStage('diseases', self._predict_diseases, estimated_ms=2.0, empty=list),
+            PipelineStage('advice', self._generate_advice, estimated_ms=0.1,
+                          fallback=self._fallback_advice),
+            PipelineStage('sentiment', self._analyze_sentiment, estimated_ms=1.0),
+        ]
+
+    def run(self, text: str, budget_ms: Optional[float] = None,
+            vital_signs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Procesa el texto del paciente dentro del presupuesto indicado."""
+        result = dict(self.stream(text, budget_ms=budget_ms, vital_signs=vital_signs))
+        result.setdefault('diseases', [])
+        return result
+
+    def stream(self, text: str, budget_ms: Optional[float] = None,
+               vital_signs: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[str, Any]]:
+        """Produce pares (etapa, resultado) a medida que cada etapa termina.
+
+        El orden es el de las etapas: síntomas, triaje, enfermedades, consejo y
+        sentimiento. El último par es ('pipeline', metadatos de ejecución).
+        """
+        deadline = Deadline(budget_ms)
+        context = {'text': text, 'vital_signs': vital_signs}
+        degraded_stages = []
+        timings = {}
+
+        for stage in self.stages:
+            degraded_names = {entry['stage'] for entry in degraded_stages}
+            reason = self._degradation_reason(stage, context, deadline, degraded_names)
+
+            if reason is None:
+                started = time.perf_counter()
+                context[stage.name] = stage.run(context)
+                elapsed = (time.perf_counter() - started) * 1000.0
+                timings[stage.name] = elapsed
+                self._update_estimate(stage.name, elapsed)
+            elif stage.fallback is not None:
+                started = time.perf_counter()
+                context[stage.name] = stage.fallback(context)
+                timings[stage.name] = (time.perf_counter() - started) * 1000.0
+                degraded_stages.append({'stage': stage.name, 'status': 'truncated', 'reason': reason})
+            else:
+                context[stage.name] = stage.empty()
+                degraded_stages.append({'stage': stage.name, 'status': 'skipped', 'reason': reason})
+
+            yield stage.name, context[stage.name]
+
+        yield 'pipeline', {
+            'budget_ms': budget_ms,
+            'elapsed_ms': deadline.elapsed_ms(),
+            'deadline_exceeded': deadline.expired(),
+            'degraded_stages': degraded_stages,
+            'stage_timings_ms': timings,
+            'cache': self.cache_stats()
+        }
+
+    async def astream(self, text: str, budget_ms: Optional[float] = None,
+                      vital_signs: Optional[Dict[str, Any]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """Variante asíncrona de stream(); cada etapa corre en el executor por defecto."""
+        loop = asyncio.get_running_loop()
+        stages = self.stream(text, budget_ms=budget_ms, vital_signs=vital_signs)
+        done = object()
+
+        while True:
+            item = await loop.run_in_executor(None, next, stages, done)
+            if item is done:
+                return
+            yield item
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Aciertos acumulados de la memoización de cada etapa que la tiene."""
+        caches = (('triage', getattr(self.classifier, 'triage_cache', None)),
+                  ('diseases', getattr(self.predictor, 'prediction_cache', None)))
+        return {stage: cache.stats() for stage, cache in caches if cache is not None}
+
+    def clear_caches(self):
+        """Vacía la memoización de las etapas (mediciones en frío)."""
+        for cache in (getattr(self.classifier, 'triage_cache', None),
+                      getattr(self.predictor, 'prediction_cache', None)):
+            if cache is not None:
+                cache.clear()
+
+    def _degradation_reason(self, stage: PipelineStage, context: Dict[str, Any],
+                            deadline: Deadline, degraded_names: set) -> Optional[str]:
+        """Devuelve el motivo para degradar una etapa, o None si debe ejecutarse."""
+        if stage.mandatory:
+            return None
+
+        if (stage.name == 'diseases' and self.skip_diseases_on_level_1 and
+                context['triage']['triage_level'] == 1):
+            return 'level_1'
+
+        # Sin ranking de enfermedades el consejo solo puede ser el reducido
+        if stage.name == 'advice' and 'diseases' in degraded_names:
+            return 'dependency'
+
+        if deadline.remaining_ms() < self.estimates[stage.name]:
+            return 'budget'
+
+        return None
+
+    def _update_estimate(self, stage_name: str, elapsed_ms: float):
+        previous = self.estimates[stage_name]
+        self.estimates[stage_name] = (
+            (1 - self.ESTIMATE_SMOOTHING) * previous + self.ESTIMATE_SMOOTHING * elapsed_ms
+        )
+
+    # Etapas
+
+    def _extract_symptoms(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.analyzer.extract_symptoms(context['text'])
+
+    def _classify_triage(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        return self.classifier.classify_triage(context['symptoms'], vital_signs=context['vital_signs'])
+
+    def _predict_diseases(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.predictor.predict_diseases([s['symptom'] for s in context['symptoms']])
+
+    def _analyze_sentiment(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        return self.analyzer.analyze_text_sentiment(context['text'])
+
+    def _generate_advice(self, context: Dict[str, Any]) -> str:
+        return self.predictor.generate_medical_advice(context.get('diseases', []))
+
+    def _fallback_advice(self, context: Dict[str, Any]) -> str:
+        """Consejo reducido: solo la recomendación del nivel de triaje."""
+        return context['triage']['recommendation']
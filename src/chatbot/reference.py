@@ -0,0 +1,320 @@
+"""Implementación de referencia congelada de la extracción, el triaje y la predicción
+
+Reproduce el comportamiento de SymptomAnalyzer.extract_symptoms,
+TriageClassifier.classify_triage y DiseasePredictor.predict_diseases con el
+algoritmo más directo posible: sin cachés, sin reglas precompiladas, sin
+tablas de traducción de bytes ni rutas por lotes. Sirve de oráculo para las
+pruebas diferenciales (src.data.differential): cualquier optimización de los
+motores debe devolver exactamente lo mismo.
+
+Las tablas (palabras clave, criterios, plantillas de cada nivel, base de
+conocimiento) y la tabla de plegado no se toman de los componentes en uso:
+se leen de una instantánea versionada, src/data/reference_tables.json. Un
+cambio en las reglas o en el plegado de los motores aparece como divergencia
+hasta que se regenera la instantánea a propósito:
+
+    python -m src.chatbot.reference
+
+El vectorizador TF-IDF y la corrección ortográfica (por fuerza bruta sobre
+todo el vocabulario) se reconstruyen aquí a partir de la instantánea. El
+enrutado por idioma y NEWS2 se delegan en los objetos originales: tienen sus
+propias pruebas y no son lo que se compara aquí. La referencia no lematiza.
+"""
+
+import copy
+import json
+import os
+import re
+from typing import List, Dict, Any, Optional
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from .triage_classifier import TriageLevel
+from .vital_signs import MEASURED_FIELDS
+from ..utils.spelling import spanish_words
+from ..utils.text_folding import FOLD_TABLE
+
+REFERENCE_TABLES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'reference_tables.json')
+
+_WORD = re.compile(r'\w+')
+
+
+def snapshot_tables(analyzer, predictor, classifier) -> Dict[str, Any]:
+    """Tablas de los componentes y tabla de plegado, serializables en JSON."""
+    return {
+        'fold_table': {str(code): folded for code, folded in sorted(FOLD_TABLE.items())},
+        'symptom_keywords': analyzer.symptom_keywords,
+        'urgency_patterns': analyzer.urgency_patterns,
+        'level_1_criteria': classifier.level_1_criteria,
+        'level_2_criteria': classifier.level_2_criteria,
+        'level_3_criteria': classifier.level_3_criteria,
+        'level_4_criteria': classifier.level_4_criteria,
+        'dangerous_combinations': classifier.dangerous_combinations,
+        'important_categories': classifier.important_categories,
+        # Campos fijos de cada nivel (nombre, color, recomendación, intervenciones...)
+        'level_templates': {str(level.level): classifier._create_triage_result(level, [])
+                            for level in TriageLevel},
+        'medical_knowledge': predictor.medical_knowledge
+    }
+
+
+def load_tables(path: str = REFERENCE_TABLES) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as source:
+        tables = json.load(source)
+    tables['fold_table'] = {int(code): folded for code, folded in tables['fold_table'].items()}
+    tables['level_templates'] = {int(level): template for level, template in tables['level_templates'].items()}
+    return tables
+
+
+def osa_distance(source: str, target: str) -> int:
+    """Distancia de alineación óptima (Damerau-Levenshtein restringida), sin cortes."""
+    rows = [[0] * (len(target) + 1) for _ in range(len(source) + 1)]
+    for i in range(len(source) + 1):
+        rows[i][0] = i
+    for j in range(len(target) + 1):
+        rows[0][j] = j
+    for i in range(1, len(source) + 1):
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            rows[i][j] = min(rows[i - 1][j] + 1, rows[i][j - 1] + 1, rows[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1]:
+                rows[i][j] = min(rows[i][j], rows[i - 2][j - 2] + 1)
+    return rows[-1][-1]
+
+
+class ReferenceEngine:
+    """Oráculo sin optimizaciones construido a partir de la instantánea de las tablas.
+
+    De los componentes en uso solo toma el enrutador de idioma, el
+    evaluador NEWS2 y, si la corrección ortográfica está activa, su
+    distancia máxima.
+    """
+
+    def __init__(self, analyzer, predictor, classifier, tables: Optional[Dict[str, Any]] = None):
+        if getattr(analyzer, 'lemmatizer', None) is not None:
+            raise ValueError("La referencia no lematiza: compare motores con lemmatize=False")
+        tables = copy.deepcopy(tables) if tables is not None else load_tables()
+        self.fold_table = tables['fold_table']
+
+        # Extracción
+        self.symptom_keywords = tables['symptom_keywords']
+        self.urgency_patterns = tables['urgency_patterns']
+        self.router = analyzer.router
+
+        # Triaje
+        self.level_1_criteria = tables['level_1_criteria']
+        self.level_2_criteria = tables['level_2_criteria']
+        self.level_3_criteria = tables['level_3_criteria']
+        self.level_4_criteria = tables['level_4_criteria']
+        self.dangerous_combinations = tables['dangerous_combinations']
+        self.important_categories = tables['important_categories']
+        self.vital_signs_scorer = classifier.vital_signs_scorer
+        self.level_templates = tables['level_templates']
+
+        # Predicción
+        self.medical_knowledge = tables['medical_knowledge']
+        self.disease_names = list(self.medical_knowledge)
+        self.vectorizer = TfidfVectorizer()
+        self.disease_vectors = self.vectorizer.fit_transform(
+            [' '.join(info['symptoms']) + ' ' + info['description'] for info in self.medical_knowledge.values()]
+        )
+
+        # Corrección ortográfica (misma configuración por defecto que SymSpellIndex)
+        self.max_distance = None
+        if analyzer.spelling_index is not None:
+            self.max_distance = analyzer.spelling_index.max_distance
+            self.vocabulary = sorted(self._vocabulary())
+            self.known_words = set(spanish_words()) | set(self.vocabulary)
+
+    def fold(self, text: str) -> str:
+        """Plegado carácter a carácter con la tabla de la instantánea."""
+        return ''.join(self.fold_table.get(ord(char), char) for char in text)
+
+    def transform(self, query: str):
+        return self.vectorizer.transform([query])
+
+    # Extracción de síntomas
+
+    def extract_symptoms(self, text: str) -> List[Dict[str, Any]]:
+        if not text or not text.strip():
+            return []
+        if self.router is not None:
+            _, text = self.router.route(text)
+
+        text = self.fold(text).strip()
+        if self.max_distance is not None:
+            text = _WORD.sub(lambda match: self._correct(match.group()), text)
+
+        symptoms = []
+        seen = set()
+        for category, data in self.symptom_keywords.items():
+            for keyword in data['keywords']:
+                if keyword in text and (keyword, category) not in seen:
+                    seen.add((keyword, category))
+                    symptoms.append({
+                        'symptom': keyword,
+                        'category': category,
+                        'severity': self._severity(text, data['severity_indicators']),
+                        'urgency_level': self._urgency(text)
+                    })
+        return symptoms
+
+    def _vocabulary(self):
+        phrases = []
+        for data in self.symptom_keywords.values():
+            phrases.extend(data['keywords'])
+        for table in (self.level_1_criteria, self.level_2_criteria):
+            for criteria in table.values():
+                phrases.extend(criteria)
+        phrases.extend(self.level_3_criteria)
+        phrases.extend(self.level_4_criteria)
+        for info in self.medical_knowledge.values():
+            phrases.extend(info['symptoms'])
+        return {word for phrase in phrases for word in _WORD.findall(self.fold(phrase))}
+
+    def _correct(self, token: str) -> str:
+        # Palabras conocidas y cifras no se corrigen; ningún error hasta 4 letras, uno hasta 7
+        if token in self.known_words or token.isdigit() or len(token) <= 4:
+            return token
+        limit = min(1, self.max_distance) if len(token) <= 7 else self.max_distance
+        best = None
+        for term in self.vocabulary:
+            distance = osa_distance(token, term)
+            if distance > limit:
+                continue
+            prefix = 0
+            while prefix < min(len(token), len(term)) and token[prefix] == term[prefix]:
+                prefix += 1
+            key = (distance, -prefix, term)
+            if best is None or key < best:
+                best = key
+        return best[2] if best is not None else token
+
+    def _severity(self, text: str, indicators: Dict[str, List[str]]) -> str:
+        for severity, terms in indicators.items():
+            for term in terms:
+                if term in text:
+                    return severity
+        return 'moderado'
+
+    def _urgency(self, text: str) -> int:
+        score = sum(1 for pattern in self.urgency_patterns if re.search(pattern, text, re.IGNORECASE))
+        if score >= 3:
+            return 1
+        if score >= 2:
+            return 2
+        if score >= 1:
+            return 3
+        return 4
+
+    # Triaje
+
+    def classify_triage(self, symptoms: List[Dict[str, Any]],
+                        vital_signs: Dict[str, Any] = None) -> Dict[str, Any]:
+        level, reasons = self._classify(symptoms)
+
+        news = None
+        if vital_signs and any(vital_signs.get(field) is not None for field in MEASURED_FIELDS):
+            news = self.vital_signs_scorer.score(vital_signs)
+            if news['triage_level'] < level:
+                level = news['triage_level']
+                reasons = reasons + [f"Escalado por signos vitales: NEWS2 = {news['news2_score']}"]
+
+        result = copy.deepcopy(self.level_templates[level])
+        result['reasoning'] = reasons
+        if news is not None:
+            result['vital_signs'] = news
+        return result
+
+    def _classify(self, symptoms: List[Dict[str, Any]]):
+        if not symptoms:
+            return 5, ["No se detectaron síntomas específicos"]
+
+        text = self.fold(' '.join(s.get('symptom', '') for s in symptoms))
+
+        reasons = []
+        for category, criteria in self.level_1_criteria.items():
+            reasons += [f"Criterio crítico detectado: {c} ({category})" for c in criteria if c in text]
+        for first, second in self.dangerous_combinations:
+            if any(term in text for term in first) and any(term in text for term in second):
+                reasons.append(f"Combinación crítica: {' + '.join(first + second)}")
+        if sum(1 for s in symptoms if s.get('severity') == 'severo') >= 2:
+            reasons.append("Múltiples síntomas severos detectados")
+        if reasons:
+            return 1, reasons
+
+        for category, criteria in self.level_2_criteria.items():
+            reasons += [f"Criterio de emergencia: {c} ({category})" for c in criteria if c in text]
+        for s in symptoms:
+            if s.get('category') in self.important_categories and s.get('severity') == 'severo':
+                reasons.append(f"Síntoma severo en sistema {s.get('category')}")
+        if reasons:
+            return 2, reasons
+
+        reasons += [f"Criterio de urgencia: {c}" for c in self.level_3_criteria if c in text]
+        if [s.get('severity', 'leve') for s in symptoms].count('moderado') >= 2:
+            reasons.append("Múltiples síntomas moderados")
+        if reasons:
+            return 3, reasons
+
+        reasons += [f"Síntoma menor: {c}" for c in self.level_4_criteria if c in text]
+        if reasons:
+            return 4, reasons
+
+        return 5, ["Síntomas de severidad leve, no requiere atención inmediata"]
+
+    def classify_level(self, symptoms: List[Dict[str, Any]],
+                       vital_signs: Dict[str, Any] = None) -> int:
+        return self.classify_triage(symptoms, vital_signs)['triage_level']
+
+    # Predicción de enfermedades
+
+    def predict_diseases(self, symptoms: List[str]) -> List[Dict[str, Any]]:
+        if not symptoms:
+            return []
+
+        similarities = cosine_similarity(self.transform(' '.join(symptoms)), self.disease_vectors)[0]
+        predictions = []
+        for disease, confidence in zip(self.disease_names, similarities):
+            if confidence > 0.1:
+                info = self.medical_knowledge[disease]
+                predictions.append({
+                    'disease': disease.replace('_', ' ').title(),
+                    'confidence': confidence,
+                    'severity': info['severity'],
+                    'description': info['description'],
+                    'recommendations': info['recommendations'],
+                    'matching_symptoms': self._matching(symptoms, info['symptoms'])
+                })
+        predictions.sort(key=lambda p: p['confidence'], reverse=True)
+
+        severe = any(word in ' '.join(symptoms).lower()
+                     for word in ['severo', 'intenso', 'agudo', 'insoportable', 'crítico'])
+        for prediction in predictions:
+            if severe and prediction['severity'] in ['critico', 'alto']:
+                prediction['confidence'] = min(prediction['confidence'] * 1.3, 1.0)
+            symptom_factor = min(len(prediction['matching_symptoms']) / 3, 1.0)
+            prediction['confidence_score'] = min(prediction['confidence'] * 0.7 + symptom_factor * 0.3, 1.0)
+        predictions.sort(key=lambda p: p['confidence'], reverse=True)
+        return predictions[:5]
+
+    @staticmethod
+    def _matching(patient: List[str], disease: List[str]) -> List[str]:
+        matching = []
+        for p_symptom in patient:
+            for d_symptom in disease:
+                if d_symptom in p_symptom or p_symptom in d_symptom:
+                    matching.append(d_symptom)
+                    break
+        return list(set(matching))
+
+
+if __name__ == "__main__":
+    # Regenera la instantánea tras un cambio intencionado de las reglas o del plegado
+    from . import SymptomAnalyzer, DiseasePredictor, TriageClassifier
+
+    with open(REFERENCE_TABLES, 'w', encoding='utf-8') as target:
+        json.dump(snapshot_tables(SymptomAnalyzer(), DiseasePredictor(), TriageClassifier()),
+                  target, ensure_ascii=False, indent=1)
+        target.write('\n')
@@ -2,12 +2,20 @@ import re
 import spacy
 from typing import List, Dict, Any
 from textblob import TextBlob
-from langdetect import detect
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .symptom_batch import SymptomBatch
+from ..utils.lemmatizer import Lemmatizer
+from ..utils.language import LanguageRouter
+from ..utils.term_matrix import TermCorpus, SEPARATOR
+from ..utils.text_folding import fold_text, fold_terms
 
 class SymptomAnalyzer:
     """Analizador de síntomas que extrae y categoriza síntomas del texto de entrada."""
     
-    def __init__(self):
+    def __init__(self, lemmatize: bool = False, spelling_index=None, languages=('es',)):
         # Intentar cargar el modelo de spaCy en español
         try:
             self.nlp = spacy.load("es_core_news_sm")
@@ -15,6 +23,15 @@ class SymptomAnalyzer:
             print("Modelo spaCy 'es_core_news_sm' no encontrado. Usando procesamiento básico.")
             self.nlp = None
         
+        # Lematización opcional: reconoce formas flexionadas (mareada, vomitando)
+        self.lemmatizer = Lemmatizer(self.nlp) if lemmatize and self.nlp is not None else None
+        
+        # Corrección ortográfica opcional antes de la extracción (SymSpellIndex)
+        self.spelling_index = spelling_index
+        
+        # Entradas en otros idiomas (en, pt) se traducen al vocabulario en español
+        self.router = LanguageRouter(languages) if tuple(languages) != ('es',) else None
+        
         # Diccionario de síntomas por categoría
         self.symptom_keywords = {
             'dolor': {
@@ -63,6 +80,38 @@ class SymptomAnalyzer:
             }
         }
         
+        # Tablas sin acentos ni mayúsculas, igual que el texto de entrada plegado
+        for data in self.symptom_keywords.values():
+            data['keywords'] = fold_terms(data['keywords'])
+            for severity, indicators in data['severity_indicators'].items():
+                data['severity_indicators'][severity] = fold_terms(indicators)
+        
+        # Verbo de cada sustantivo clave: el lema de "vomitando" es vomitar, no vomito
+        self.keyword_verbs = {
+            'vomito': 'vomitar',
+            'mareo': 'marear',
+            'desmayo': 'desmayar',
+            'ahogo': 'ahogar',
+            'jadeo': 'jadear',
+            'sudor': 'sudar',
+            'ardor': 'arder',
+            'pinchazo': 'pinchar',
+            'silbido': 'silbar',
+            'dolor': 'doler',
+            'tos': 'toser'
+        }
+        
+        # Lema -> palabras clave cuyo lema coincide pero que difieren de él (duele -> doler, vomitar -> vomito)
+        self._lemma_keywords = {}
+        if self.lemmatizer is not None:
+            keywords = sorted({k for data in self.symptom_keywords.values() for k in data['keywords']})
+            for keyword, lemmas in zip(keywords, self.lemmatizer.lemmatize_batch(keywords)):
+                if keyword in self.keyword_verbs:
+                    lemmas = lemmas + [self.keyword_verbs[keyword]]
+                for lemma in lemmas:
+                    if lemma != keyword and keyword not in self._lemma_keywords.get(lemma, ()):
+                        self._lemma_keywords.setdefault(lemma, []).append(keyword)
+        
         # Patrones de urgencia
         self.urgency_patterns = [
             r'\b(severo|intenso|fuerte|insoportable|terrible)\b',
@@ -76,13 +125,14 @@ class SymptomAnalyzer:
         if not text or not text.strip():
             return []
         
-        text = text.lower().strip()
+        text = self._normalize(text)
+        match_text = self._with_lemmas(text)
         symptoms = []
         
         # Procesar cada categoría de síntomas
         for category, data in self.symptom_keywords.items():
             for keyword in data['keywords']:
-                if keyword in text:
+                if keyword in match_text:
                     # Encontrar síntoma
                     symptom_info = {
                         'symptom': keyword,
@@ -103,6 +153,121 @@ class SymptomAnalyzer:
         
         return unique_symptoms
     
+    def extract_symptoms_batch(self, texts: List[str], n_process: int = 1) -> SymptomBatch:
+        """Extrae los síntomas de un lote de textos con matrices dispersas.
+        
+        Cada palabra clave, indicador de severidad y patrón de urgencia se busca
+        una sola vez en todo el lote (ver TermCorpus); la severidad por
+        categoría y la urgencia por documento salen de operaciones sobre esas
+        matrices. batch.symptoms(i) coincide con extract_symptoms(texts[i]).
+        Con lematización, n_process > 1 reparte el modelo entre varios procesos.
+        """
+        texts = self._normalize_batch(texts)
+        match_texts = self._with_lemmas_batch(texts, n_process)
+        categories = list(self.symptom_keywords)
+        
+        # Columnas de síntomas: (palabra clave, categoría) en el orden de extract_symptoms
+        columns, column_categories = [], []
+        for c, data in enumerate(self.symptom_keywords.values()):
+            for keyword in data['keywords']:
+                if (keyword, categories[c]) not in columns:
+                    columns.append((keyword, categories[c]))
+                    column_categories.append(c)
+        presence = TermCorpus(match_texts).matrix([keyword for keyword, _ in columns])
+        
+        # Indicadores de severidad: grupos (categoría, severidad) en el orden de las tablas
+        severity_names = ['moderado']
+        indicators, groups = [], []
+        for c, data in enumerate(self.symptom_keywords.values()):
+            for severity, terms in data['severity_indicators'].items():
+                if severity not in severity_names:
+                    severity_names.append(severity)
+                groups.append((c, severity_names.index(severity)))
+                indicators.extend((term, len(groups) - 1) for term in terms)
+        corpus = TermCorpus(texts)
+        found = corpus.matrix([term for term, _ in indicators])
+        membership = csr_matrix(
+            (np.ones(len(indicators)), (np.arange(len(indicators)), [group for _, group in indicators])),
+            shape=(len(indicators), len(groups))
+        )
+        group_found = (found @ membership).toarray() > 0
+        
+        # Severidad por categoría: el primer grupo con algún indicador; si no, 'moderado'
+        severity = np.zeros((len(texts), len(categories)), dtype=np.int8)
+        for c in range(len(categories)):
+            positions = [g for g, (category, _) in enumerate(groups) if category == c]
+            if not positions:
+                continue
+            hits = group_found[:, positions]
+            codes = np.array([groups[g][1] for g in positions], dtype=np.int8)
+            severity[:, c] = np.where(hits.any(axis=1), codes[hits.argmax(axis=1)], 0)
+        
+        # Urgencia: número de patrones presentes -> nivel (3+ -> 1, 2 -> 2, 1 -> 3, 0 -> 4)
+        patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.urgency_patterns]
+        score = np.asarray(corpus.pattern_matrix(patterns).sum(axis=1)).ravel()
+        urgency = (4 - np.minimum(score, 3)).astype(np.int8)
+        
+        return SymptomBatch(
+            columns=tuple(columns),
+            categories=tuple(categories),
+            column_categories=np.array(column_categories, dtype=np.intp),
+            severity_names=tuple(severity_names),
+            presence=presence,
+            severity=severity,
+            urgency=urgency
+        )
+    
+    def detect_language(self, text: str) -> str:
+        """Idioma de la entrada ('es' si solo está habilitado el español)."""
+        return self.router.detect(text) if self.router is not None else 'es'
+    
+    def _normalize(self, text: str) -> str:
+        """Traduce, pliega y corrige el texto antes de buscar palabras clave."""
+        if self.router is not None:
+            _, text = self.router.route(text)
+        
+        # Un solo plegado por solicitud: minúsculas y sin acentos (corazón -> corazon)
+        text = fold_text(text).strip()
+        if self.spelling_index is not None:
+            text = self.spelling_index.correct_text(text)
+        return text
+    
+    def _normalize_batch(self, texts: List[str]) -> List[str]:
+        """_normalize para un lote; los textos vacíos quedan como ''."""
+        texts = [text if text and text.strip() else '' for text in texts]
+        if self.router is not None:
+            texts = [self.router.route(text)[1] if text else text for text in texts]
+        
+        # Plegado y corrección van carácter a carácter y palabra a palabra: se
+        # aplican al lote unido salvo que algún texto contenga el separador
+        joined = SEPARATOR.join(texts)
+        if not texts or joined.count(SEPARATOR) != len(texts) - 1:
+            return [self._normalize(text) if text else text for text in texts]
+        
+        joined = SEPARATOR.join(text.strip() for text in fold_text(joined).split(SEPARATOR))
+        if self.spelling_index is not None:
+            joined = self.spelling_index.correct_text(joined)
+        return joined.split(SEPARATOR)
+    
+    def _with_lemmas(self, text: str) -> str:
+        """Añade al texto sus lemas y las palabras clave que comparten lema."""
+        if self.lemmatizer is None:
+            return text
+        return self._append_lemmas(text, self.lemmatizer.lemmatize(text))
+    
+    def _with_lemmas_batch(self, texts: List[str], n_process: int = 1) -> List[str]:
+        """_with_lemmas para un lote, con una sola pasada del lematizador."""
+        if self.lemmatizer is None:
+            return texts
+        return [self._append_lemmas(text, lemmas) if text else text
+                for text, lemmas in zip(texts, self.lemmatizer.lemmatize_batch(texts, n_process=n_process))]
+    
+    def _append_lemmas(self, text: str, lemmas: List[str]) -> str:
+        extra = list(lemmas)
+        for lemma in lemmas:
+            extra.extend(self._lemma_keywords.get(lemma, ()))
+        return text + ' ' + fold_text(' '.join(extra))
+    
     def _assess_severity(self, text: str, symptom: str, severity_indicators: Dict) -> str:
         """Evalua la severidad de un síntoma."""
         # Buscar indicadores de severidad cerca del síntoma
@@ -0,0 +1,76 @@
+"""Síntomas de un lote de textos en forma matricial
+
+SymptomAnalyzer.extract_symptoms_batch devuelve un SymptomBatch en lugar de
+una lista de diccionarios por texto. TriageClassifier.classify_levels y
+DiseasePredictor.predict_diseases_batch lo consumen directamente; symptoms(i)
+reconstruye la salida de extract_symptoms solo cuando hace falta.
+"""
+
+from dataclasses import dataclass
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+@dataclass(frozen=True)
+class SymptomBatch:
+    """Presencia, severidad y urgencia de los síntomas de un lote.
+
+    presence: CSR (documentos x columnas); la columna j es el síntoma
+    columns[j] = (palabra clave, categoría). Las columnas siguen el orden en
+    que extract_symptoms devuelve los síntomas, así que los índices de cada
+    fila, ordenados, reproducen la lista de un texto.
+    severity: (documentos x categorías) índices en severity_names.
+    urgency: nivel de urgencia (1-4) por documento.
+    """
+    columns: Tuple[Tuple[str, str], ...]
+    categories: Tuple[str, ...]
+    column_categories: np.ndarray
+    severity_names: Tuple[str, ...]
+    presence: csr_matrix
+    severity: np.ndarray
+    urgency: np.ndarray
+
+    def __len__(self) -> int:
+        return self.presence.shape[0]
+
+    def symptom_names(self, index: int) -> List[str]:
+        """Palabras clave detectadas en el documento, en orden de salida."""
+        indptr, indices = self.presence.indptr, self.presence.indices
+        return [self.columns[j][0] for j in indices[indptr[index]:indptr[index + 1]].tolist()]
+
+    def symptom_texts(self) -> List[str]:
+        """Palabras clave de cada documento unidas por espacios (texto de las reglas)."""
+        return [' '.join(self.symptom_names(index)) for index in range(len(self))]
+
+    def entry_rows(self) -> np.ndarray:
+        """Documento de cada entrada no nula de presence."""
+        return np.repeat(np.arange(len(self)), np.diff(self.presence.indptr))
+
+    def entry_severities(self) -> np.ndarray:
+        """Severidad (índice en severity_names) de cada entrada no nula de presence."""
+        return self.severity[self.entry_rows(), self.column_categories[self.presence.indices]]
+
+    def severity_code(self, name: str) -> int:
+        """Índice de una severidad, o -1 si ninguna tabla la usa."""
+        return self.severity_names.index(name) if name in self.severity_names else -1
+
+    def symptoms(self, index: int) -> List[Dict[str, Any]]:
+        """Misma lista de diccionarios que extract_symptoms para el documento."""
+        indptr, indices = self.presence.indptr, self.presence.indices
+        urgency = int(self.urgency[index])
+        severity = self.severity[index]
+        symptoms = []
+        for j in indices[indptr[index]:indptr[index + 1]].tolist():
+            keyword, category = self.columns[j]
+            symptoms.append({
+                'symptom': keyword,
+                'category': category,
+                'severity': self.severity_names[severity[self.column_categories[j]]],
+                'urgency_level': urgency
+            })
+        return symptoms
+
+    def to_lists(self) -> List[List[Dict[str, Any]]]:
+        return [self.symptoms(index) for index in range(len(self))]
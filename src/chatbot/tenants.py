@@ -0,0 +1,258 @@
+"""Paquetes de reglas y conocimiento por hospital en un solo proceso
+
+Cada hospital (tenant) se describe con un paquete JSON que expresa cambios
+sobre las tablas base: criterios de triaje por nivel, combinaciones
+peligrosas, categorías importantes, entradas de la base de conocimiento y
+factores a priori por enfermedad. Una lista se sustituye entera o se
+modifica con {"add": [...], "remove": [...]}; una enfermedad a null se
+elimina y un diccionario parcial se mezcla con la entrada base.
+
+TenantRegistry compila todos los paquetes al arrancar. Lo que no cambia se
+guarda una sola vez: los criterios son tuplas internadas y compartidas entre
+hospitales, las entradas de conocimiento sin cambios son los mismos objetos
+que las de la base, y los hospitales cuyo texto indexado de enfermedades
+coincide comparten vectorizador y matriz TF-IDF. El analizador de síntomas
+y la puntuación NEWS2 son los de la base. Elegir el hospital de una
+solicitud es una búsqueda en un diccionario.
+"""
+
+import copy
+import glob
+import json
+import os
+import sys
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .disease_predictor import DiseasePredictor
+from .pipeline import TriagePipeline
+from ..models.embedding_index import DenseDiseaseIndex
+from ..utils.memoization import MemoCache
+from ..utils.text_folding import fold_text
+
+TENANT_PACKS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'tenant_packs')
+
+# Hospital de las solicitudes que no indican ninguno: las tablas base sin cambios
+DEFAULT_TENANT = 'default'
+
+# Tablas de TriageClassifier que un paquete puede modificar
+CRITERIA_TABLES = ('level_1_criteria', 'level_2_criteria')
+CRITERIA_LISTS = ('level_3_criteria', 'level_4_criteria', 'important_categories')
+
+
+def load_pack(path: str) -> Dict[str, Any]:
+    """Paquete de un hospital; el nombre por defecto es el del fichero."""
+    with open(path, 'r', encoding='utf-8') as source:
+        pack = json.load(source)
+    pack.setdefault('tenant', os.path.splitext(os.path.basename(path))[0])
+    return pack
+
+
+def load_packs(directory: str = TENANT_PACKS_DIR) -> Dict[str, Dict[str, Any]]:
+    """Paquetes de todos los JSON del directorio, por nombre de hospital."""
+    packs = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+        pack = load_pack(path)
+        packs[pack['tenant']] = pack
+    return packs
+
+
+def apply_list_override(base: List[Any], override) -> List[Any]:
+    """Lista resultante de una sustitución (lista) o de {"add": [...], "remove": [...]}."""
+    if override is None:
+        return list(base)
+    if isinstance(override, list):
+        return list(override)
+    removed = override.get('remove', [])
+    result = [item for item in base if item not in removed]
+    result.extend(item for item in override.get('add', []) if item not in result)
+    return result
+
+
+def apply_knowledge_override(base: Dict[str, Dict[str, Any]],
+                             override: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Base de conocimiento con altas, bajas (null) y cambios parciales por enfermedad.
+
+    Las entradas sin cambios son los mismos objetos que las de la base.
+    """
+    knowledge = dict(base)
+    for disease, entry in (override or {}).items():
+        if entry is None:
+            knowledge.pop(disease, None)
+        elif disease in knowledge:
+            knowledge[disease] = {**knowledge[disease], **entry}
+        else:
+            missing = {'symptoms', 'severity', 'description', 'recommendations'} - set(entry)
+            if missing:
+                raise ValueError(f"Enfermedad nueva '{disease}' sin campos {sorted(missing)}")
+            knowledge[disease] = dict(entry)
+    return knowledge
+
+
+def _fold_strings(value):
+    """Pliega los términos (no las claves) de una sección de triaje."""
+    if isinstance(value, str):
+        return fold_text(value)
+    if isinstance(value, list):
+        return [_fold_strings(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _fold_strings(item) for key, item in value.items()}
+    return value
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """Componentes ya compilados de un hospital."""
+    name: str
+    classifier: Any
+    predictor: Any
+    pipeline: TriagePipeline
+
+    @property
+    def rules_version(self) -> str:
+        return self.classifier.rules_version
+
+
+class TenantRegistry:
+    """Hospitales compilados sobre unos componentes base; selección en O(1)."""
+
+    def __init__(self, base_pipeline: TriagePipeline, packs: Optional[Dict[str, Dict[str, Any]]] = None,
+                 cache_size: int = 1024):
+        self.base = base_pipeline
+        self.cache_size = cache_size
+        # Estructuras compartidas entre hospitales: tuplas internadas e índices de enfermedades
+        self._interned: Dict[Any, Any] = {}
+        self._indexes: Dict[tuple, tuple] = {}
+
+        predictor = base_pipeline.predictor
+        self._indexes[self._index_key(predictor.medical_knowledge)] = (
+            predictor.vectorizer, predictor.shared_index, predictor.disease_vectors, predictor.embedding_index
+        )
+
+        self.tenants: Dict[str, Tenant] = {
+            DEFAULT_TENANT: Tenant(DEFAULT_TENANT, base_pipeline.classifier, predictor, base_pipeline)
+        }
+        for name, pack in (packs or {}).items():
+            self.tenants[name] = self._compile(name, pack)
+
+    @classmethod
+    def from_directory(cls, base_pipeline: TriagePipeline, directory: str = TENANT_PACKS_DIR,
+                       **options) -> 'TenantRegistry':
+        return cls(base_pipeline, load_packs(directory), **options)
+
+    def get(self, tenant: Optional[str] = None) -> Tenant:
+        """Hospital por nombre (None para el de por defecto)."""
+        try:
+            return self.tenants[tenant or DEFAULT_TENANT]
+        except KeyError:
+            raise ValueError(f"Hospital desconocido: {tenant}") from None
+
+    def pipeline(self, tenant: Optional[str] = None) -> TriagePipeline:
+        return self.get(tenant).pipeline
+
+    def names(self) -> List[str]:
+        return list(self.tenants)
+
+    def shared_stats(self) -> Dict[str, int]:
+        """Hospitales, índices de enfermedades distintos y estructuras internadas."""
+        return {'tenants': len(self.tenants), 'disease_indexes': len(self._indexes),
+                'interned': len(self._interned)}
+
+    # Compilación
+
+    def _compile(self, name: str, pack: Dict[str, Any]) -> Tenant:
+        classifier = self._compile_classifier(pack.get('triage', {}))
+        predictor = self._compile_predictor(pack.get('knowledge', {}), pack.get('priors', {}))
+
+        base = self.base
+        optional_stages = [stage.name for stage in base.stages if not stage.mandatory]
+        pipeline = TriagePipeline(base.analyzer, predictor, classifier, optional_stages=optional_stages,
+                                  skip_diseases_on_level_1=base.skip_diseases_on_level_1)
+        return Tenant(name, classifier, predictor, pipeline)
+
+    def _compile_classifier(self, overrides: Dict[str, Any]):
+        base = self.base.classifier
+        unknown = set(overrides) - set(CRITERIA_TABLES) - set(CRITERIA_LISTS) - {'dangerous_combinations'}
+        if unknown:
+            raise ValueError(f"Tablas de triaje desconocidas: {sorted(unknown)}")
+
+        # Las tablas base ya están plegadas: los términos del paquete también
+        overrides = _fold_strings(overrides)
+
+        # Copia superficial: comparte la puntuación NEWS2 y los métodos; las tablas son propias
+        classifier = copy.copy(base)
+        classifier.triage_cache = MemoCache(self.cache_size)
+        for table in CRITERIA_TABLES:
+            changes = overrides.get(table, {})
+            criteria = {category: apply_list_override(terms, changes.get(category))
+                        for category, terms in getattr(base, table).items()}
+            criteria.update({category: apply_list_override([], terms)
+                             for category, terms in changes.items() if category not in criteria})
+            setattr(classifier, table, criteria)
+        for table in CRITERIA_LISTS:
+            setattr(classifier, table, apply_list_override(getattr(base, table), overrides.get(table)))
+
+        combinations = [[list(first), list(second)] for first, second in base.dangerous_combinations]
+        combinations = apply_list_override(combinations, overrides.get('dangerous_combinations'))
+        classifier.dangerous_combinations = [(list(first), list(second)) for first, second in combinations]
+
+        classifier._compile_level_rules()
+
+        # Las reglas compiladas iguales entre hospitales se guardan una sola vez
+        for table in CRITERIA_TABLES:
+            setattr(classifier, table, {self._intern(category): self._intern(tuple(terms))
+                                        for category, terms in getattr(classifier, table).items()})
+        for attribute in ('level_3_criteria', 'level_4_criteria', '_level_1_terms', '_level_2_terms',
+                          '_level_3_terms', '_level_4_terms', '_dangerous_combinations'):
+            setattr(classifier, attribute, self._intern(tuple(getattr(classifier, attribute))))
+        classifier._important_categories = self._intern(classifier._important_categories)
+        return classifier
+
+    def _compile_predictor(self, overrides: Dict[str, Any], priors: Dict[str, float]):
+        base = self.base.predictor
+        knowledge = apply_knowledge_override(base.medical_knowledge, overrides)
+        unknown = set(priors) - set(knowledge)
+        if unknown:
+            raise ValueError(f"Factores a priori de enfermedades desconocidas: {sorted(unknown)}")
+
+        predictor = copy.copy(base)
+        predictor.prediction_cache = MemoCache(self.cache_size)
+        predictor.medical_knowledge = knowledge
+        predictor.disease_names = list(knowledge)
+        (predictor.vectorizer, predictor.shared_index,
+         predictor.disease_vectors, predictor.embedding_index) = self._disease_index(knowledge)
+        predictor.disease_priors = (
+            np.array([priors.get(disease, 1.0) for disease in knowledge], dtype=np.float64)
+            if priors else None
+        )
+        return predictor
+
+    @staticmethod
+    def _index_key(knowledge: Dict[str, Dict[str, Any]]) -> tuple:
+        return tuple((disease, DiseasePredictor.disease_text(info)) for disease, info in knowledge.items())
+
+    def _disease_index(self, knowledge: Dict[str, Dict[str, Any]]) -> tuple:
+        """Vectorizador, índice compartido, matriz TF-IDF e índice denso para estas enfermedades."""
+        key = self._index_key(knowledge)
+        index = self._indexes.get(key)
+        if index is None:
+            base = self.base.predictor
+            params = base.vectorizer.get_params() if base.vectorizer is not None else {}
+            vectorizer = TfidfVectorizer(**params)
+            vectors = vectorizer.fit_transform([text for _, text in key])
+            embedding_index = None
+            if base.embedding_index is not None:
+                embedding_index = DenseDiseaseIndex.build(vectors, [disease for disease, _ in key])
+            index = self._indexes[key] = (vectorizer, None, vectors, embedding_index)
+        return index
+
+    def _intern(self, value):
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, tuple):
+            value = tuple(self._intern(item) for item in value)
+        return self._interned.setdefault(value, value)
+
@@ -1,7 +1,17 @@
+import hashlib
+import json
 from enum import Enum
 from typing import List, Dict, Any
 from dataclasses import dataclass
 
+import numpy as np
+
+from .symptom_batch import SymptomBatch
+from .vital_signs import VitalSignsScorer, has_readings
+from ..utils.term_matrix import TermCorpus
+from ..utils.text_folding import fold_text, fold_terms
+from ..utils.memoization import MemoCache, MISSING, freeze
+
 class TriageLevel(Enum):
     """Niveles de triaje según protocolo hospitalario estándar."""
     LEVEL_1 = (1, "Resucitación", "Rojo", "Inmediata", "Emergencia crítica, riesgo vital inmediato")
@@ -17,6 +27,11 @@ class TriageLevel(Enum):
         self.max_wait = max_wait
         self.description = description
 
+TRIAGE_LEVELS_BY_NUMBER = {triage_level.level: triage_level for triage_level in TriageLevel}
+
+# Tiempo máximo de espera en minutos por nivel (0 = atención inmediata)
+MAX_WAIT_MINUTES = {1: 0, 2: 10, 3: 30, 4: 60, 5: 120}
+
 @dataclass
 class TriageResult:
     """Resultado de la clasificación de triaje."""
@@ -32,7 +47,10 @@ class TriageResult:
 class TriageClassifier:
     """Clasificador de triaje médico basado en protocolos hospitalarios."""
     
-    def __init__(self):
+    def __init__(self, cache_size: int = 4096):
+        # Resultados memorizados por síntomas; se vacía al recompilar las reglas
+        self.triage_cache = MemoCache(cache_size)
+        
         # Criterios críticos para Nivel 1 (Resucitación)
         self.level_1_criteria = {
             'cardiovascular_critical': [
@@ -84,15 +102,83 @@ class TriageClassifier:
             'dolor leve', 'fiebre baja', 'tos', 'resfriado',
             'lesion menor', 'esguince'
         ]
+        
+        # Combinaciones peligrosas de Nivel 1
+        self.dangerous_combinations = [
+            (['dolor', 'pecho'], ['sudor', 'sudoracion']),
+            (['dificultad', 'respirar'], ['dolor', 'pecho']),
+            (['confusion'], ['debilidad']),
+        ]
+        
+        # Categorías donde un síntoma severo implica Nivel 2
+        self.important_categories = ['cardiovascular', 'respiratorio', 'neurologico']
+        
+        # Puntuación de alerta temprana (NEWS2) para escalar con signos vitales
+        self.vital_signs_scorer = VitalSignsScorer()
+        
+        self._compile_level_rules()
     
-    def classify_triage(self, symptoms: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Clasifica el nivel de triaje basado en los síntomas."""
+    def _compile_level_rules(self):
+        """Precompila los criterios para classify_level y calcula la versión de las reglas.
+        
+        Debe llamarse de nuevo si se modifican las tablas de criterios. Las
+        tablas se pliegan (minúsculas, sin acentos) igual que el texto de entrada.
+        """
+        for table in (self.level_1_criteria, self.level_2_criteria):
+            for category, criteria in table.items():
+                table[category] = fold_terms(criteria)
+        self.level_3_criteria = fold_terms(self.level_3_criteria)
+        self.level_4_criteria = fold_terms(self.level_4_criteria)
+        
+        self._level_1_terms = tuple(
+            criterion for criteria in self.level_1_criteria.values() for criterion in criteria
+        )
+        self._level_2_terms = tuple(
+            criterion for criteria in self.level_2_criteria.values() for criterion in criteria
+        )
+        self._level_3_terms = tuple(criterion for criterion in self.level_3_criteria)
+        self._level_4_terms = tuple(criterion for criterion in self.level_4_criteria)
+        self._dangerous_combinations = tuple(
+            (tuple(first), tuple(second)) for first, second in self.dangerous_combinations
+        )
+        self._important_categories = frozenset(self.important_categories)
+        
+        # Huella de las reglas vigentes, registrada junto a cada decisión
+        rules = [self.level_1_criteria, self.level_2_criteria, self.level_3_criteria,
+                 self.level_4_criteria, self.dangerous_combinations, self.important_categories]
+        self.rules_version = hashlib.sha256(
+            json.dumps(rules, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        ).hexdigest()[:12]
+        self.triage_cache.clear()
+    
+    def classify_triage(self, symptoms: List[Dict[str, Any]],
+                        vital_signs: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Clasifica el nivel de triaje basado en los síntomas y, si se dan, los signos vitales.
+        
+        Sin signos vitales el resultado es compartido y de solo lectura.
+        """
+        # Las reglas buscan términos en el texto unido de los síntomas, así que el
+        # orden importa: la clave es la secuencia de (síntoma, categoría, severidad)
+        key = tuple((s.get('symptom', ''), s.get('category'), s.get('severity')) for s in symptoms)
+        result = self.triage_cache.get(key)
+        if result is MISSING:
+            result = freeze(self._classify_symptoms(symptoms))
+            self.triage_cache.put(key, result)
+        
+        # Solo la edad no es una medición: no se adjunta una NEWS2 sin lecturas
+        if has_readings(vital_signs):
+            result = self._apply_vital_signs(result, vital_signs)
+        
+        return result
+    
+    def _classify_symptoms(self, symptoms: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Clasifica el nivel de triaje usando solo los síntomas."""
         if not symptoms:
             return self._create_triage_result(TriageLevel.LEVEL_5, 
                                             ["No se detectaron síntomas específicos"])
         
         # Extraer texto de síntomas para análisis
-        symptom_text = ' '.join([s.get('symptom', '') for s in symptoms]).lower()
+        symptom_text = fold_text(' '.join([s.get('symptom', '') for s in symptoms]))
         severity_levels = [s.get('severity', 'leve') for s in symptoms]
         categories = [s.get('category', '') for s in symptoms]
         
@@ -120,6 +206,165 @@ class TriageClassifier:
         return self._create_triage_result(TriageLevel.LEVEL_5, 
                                         ["Síntomas de severidad leve, no requiere atención inmediata"])
     
+    def _apply_vital_signs(self, result: Dict[str, Any], vital_signs: Dict[str, Any]) -> Dict[str, Any]:
+        """Escala el nivel de triaje si la puntuación NEWS2 lo justifica."""
+        news = self.vital_signs_scorer.score(vital_signs)
+        
+        if news['triage_level'] < result['triage_level']:
+            reasoning = list(result['reasoning']) + [
+                f"Escalado por signos vitales: NEWS2 = {news['news2_score']}"
+            ]
+            result = self._create_triage_result(TRIAGE_LEVELS_BY_NUMBER[news['triage_level']], reasoning)
+        else:
+            # El resultado por síntomas es compartido: se copia antes de añadir los signos
+            result = dict(result)
+        
+        result['vital_signs'] = news
+        return result
+    
+    def classify_level(self, symptoms: List[Dict[str, Any]],
+                       vital_signs: Dict[str, Any] = None) -> int:
+        """Devuelve solo el nivel de triaje (1-5) sin construir razonamientos.
+        
+        Aplica las mismas reglas que classify_triage, en el mismo orden, pero se
+        detiene en la primera que se cumple y no genera cadenas ni diccionarios.
+        """
+        level = self._symptom_level(symptoms)
+        
+        if level > 1 and has_readings(vital_signs):
+            level = min(level, self.vital_signs_scorer.score(vital_signs)['triage_level'])
+        
+        return level
+    
+    def _symptom_level(self, symptoms: List[Dict[str, Any]]) -> int:
+        """Nivel de triaje por síntomas con salida en la primera regla que se cumple."""
+        if not symptoms:
+            return 5
+        
+        symptom_text = fold_text(' '.join([s.get('symptom', '') for s in symptoms]))
+        
+        # Nivel 1: criterios críticos, combinaciones peligrosas o severidad múltiple
+        for term in self._level_1_terms:
+            if term in symptom_text:
+                return 1
+        for first, second in self._dangerous_combinations:
+            if (any(term in symptom_text for term in first) and
+                any(term in symptom_text for term in second)):
+                return 1
+        severe_count = 0
+        for symptom in symptoms:
+            if symptom.get('severity') == 'severo':
+                severe_count += 1
+        if severe_count >= 2:
+            return 1
+        
+        # Nivel 2: criterios de emergencia o síntoma severo en sistema importante
+        for term in self._level_2_terms:
+            if term in symptom_text:
+                return 2
+        for symptom in symptoms:
+            if (symptom.get('severity') == 'severo' and
+                symptom.get('category') in self._important_categories):
+                return 2
+        
+        # Nivel 3: criterios de urgencia o varios síntomas moderados
+        for term in self._level_3_terms:
+            if term in symptom_text:
+                return 3
+        moderate_count = 0
+        for symptom in symptoms:
+            if symptom.get('severity', 'leve') == 'moderado':
+                moderate_count += 1
+        if moderate_count >= 2:
+            return 3
+        
+        # Nivel 4: síntomas menores
+        for term in self._level_4_terms:
+            if term in symptom_text:
+                return 4
+        
+        return 5
+    
+    def classify_levels(self, symptom_batch: List[List[Dict[str, Any]]],
+                        vital_signs: Dict[str, Any] = None) -> List[int]:
+        """Versión por lotes de classify_level para re-puntuación masiva.
+        
+        symptom_batch es una lista de síntomas por paciente o un SymptomBatch
+        (SymptomAnalyzer.extract_symptoms_batch), que se clasifica con
+        operaciones matriciales sin pasar por diccionarios.
+        vital_signs, si se indica, son columnas alineadas con symptom_batch
+        (ver VitalSignsScorer.score_batch) y se puntúan en una sola llamada.
+        """
+        if isinstance(symptom_batch, SymptomBatch):
+            levels = self._batch_levels(symptom_batch).tolist()
+        else:
+            symptom_level = self._symptom_level
+            levels = [symptom_level(symptoms) for symptoms in symptom_batch]
+        
+        if has_readings(vital_signs):
+            news_levels = self.vital_signs_scorer.score_batch(**vital_signs)['triage_level']
+            levels = np.minimum(np.asarray(levels, dtype=np.int8), news_levels).tolist()
+        
+        return levels
+    
+    def _batch_levels(self, batch: SymptomBatch) -> np.ndarray:
+        """_symptom_level para cada documento de un SymptomBatch.
+        
+        Los criterios se buscan una vez en el texto de síntomas de todo el lote;
+        los recuentos de síntomas severos y moderados salen de la severidad de
+        cada entrada de la matriz de presencia.
+        """
+        size = len(batch)
+        # Las palabras clave ya están plegadas: el texto unido no necesita fold_text
+        corpus = TermCorpus(batch.symptom_texts())
+        
+        def any_term(terms) -> np.ndarray:
+            return corpus.matrix(terms).getnnz(axis=1) > 0
+        
+        rows = batch.entry_rows()
+        severities = batch.entry_severities()
+        severe = severities == batch.severity_code('severo')
+        moderate = severities == batch.severity_code('moderado')
+        important = np.array([category in self._important_categories for _, category in batch.columns],
+                             dtype=bool)
+        
+        level_1 = any_term(self._level_1_terms)
+        for first, second in self._dangerous_combinations:
+            level_1 |= any_term(first) & any_term(second)
+        level_1 |= np.bincount(rows[severe], minlength=size) >= 2
+        
+        level_2 = any_term(self._level_2_terms)
+        level_2 |= np.bincount(rows[severe & important[batch.presence.indices]], minlength=size) > 0
+        
+        level_3 = any_term(self._level_3_terms)
+        level_3 |= np.bincount(rows[moderate], minlength=size) >= 2
+        
+        level_4 = any_term(self._level_4_terms)
+        
+        # De menor a mayor prioridad: cada nivel sobrescribe a los menos urgentes
+        levels = np.full(size, 5, dtype=np.int8)
+        for level, mask in ((4, level_4), (3, level_3), (2, level_2), (1, level_1)):
+            levels[mask] = level
+        return levels
+    
+    def explain_level(self, symptoms: List[Dict[str, Any]], level: int = None) -> List[str]:
+        """Genera bajo demanda los razonamientos de un nivel ya calculado."""
+        if level is None:
+            level = self._symptom_level(symptoms)
+        if not symptoms:
+            return ["No se detectaron síntomas específicos"]
+        
+        symptom_text = fold_text(' '.join([s.get('symptom', '') for s in symptoms]))
+        if level == 1:
+            return self._check_level_1_criteria(symptom_text, symptoms)
+        if level == 2:
+            return self._check_level_2_criteria(symptom_text, symptoms)
+        if level == 3:
+            return self._check_level_3_criteria(symptom_text, [s.get('severity', 'leve') for s in symptoms])
+        if level == 4:
+            return self._check_level_4_criteria(symptom_text)
+        return ["Síntomas de severidad leve, no requiere atención inmediata"]
+    
     def _check_level_1_criteria(self, symptom_text: str, symptoms: List[Dict]) -> List[str]:
         """Verifica criterios para Nivel 1 (Resucitación)."""
         reasons = []
@@ -127,17 +372,11 @@ class TriageClassifier:
         # Verificar cada categoría crítica
         for category, criteria in self.level_1_criteria.items():
             for criterion in criteria:
-                if criterion.lower() in symptom_text:
+                if criterion in symptom_text:
                     reasons.append(f"Criterio crítico detectado: {criterion} ({category})")
         
         # Verificar combinaciones peligrosas
-        dangerous_combinations = [
-            (['dolor', 'pecho'], ['sudor', 'sudoracion']),
-            (['dificultad', 'respirar'], ['dolor', 'pecho']),
-            (['confusion'], ['debilidad']),
-        ]
-        
-        for combo in dangerous_combinations:
+        for combo in self.dangerous_combinations:
             if (any(term in symptom_text for term in combo[0]) and 
                 any(term in symptom_text for term in combo[1])):
                 reasons.append(f"Combinación crítica: {' + '.join(combo[0] + combo[1])}")
@@ -156,13 +395,12 @@ class TriageClassifier:
         # Verificar criterios específicos de Nivel 2
         for category, criteria in self.level_2_criteria.items():
             for criterion in criteria:
-                if criterion.lower() in symptom_text:
+                if criterion in symptom_text:
                     reasons.append(f"Criterio de emergencia: {criterion} ({category})")
         
         # Verificar síntomas severos en categorías importantes
-        important_categories = ['cardiovascular', 'respiratorio', 'neurologico']
         for symptom in symptoms:
-            if (symptom.get('category') in important_categories and 
+            if (symptom.get('category') in self.important_categories and 
                 symptom.get('severity') == 'severo'):
                 reasons.append(f"Síntoma severo en sistema {symptom.get('category')}")
         
@@ -174,7 +412,7 @@ class TriageClassifier:
         
         # Verificar criterios específicos
         for criterion in self.level_3_criteria:
-            if criterion.lower() in symptom_text:
+            if criterion in symptom_text:
                 reasons.append(f"Criterio de urgencia: {criterion}")
         
         # Verificar severidad moderada múltiple
@@ -189,7 +427,7 @@ class TriageClassifier:
         reasons = []
         
         for criterion in self.level_4_criteria:
-            if criterion.lower() in symptom_text:
+            if criterion in symptom_text:
                 reasons.append(f"Síntoma menor: {criterion}")
         
         return reasons
@@ -211,6 +449,7 @@ class TriageClassifier:
             'triage_name': triage_level.triage_name,
             'color': triage_level.color,
             'max_wait_time': triage_level.max_wait,
+            'max_wait_minutes': MAX_WAIT_MINUTES[triage_level.level],
             'description': triage_level.description,
             'recommendation': recommendations[triage_level.level],
             'reasoning': reasoning,
@@ -0,0 +1,264 @@
+"""Cola de prioridad de la sala de espera con detección de esperas vencidas"""
+
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Callable, Optional
+
+from .triage_classifier import MAX_WAIT_MINUTES
+
+
+@dataclass
+class QueueEntry:
+    """Paciente en espera. El orden es (nivel, llegada, secuencia)."""
+    patient_id: str
+    triage_level: int
+    arrival_time: float
+    deadline: float
+    sequence: int
+    site: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+    index: int = -1
+
+    @property
+    def sort_key(self):
+        return (self.triage_level, self.arrival_time, self.sequence)
+
+    def waited_seconds(self, now: float) -> float:
+        return now - self.arrival_time
+
+    def is_overdue(self, now: float) -> bool:
+        return now >= self.deadline
+
+
+class TimerWheel:
+    """Rueda de temporizadores con hash: O(1) al programar y al avanzar por tick.
+
+    Cada vencimiento se guarda en la ranura (tick % ranuras). Al avanzar solo
+    se visitan las ranuras de los ticks transcurridos; las entradas de vueltas
+    posteriores permanecen en su ranura hasta que llega su tick.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 8192, start_time: float = 0.0):
+        self.tick_seconds = tick_seconds
+        self.slots = [dict() for _ in range(slots)]
+        self.current_tick = self._tick(start_time)
+
+    def _tick(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+    def schedule(self, key: str, deadline: float):
+        """Programa (o reprograma) el vencimiento de una clave."""
+        # Un vencimiento ya pasado se dispara en el siguiente avance
+        tick = max(self._tick(deadline), self.current_tick + 1)
+        self.slots[tick % len(self.slots)][key] = tick
+        return tick
+
+    def cancel(self, key: str, tick: int):
+        self.slots[tick % len(self.slots)].pop(key, None)
+
+    def advance(self, now: float) -> List[str]:
+        """Avanza hasta `now` y devuelve las claves vencidas."""
+        target = self._tick(now)
+        expired = []
+
+        # Tras una pausa más larga que la rueda basta con una vuelta completa
+        first = max(self.current_tick + 1, target - len(self.slots) + 1)
+        for tick in range(first, target + 1):
+            slot = self.slots[tick % len(self.slots)]
+            if not slot:
+                continue
+            due = [key for key, deadline_tick in slot.items() if deadline_tick <= target]
+            for key in due:
+                del slot[key]
+            expired.extend(due)
+
+        self.current_tick = max(self.current_tick, target)
+        return expired
+
+
+class TriageQueue:
+    """Cola de pacientes ordenada por nivel de triaje y hora de llegada.
+
+    Usa un montículo binario indexado (cada entrada conoce su posición), de
+    modo que insertar, extraer, retirar y re-priorizar son O(log n). Los
+    vencimientos del tiempo máximo de espera se detectan con una rueda de
+    temporizadores, sin recorrer la cola.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time,
+                 tick_seconds: float = 1.0, wheel_slots: int = 8192):
+        self.clock = clock
+        self._heap: List[QueueEntry] = []
+        self._entries: Dict[str, QueueEntry] = {}
+        self._timer_ticks: Dict[str, int] = {}
+        self._overdue: Dict[str, QueueEntry] = {}
+        self._sequence = 0
+        self._wheel = TimerWheel(tick_seconds, wheel_slots, start_time=clock())
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, patient_id: str) -> bool:
+        return patient_id in self._entries
+
+    def get(self, patient_id: str) -> Optional[QueueEntry]:
+        return self._entries.get(patient_id)
+
+    def push(self, patient_id: str, triage_level: int, arrival_time: float = None,
+             site: str = None, data: Dict[str, Any] = None) -> QueueEntry:
+        """Añade un paciente a la cola."""
+        if patient_id in self._entries:
+            raise ValueError(f"El paciente {patient_id} ya está en la cola")
+        if triage_level not in MAX_WAIT_MINUTES:
+            raise ValueError(f"Nivel de triaje inválido: {triage_level}")
+
+        if arrival_time is None:
+            arrival_time = self.clock()
+
+        self._sequence += 1
+        entry = QueueEntry(
+            patient_id=patient_id,
+            triage_level=triage_level,
+            arrival_time=arrival_time,
+            deadline=self._deadline(triage_level, arrival_time),
+            sequence=self._sequence,
+            site=site,
+            data=data or {}
+        )
+
+        entry.index = len(self._heap)
+        self._heap.append(entry)
+        self._entries[patient_id] = entry
+        self._sift_up(entry.index)
+        self._timer_ticks[patient_id] = self._wheel.schedule(patient_id, entry.deadline)
+        return entry
+
+    def peek(self) -> Optional[QueueEntry]:
+        return self._heap[0] if self._heap else None
+
+    def pop(self) -> QueueEntry:
+        """Extrae el paciente de mayor prioridad."""
+        if not self._heap:
+            raise IndexError("La cola de triaje está vacía")
+        return self._remove_at(0)
+
+    def remove(self, patient_id: str) -> QueueEntry:
+        """Retira un paciente (alta voluntaria, traslado...)."""
+        return self._remove_at(self._entries[patient_id].index)
+
+    def reprioritize(self, patient_id: str, triage_level: int) -> QueueEntry:
+        """Cambia el nivel tras una reevaluación conservando la hora de llegada."""
+        if triage_level not in MAX_WAIT_MINUTES:
+            raise ValueError(f"Nivel de triaje inválido: {triage_level}")
+
+        entry = self._entries[patient_id]
+        previous_level = entry.triage_level
+        entry.triage_level = triage_level
+        entry.deadline = self._deadline(triage_level, entry.arrival_time)
+
+        if triage_level < previous_level:
+            self._sift_up(entry.index)
+        elif triage_level > previous_level:
+            self._sift_down(entry.index)
+
+        # El nuevo plazo se evalúa desde cero
+        self._overdue.pop(patient_id, None)
+        # Un paciente ya vencido no tiene temporizador pendiente
+        tick = self._timer_ticks.pop(patient_id, None)
+        if tick is not None:
+            self._wheel.cancel(patient_id, tick)
+        self._timer_ticks[patient_id] = self._wheel.schedule(patient_id, entry.deadline)
+        return entry
+
+    def check_overdue(self, now: float = None) -> List[QueueEntry]:
+        """Devuelve los pacientes que superaron su tiempo máximo desde la última llamada."""
+        if now is None:
+            now = self.clock()
+
+        newly_overdue = []
+        for patient_id in self._wheel.advance(now):
+            entry = self._entries.get(patient_id)
+            if entry is None:
+                continue
+            self._timer_ticks.pop(patient_id, None)
+            self._overdue[patient_id] = entry
+            newly_overdue.append(entry)
+
+        newly_overdue.sort(key=lambda entry: entry.sort_key)
+        return newly_overdue
+
+    def overdue(self) -> List[QueueEntry]:
+        """Pacientes actualmente en espera con el plazo vencido."""
+        return sorted(self._overdue.values(), key=lambda entry: entry.sort_key)
+
+    def entries(self) -> List[QueueEntry]:
+        """Copia ordenada de la cola para mostrarla (O(n log n))."""
+        return sorted(self._heap, key=lambda entry: entry.sort_key)
+
+    def counts_by_level(self) -> Dict[int, int]:
+        counts = {level: 0 for level in MAX_WAIT_MINUTES}
+        for entry in self._heap:
+            counts[entry.triage_level] += 1
+        return counts
+
+    def _deadline(self, triage_level: int, arrival_time: float) -> float:
+        return arrival_time + MAX_WAIT_MINUTES[triage_level] * 60
+
+    def _remove_at(self, index: int) -> QueueEntry:
+        heap = self._heap
+        entry = heap[index]
+        last = heap.pop()
+
+        if index < len(heap):
+            heap[index] = last
+            last.index = index
+            self._sift_up(index)
+            self._sift_down(last.index)
+
+        entry.index = -1
+        del self._entries[entry.patient_id]
+        self._overdue.pop(entry.patient_id, None)
+        tick = self._timer_ticks.pop(entry.patient_id, None)
+        if tick is not None:
+            self._wheel.cancel(entry.patient_id, tick)
+        return entry
+
+    def _sift_up(self, index: int):
+        heap = self._heap
+        entry = heap[index]
+        key = entry.sort_key
+
+        while index > 0:
+            parent_index = (index - 1) >> 1
+            parent = heap[parent_index]
+            if parent.sort_key <= key:
+                break
+            heap[index] = parent
+            parent.index = index
+            index = parent_index
+
+        heap[index] = entry
+        entry.index = index
+
+    def _sift_down(self, index: int):
+        heap = self._heap
+        size = len(heap)
+        entry = heap[index]
+        key = entry.sort_key
+
+        while True:
+            child_index = 2 * index + 1
+            if child_index >= size:
+                break
+            right_index = child_index + 1
+            if right_index < size and heap[right_index].sort_key < heap[child_index].sort_key:
+                child_index = right_index
+            child = heap[child_index]
+            if key <= child.sort_key:
+                break
+            heap[index] = child
+            child.index = index
+            index = child_index
+
+        heap[index] = entry
+        entry.index = index
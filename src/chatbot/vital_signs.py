@@ -0,0 +1,158 @@
+"""Puntuación de alerta temprana tipo NEWS2 a partir de signos vitales"""
+
+from typing import Dict, Any
+
+import numpy as np
+
+# Umbrales NEWS2 como límites superiores inclusivos: el valor x cae en el
+# primer tramo cuyo límite es >= x (np.searchsorted con side='left').
+# Cada tabla tiene un punto más que límites; el último tramo es abierto.
+NEWS2_TABLES = {
+    'respiratory_rate': ([8, 11, 20, 24], [3, 1, 0, 2, 3]),
+    'spo2': ([91, 93, 95], [3, 2, 1, 0]),
+    'systolic_bp': ([90, 100, 110, 219], [3, 2, 1, 0, 3]),
+    'heart_rate': ([40, 50, 90, 110, 130], [3, 1, 0, 1, 2, 3]),
+    'temperature': ([35.0, 36.0, 38.0, 39.0], [3, 1, 0, 1, 2]),
+}
+
+# Escala ACVPU: solo 'A' (alerta) puntúa 0; confusión nueva, voz, dolor o
+# ausencia de respuesta puntúan 3.
+CONSCIOUSNESS_LEVELS = ('A', 'C', 'V', 'P', 'U')
+
+# Oxígeno suplementario suma 2 puntos en NEWS2
+OXYGEN_POINTS = 2
+
+# NEWS2 no puntúa la edad; como ajuste local, los pacientes de 65 años o más
+# suman un punto.
+AGE_THRESHOLD = 65
+AGE_POINTS = 1
+
+VITAL_SIGN_FIELDS = (
+    'heart_rate', 'respiratory_rate', 'spo2', 'temperature',
+    'systolic_bp', 'consciousness', 'on_oxygen', 'age'
+)
+
+# Lecturas fisiológicas: sin al menos una, la edad o el oxígeno no son una valoración NEWS2
+MEASURED_FIELDS = tuple(NEWS2_TABLES) + ('consciousness',)
+
+
+def has_readings(vital_signs: Dict[str, Any]) -> bool:
+    """Indica si hay al menos una lectura fisiológica medida."""
+    return bool(vital_signs) and any(vital_signs.get(field) is not None for field in MEASURED_FIELDS)
+
+
+class VitalSignsScorer:
+    """Calcula puntuaciones NEWS2 vectorizadas y su nivel de triaje asociado."""
+
+    def __init__(self):
+        self._tables = {
+            field: (np.asarray(edges, dtype=np.float64), np.asarray(points, dtype=np.int8))
+            for field, (edges, points) in NEWS2_TABLES.items()
+        }
+
+    def score_batch(self, heart_rate=None, respiratory_rate=None, spo2=None,
+                    temperature=None, systolic_bp=None, consciousness=None,
+                    on_oxygen=None, age=None) -> Dict[str, np.ndarray]:
+        """Puntúa columnas de lecturas en una sola llamada.
+
+        Cada argumento es un array (o secuencia) con una lectura por paciente;
+        los valores ausentes (None o NaN) no puntúan. Devuelve los puntos por
+        parámetro, el total, si algún parámetro llegó a 3 y el nivel de triaje
+        mínimo que justifica la puntuación (5 si no hay escalado).
+        """
+        columns = {
+            'heart_rate': heart_rate,
+            'respiratory_rate': respiratory_rate,
+            'spo2': spo2,
+            'temperature': temperature,
+            'systolic_bp': systolic_bp
+        }
+        size = self._batch_size(list(columns.values()) + [consciousness, on_oxygen, age])
+
+        components = {}
+        for field, values in columns.items():
+            components[field] = self._lookup(field, values, size)
+        components['consciousness'] = self._score_consciousness(consciousness, size)
+        components['on_oxygen'] = self._score_flag(on_oxygen, size, OXYGEN_POINTS)
+        components['age'] = self._score_age(age, size)
+
+        total = np.zeros(size, dtype=np.int16)
+        for points in components.values():
+            total += points
+
+        red_flag = np.zeros(size, dtype=bool)
+        for field in NEWS2_TABLES:
+            red_flag |= components[field] == 3
+        red_flag |= components['consciousness'] == 3
+
+        return {
+            'components': components,
+            'total': total,
+            'red_flag': red_flag,
+            'triage_level': self.levels_for_scores(total, red_flag)
+        }
+
+    def score(self, vital_signs: Dict[str, Any]) -> Dict[str, Any]:
+        """Puntúa una única lectura expresada como diccionario."""
+        unknown = set(vital_signs) - set(VITAL_SIGN_FIELDS)
+        if unknown:
+            raise ValueError(f"Signos vitales desconocidos: {sorted(unknown)}")
+
+        batch = self.score_batch(**{field: [value] for field, value in vital_signs.items()})
+        return {
+            'news2_score': int(batch['total'][0]),
+            'red_flag': bool(batch['red_flag'][0]),
+            'triage_level': int(batch['triage_level'][0]),
+            'components': {field: int(points[0]) for field, points in batch['components'].items()}
+        }
+
+    @staticmethod
+    def levels_for_scores(total: np.ndarray, red_flag: np.ndarray) -> np.ndarray:
+        """Traduce la puntuación a nivel de triaje según la respuesta clínica NEWS2."""
+        levels = np.full(total.shape, 5, dtype=np.int8)
+        levels[red_flag] = 3      # Un parámetro en rojo: valoración urgente
+        levels[total >= 5] = 2    # Riesgo medio: respuesta urgente
+        levels[total >= 7] = 1    # Riesgo alto: respuesta de emergencia
+        return levels
+
+    def _lookup(self, field: str, values, size: int) -> np.ndarray:
+        if values is None:
+            return np.zeros(size, dtype=np.int8)
+
+        edges, points = self._tables[field]
+        values = np.asarray(values, dtype=np.float64)
+        scores = points[np.searchsorted(edges, values, side='left')]
+        scores[np.isnan(values)] = 0
+        return scores
+
+    @staticmethod
+    def _score_consciousness(values, size: int) -> np.ndarray:
+        if values is None:
+            return np.zeros(size, dtype=np.int8)
+
+        # Solo importa la inicial (ACVPU); los valores ausentes no puntúan
+        codes = np.char.upper(np.asarray(values, dtype='U1'))
+        return np.where(np.isin(codes, CONSCIOUSNESS_LEVELS[1:]), 3, 0).astype(np.int8)
+
+    @staticmethod
+    def _score_flag(values, size: int, points: int) -> np.ndarray:
+        if values is None:
+            return np.zeros(size, dtype=np.int8)
+
+        flags = np.asarray(values, dtype=bool)
+        return np.where(flags, points, 0).astype(np.int8)
+
+    @staticmethod
+    def _score_age(values, size: int) -> np.ndarray:
+        if values is None:
+            return np.zeros(size, dtype=np.int8)
+
+        ages = np.asarray(values, dtype=np.float64)
+        return np.where(ages >= AGE_THRESHOLD, AGE_POINTS, 0).astype(np.int8)
+
+    @staticmethod
+    def _batch_size(columns) -> int:
+        sizes = {len(column) for column in columns if column is not None}
+        if len(sizes) > 1:
+            raise ValueError("Todas las columnas de signos vitales deben tener la misma longitud")
+        return sizes.pop() if sizes else 0
@@ -0,0 +1,155 @@
+"""Analítica columnar de decisiones de triaje históricas"""
+
+import json
+import os
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from .audit_log import replay
+
+TRIAGE_LEVEL_CATEGORIES = [1, 2, 3, 4, 5]
+
+
+def iter_records(source: str) -> Iterator[Dict[str, Any]]:
+    """Lee decisiones de un directorio de auditoría o de un archivo JSONL."""
+    if os.path.isdir(source):
+        yield from replay(source)
+        return
+
+    with open(source, 'r', encoding='utf-8') as records:
+        for line in records:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_chunks(records: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Agrupa un flujo de registros en bloques de tamaño acotado."""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def records_to_frames(records: List[Dict[str, Any]],
+                      symptom_categories: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """Convierte un bloque de registros en tablas columnares.
+
+    Devuelve 'decisions' (una fila por decisión) y 'symptoms' (una fila por
+    síntoma extraído, con el índice de su decisión). Niveles, enfermedades,
+    síntomas, categorías y severidades usan dtype categórico.
+    """
+    timestamps = np.fromiter((record.get('timestamp', 0.0) for record in records),
+                             dtype=np.float64, count=len(records))
+    levels = [record.get('triage_level') for record in records]
+    top_diseases = [
+        record['diseases'][0]['disease'] if record.get('diseases') else None
+        for record in records
+    ]
+
+    decisions = pd.DataFrame({
+        'day': pd.to_datetime(timestamps, unit='s').floor('D'),
+        'triage_level': pd.Categorical(levels, categories=TRIAGE_LEVEL_CATEGORIES, ordered=True),
+        'top_disease': pd.Categorical(top_diseases),
+        'rules_version': pd.Categorical([record.get('rules_version') for record in records])
+    })
+
+    record_index, names, categories, severities = [], [], [], []
+    for i, record in enumerate(records):
+        for symptom in record.get('symptoms') or []:
+            record_index.append(i)
+            names.append(symptom.get('symptom'))
+            categories.append(symptom.get('category'))
+            severities.append(symptom.get('severity'))
+
+    symptoms = pd.DataFrame({
+        'decision': np.asarray(record_index, dtype=np.int64),
+        'symptom': pd.Categorical(names),
+        'category': pd.Categorical(categories, categories=symptom_categories),
+        'severity': pd.Categorical(severities, categories=['leve', 'moderado', 'severo'])
+    })
+
+    return {'decisions': decisions, 'symptoms': symptoms}
+
+
+class TriageAnalytics:
+    """Acumula agregados por bloques para mantener la memoria acotada."""
+
+    def __init__(self, symptom_categories: Optional[List[str]] = None):
+        self.symptom_categories = symptom_categories
+        self.decision_count = 0
+        self._levels_by_day = None
+        self._diseases = pd.Series(dtype=np.int64)
+        self._symptoms = pd.Series(dtype=np.int64)
+        self._symptom_categories = pd.Series(dtype=np.int64)
+
+    def update(self, records: List[Dict[str, Any]]):
+        """Incorpora un bloque de registros a los agregados."""
+        if not records:
+            return
+
+        frames = records_to_frames(records, self.symptom_categories)
+        decisions = frames['decisions']
+        symptoms = frames['symptoms']
+        self.decision_count += len(decisions)
+
+        levels_by_day = decisions.groupby(['day', 'triage_level'], observed=False).size().unstack(fill_value=0)
+        self._levels_by_day = self._add(self._levels_by_day, levels_by_day)
+
+        self._diseases = self._add(self._diseases, decisions['top_disease'].value_counts())
+        self._symptoms = self._add(self._symptoms, symptoms['symptom'].value_counts())
+        self._symptom_categories = self._add(self._symptom_categories, symptoms['category'].value_counts())
+
+    def report(self, top_n: int = 10) -> Dict[str, Any]:
+        """Genera el informe con los agregados acumulados."""
+        levels_by_day = self._levels_by_day
+        if levels_by_day is None:
+            levels_by_day = pd.DataFrame(columns=TRIAGE_LEVEL_CATEGORIES, dtype=np.int64)
+
+        totals = levels_by_day.sum(axis=1)
+        level_1_rate = (levels_by_day[1] / totals.where(totals > 0)).fillna(0.0) \
+            if 1 in levels_by_day.columns else pd.Series(dtype=np.float64)
+
+        return {
+            'decision_count': self.decision_count,
+            'level_distribution': levels_by_day.astype(np.int64),
+            'level_1_rate': level_1_rate.rename('level_1_rate'),
+            'top_diseases': self._top(self._diseases, top_n),
+            'top_symptoms': self._top(self._symptoms, top_n),
+            'symptom_categories': self._top(self._symptom_categories, None)
+        }
+
+    @staticmethod
+    def _add(total, partial):
+        if total is None or len(total) == 0:
+            return partial.copy()
+        return total.add(partial, fill_value=0)
+
+    @staticmethod
+    def _top(counts: pd.Series, top_n: Optional[int]) -> pd.Series:
+        counts = counts[counts > 0].astype(np.int64).sort_values(ascending=False, kind='stable')
+        return counts if top_n is None else counts.head(top_n)
+
+
+def daily_report(source: str, chunk_size: int = 100000, top_n: int = 10,
+                 symptom_categories: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Calcula el informe diario de un directorio de auditoría o archivo JSONL."""
+    analytics = TriageAnalytics(symptom_categories)
+    for chunk in iter_chunks(iter_records(source), chunk_size):
+        analytics.update(chunk)
+    return analytics.report(top_n)
+
+
+if __name__ == "__main__":
+    import sys
+
+    report = daily_report(sys.argv[1] if len(sys.argv) > 1 else 'audit_logs')
+    print(f"Decisiones: {report['decision_count']:,}\n")
+    for section in ('level_distribution', 'level_1_rate', 'top_diseases', 'top_symptoms', 'symptom_categories'):
+        print(f"== {section} ==")
+        print(report[section].to_string())
+        print()
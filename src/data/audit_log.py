@@ -0,0 +1,301 @@
+"""Registro de auditoría de decisiones de triaje en segmentos de solo-anexado"""
+
+import json
+import logging
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import List, Dict, Any, Iterator, Optional
+
+# Cabecera de cada registro: longitud del contenido y CRC32 (little-endian)
+RECORD_HEADER = struct.Struct('<II')
+SEGMENT_PREFIX = 'audit-'
+SEGMENT_SUFFIX = '.log'
+
+logger = logging.getLogger(__name__)
+
+
+def build_audit_record(text: str, result: Dict[str, Any], rules_version: str) -> Dict[str, Any]:
+    """Construye el registro de auditoría de una solicitud procesada."""
+    triage = result.get('triage') or {}
+    return {
+        'timestamp': time.time(),
+        'input': text,
+        'symptoms': result.get('symptoms', []),
+        'diseases': [
+            {'disease': d['disease'], 'confidence': float(d['confidence'])}
+            for d in result.get('diseases') or []
+        ],
+        'triage_level': triage.get('triage_level'),
+        'triage_reasoning': triage.get('reasoning', []),
+        'vital_signs': triage.get('vital_signs'),
+        'rules_version': rules_version,
+        'degraded_stages': result.get('pipeline', {}).get('degraded_stages', [])
+    }
+
+
+class AuditLogError(RuntimeError):
+    """El registro de auditoría no puede aceptar o escribir registros."""
+
+
+class AuditLog:
+    """Escritor en segundo plano de registros de auditoría.
+
+    record() solo encola el registro; un hilo escritor los agrupa, los anexa
+    al segmento actual como registros binarios con prefijo de longitud y hace
+    fsync en grupo como mucho cada `fsync_interval` segundos. Los segmentos
+    rotan al superar `max_segment_bytes`.
+
+    Cada segmento se crea en exclusiva (O_EXCL), así que varios escritores
+    (procesos) pueden compartir directorio sin escribir en el mismo segmento;
+    aun así lo normal es un AuditLog por proceso. La cola admite como mucho
+    `max_pending` registros: si el disco no da abasto o falla, record()
+    espera hasta `put_timeout` segundos y luego lanza AuditLogError. Un error
+    de escritura no detiene el hilo: se registra en `error`, se reintenta y
+    record() y flush() lo notifican mientras dure.
+    """
+
+    def __init__(self, directory: str, fsync_interval: float = 0.05,
+                 max_segment_bytes: int = 64 * 1024 * 1024, max_pending: int = 100000,
+                 put_timeout: float = 1.0, retry_interval: float = 0.5):
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.put_timeout = put_timeout
+        self.retry_interval = retry_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self.records_written = 0
+        self.fsync_count = 0
+        # Último error de escritura; None cuando el escritor funciona
+        self.error: Optional[OSError] = None
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop = object()
+        self._segment_number = self._last_segment_number()
+        self._file = self._open_segment()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+        self._writer.start()
+
+    def record(self, entry: Dict[str, Any]):
+        """Encola un registro; no espera a que llegue al disco."""
+        if self._closed:
+            raise RuntimeError("El registro de auditoría está cerrado")
+        if self.error is not None:
+            raise AuditLogError(f"El registro de auditoría no puede escribir: {self.error}") from self.error
+        try:
+            self._queue.put(entry, timeout=self.put_timeout)
+        except queue.Full:
+            raise AuditLogError("Cola del registro de auditoría llena: el disco no da abasto") from None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Espera hasta que todo lo encolado hasta ahora esté escrito y sincronizado.
+
+        Devuelve False si vence el plazo o si el escritor está fallando.
+        """
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout) and self.error is None
+
+    def close(self):
+        """Vacía la cola, sincroniza y detiene el hilo escritor."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._stop)
+        self._writer.join()
+        self._abandon_segment()
+        if self.error is not None:
+            raise AuditLogError(f"Registros de auditoría sin escribir al cerrar: {self.error}") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def segments(self) -> List[str]:
+        return list_segments(self.directory)
+
+    # Hilo escritor
+
+    def _run(self):
+        last_sync = time.monotonic()
+        pending = bytearray()   # Codificado y aún sin escribir
+        unsynced = bytearray()  # Escrito desde el último fsync; se reescribe si este falla
+        waiters = []
+        stopping = False
+        close_attempts = 0
+
+        while True:
+            if self.error is not None:
+                timeout = self.retry_interval
+            elif unsynced:
+                timeout = max(0.0, self.fsync_interval - (time.monotonic() - last_sync))
+            else:
+                timeout = None
+
+            batch = []
+            if not stopping:
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    pass
+
+                # Agrupar todo lo que ya esté en cola
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+            elif self.error is not None:
+                time.sleep(self.retry_interval)
+
+            for item in batch:
+                if item is self._stop:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    pending += encode_record(item)
+                    self.records_written += 1
+
+            if pending or unsynced:
+                try:
+                    if self._file is None:
+                        self._file = self._open_segment()
+                    if pending:
+                        self._file.write(pending)
+                        unsynced += pending
+                        pending = bytearray()
+
+                    full = self._file.tell() >= self.max_segment_bytes
+                    if stopping or waiters or full or time.monotonic() - last_sync >= self.fsync_interval:
+                        self._sync()
+                        unsynced = bytearray()
+                        last_sync = time.monotonic()
+                        if full:
+                            self._file.close()
+                            self._file = self._open_segment()
+
+                    if self.error is not None:
+                        logger.warning("Registro de auditoría recuperado tras: %s", self.error)
+                        self.error = None
+                except OSError as exc:
+                    if self.error is None:
+                        logger.error("Fallo al escribir el registro de auditoría en %s: %s", self.directory, exc)
+                    self.error = exc
+                    # El segmento puede haber quedado con un registro a medias (replay se detiene
+                    # ahí): se abandona y lo no sincronizado se reescribe en uno nuevo
+                    pending = unsynced + pending
+                    unsynced = bytearray()
+                    self._abandon_segment()
+
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+
+            if stopping:
+                close_attempts += 1
+                if self.error is None or close_attempts >= 3:
+                    break
+
+    def _abandon_segment(self):
+        """Cierra el segmento y, si se puede, lo recorta a lo último sincronizado."""
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._file = None
+        try:
+            os.truncate(self._segment_path, self._synced_size)
+        except OSError:
+            # Sin recortar, replay puede ver dos veces lo que se reescribe
+            pass
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._synced_size = self._file.tell()
+        self.fsync_count += 1
+
+    def _open_segment(self):
+        """Crea el siguiente segmento libre; O_EXCL evita compartirlo con otro escritor."""
+        while True:
+            self._segment_number += 1
+            name = f"{SEGMENT_PREFIX}{self._segment_number:08d}{SEGMENT_SUFFIX}"
+            path = os.path.join(self.directory, name)
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                continue
+            self._segment_path = path
+            self._synced_size = 0
+            return os.fdopen(fd, 'ab')
+
+    def _last_segment_number(self) -> int:
+        segments = list_segments(self.directory)
+        if not segments:
+            return 0
+        name = os.path.basename(segments[-1])
+        return int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+def encode_record(entry: Dict[str, Any]) -> bytes:
+    """Serializa un registro como cabecera (longitud, CRC32) + JSON UTF-8."""
+    body = json.dumps(entry, ensure_ascii=False, default=str).encode('utf-8')
+    return RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+def list_segments(directory: str) -> List[str]:
+    """Segmentos del directorio en orden de escritura."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+    )
+    return [os.path.join(directory, name) for name in names]
+
+
+def scan_segment(path: str) -> Iterator[Dict[str, Any]]:
+    """Recorre un segmento mapeado en memoria.
+
+    Se detiene en el primer registro truncado o con CRC inválido, que solo
+    puede ser la cola de una escritura interrumpida.
+    """
+    if os.path.getsize(path) == 0:
+        return
+
+    with open(path, 'rb') as segment, mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        offset = 0
+        size = len(data)
+        header_size = RECORD_HEADER.size
+
+        while offset + header_size <= size:
+            length, checksum = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + header_size
+            end = start + length
+            if end > size:
+                break
+            body = data[start:end]
+            if zlib.crc32(body) != checksum:
+                break
+            yield json.loads(body)
+            offset = end
+
+
+def replay(directory: str) -> Iterator[Dict[str, Any]]:
+    """Reproduce todos los registros del directorio en orden."""
+    for path in list_segments(directory):
+        yield from scan_segment(path)
@@ -0,0 +1,437 @@
+"""Pruebas diferenciales: motores optimizados frente a la referencia congelada
+
+Un generador con semilla compone quejas en español con las palabras clave,
+indicadores de severidad, criterios de triaje y sinónimos de las tablas, y
+les añade ruido (acentos, mayúsculas, erratas, puntuación, espacios raros,
+caracteres de ancho completo, ligaduras, marcas combinantes, cifras). Cada
+entrada pasa por los motores en uso y por ReferenceEngine; cualquier
+diferencia se reduce a la entrada mínima que la sigue provocando. Cada bloque
+pasa además completo por las rutas por lotes (extract_symptoms_batch,
+classify_levels, predict_diseases_batch).
+
+Cada función optimizada se ejecuta dos veces por entrada: primero con la
+memoización vacía y después con ella ya poblada por la primera llamada.
+Ambas salidas se comparan con la referencia.
+
+Los índices se reparten en bloques entre un pool de procesos. El informe da,
+por función, el número de divergencias y la aceleración (tiempo de la
+referencia / tiempo del motor optimizado) sin caché y con caché, por
+separado.
+
+Uso: python -m src.data.differential --count 1000000 [--workers 8] [--seed 0]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+import numpy as np
+
+from ..chatbot.reference import ReferenceEngine
+from ..utils.preprocessing import MedicalTextPreprocessor
+from .evaluation import build_pipeline
+
+BATCH_CHECKS = ('extract_symptoms_batch', 'classify_levels_batch', 'predict_diseases_batch')
+CHECKS = ('extract_symptoms', 'classify_triage', 'classify_level', 'predict_diseases') + BATCH_CHECKS
+
+# Tolerancia para flotantes: el mismo cálculo puede sumar en otro orden
+FLOAT_RTOL = 1e-9
+FLOAT_ATOL = 1e-12
+
+OPENINGS = ['tengo', 'siento', 'me duele', 'presento', 'mi hijo tiene', 'desde ayer', 'doctor,', '']
+FILLERS = ['y', 'con', 'un poco de', 'mucho', 'desde hace 3 dias', 'por la noche', 'otra vez', 'no se', 'creo que']
+URGENCY_WORDS = ['emergencia', 'urgente', 'inmediato', 'sangre', 'sangrando', 'hemorragia', 'no puedo',
+                 'imposible', 'muy dificil', 'insoportable', 'terrible']
+ACCENTS = {'a': 'áà', 'e': 'éè', 'i': 'í', 'o': 'óò', 'u': 'úü', 'n': 'ñ', 'c': 'ç'}
+ODD_CHARACTERS = ['\u00a0', '\u2009', '\t', '\n', '“', '”', '’', '¿', '¡', '…', 'ﬁ', 'µ', '½',
+                  '\u0301', '\u0303', 'Ａ', 'ｄ', '😷', '🤒', 'º', 'ª']
+
+
+def _empty_timings() -> Dict[str, List[float]]:
+    return {check: [0.0, 0.0, 0.0] for check in CHECKS}
+
+
+class ComplaintFuzzer:
+    """Quejas reproducibles: la entrada i depende solo de (semilla, i)."""
+
+    def __init__(self, analyzer, classifier, preprocessor=None, seed: int = 0,
+                 vital_signs_rate: float = 0.2):
+        self.seed = seed
+        self.vital_signs_rate = vital_signs_rate
+        preprocessor = preprocessor or MedicalTextPreprocessor()
+
+        terms = set(URGENCY_WORDS)
+        for data in analyzer.symptom_keywords.values():
+            terms.update(data['keywords'])
+            for indicators in data['severity_indicators'].values():
+                terms.update(indicators)
+        for table in (classifier.level_1_criteria, classifier.level_2_criteria):
+            for criteria in table.values():
+                terms.update(criteria)
+        terms.update(classifier.level_3_criteria)
+        terms.update(classifier.level_4_criteria)
+        terms.update(preprocessor.medical_synonyms)
+        terms.update(preprocessor.medical_synonyms.values())
+        self.terms = sorted(terms)
+
+    def text(self, index: int) -> str:
+        rng = random.Random(f"{self.seed}:{index}")
+        words = [rng.choice(OPENINGS)]
+        for _ in range(rng.randint(0, 7)):
+            words.append(rng.choice(self.terms))
+            if rng.random() < 0.4:
+                words.append(rng.choice(FILLERS))
+        text = ' '.join(word for word in words if word)
+        for _ in range(rng.randint(0, 4)):
+            text = self._noise(rng, text)
+        return text
+
+    def vital_signs(self, index: int) -> Optional[Dict[str, Any]]:
+        rng = random.Random(f"{self.seed}:{index}:vitales")
+        if rng.random() >= self.vital_signs_rate:
+            return None
+        readings = {
+            'heart_rate': rng.randint(30, 180),
+            'respiratory_rate': rng.randint(5, 40),
+            'spo2': rng.randint(80, 100),
+            'temperature': round(rng.uniform(34.0, 41.0), 1),
+            'systolic_bp': rng.randint(70, 230),
+            'consciousness': rng.choice('AAAACVPU'),
+            'on_oxygen': rng.random() < 0.2,
+            'age': rng.randint(0, 99)
+        }
+        return {field: value for field, value in readings.items() if rng.random() < 0.7}
+
+    @staticmethod
+    def _noise(rng: random.Random, text: str) -> str:
+        if not text:
+            return text
+        position = rng.randrange(len(text))
+        kind = rng.randrange(8)
+        if kind == 0:
+            char = text[position].lower()
+            if char in ACCENTS:
+                text = text[:position] + rng.choice(ACCENTS[char]) + text[position + 1:]
+        elif kind == 1:
+            text = text.upper() if rng.random() < 0.3 else text[:position] + text[position:].capitalize()
+        elif kind == 2:
+            text = text[:position] + text[position + 1:]
+        elif kind == 3 and position + 1 < len(text):
+            text = text[:position] + text[position + 1] + text[position] + text[position + 2:]
+        elif kind == 4:
+            text = text[:position] + rng.choice(',.;:!?()-/') + text[position:]
+        elif kind == 5:
+            text = text[:position] + rng.choice(ODD_CHARACTERS) + text[position:]
+        elif kind == 6:
+            text = text[:position] + str(rng.choice([3, 39.5, 120, 2024, 7])) + text[position:]
+        else:
+            # Palabras pegadas: las reglas buscan subcadenas
+            text = text.replace(' ', '', 1) if rng.random() < 0.5 else '  ' + text + '  '
+        return text
+
+
+def first_difference(expected: Any, actual: Any, path: str = '$') -> Optional[str]:
+    """Ruta del primer valor distinto, o None si son equivalentes.
+
+    Listas y tuplas se comparan como secuencias (los resultados memorizados
+    son tuplas) y los flotantes con una tolerancia relativa mínima.
+    """
+    if isinstance(expected, Mapping) and isinstance(actual, Mapping):
+        if set(expected) != set(actual):
+            return f"{path} claves {sorted(set(expected) ^ set(actual))}"
+        for key in expected:
+            difference = first_difference(expected[key], actual[key], f"{path}.{key}")
+            if difference:
+                return difference
+        return None
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+        if len(expected) != len(actual):
+            return f"{path} longitud {len(expected)} != {len(actual)}"
+        for i, (left, right) in enumerate(zip(expected, actual)):
+            difference = first_difference(left, right, f"{path}[{i}]")
+            if difference:
+                return difference
+        return None
+    if isinstance(expected, (float, np.floating)) or isinstance(actual, (float, np.floating)):
+        if isinstance(expected, (int, float, np.number)) and isinstance(actual, (int, float, np.number)) and \
+                math.isclose(expected, actual, rel_tol=FLOAT_RTOL, abs_tol=FLOAT_ATOL):
+            return None
+        return f"{path}: {expected!r} != {actual!r}"
+    if type(expected) is not type(actual) and not (isinstance(expected, (int, np.integer)) and
+                                                   isinstance(actual, (int, np.integer))):
+        return f"{path}: tipo {type(expected).__name__} != {type(actual).__name__}"
+    return None if expected == actual else f"{path}: {expected!r} != {actual!r}"
+
+
+def minimize(text: str, fails: Callable[[str], bool]) -> str:
+    """Reduce el texto (por palabras y luego por caracteres) mientras siga fallando."""
+    for split, join in ((str.split, ' '.join), (list, ''.join)):
+        parts = split(text)
+        if not fails(join(parts)):
+            # Partir por palabras normaliza los espacios; si eso basta para no fallar, se omite
+            continue
+        chunk = max(1, len(parts) // 2)
+        while chunk >= 1 and len(parts) > 1:
+            removed = False
+            start = 0
+            while start < len(parts):
+                candidate = parts[:start] + parts[start + chunk:]
+                if candidate and fails(join(candidate)):
+                    parts = candidate
+                    removed = True
+                else:
+                    start += chunk
+            if not removed:
+                chunk //= 2
+        text = join(parts)
+    return text
+
+
+class DifferentialHarness:
+    """Compara los motores de un proceso con su referencia sobre entradas generadas."""
+
+    def __init__(self, analyzer, predictor, classifier, seed: int = 0):
+        self.analyzer = analyzer
+        self.predictor = predictor
+        self.classifier = classifier
+        self.reference = ReferenceEngine(analyzer, predictor, classifier)
+        self.fuzzer = ComplaintFuzzer(analyzer, classifier, seed=seed)
+        # Segundos acumulados por función: [referencia, optimizado con caché, optimizado sin caché]
+        self.timings = _empty_timings()
+
+    def _timed(self, check: str, side: int, function, *args):
+        started = time.perf_counter()
+        value = function(*args)
+        self.timings[check][side] += time.perf_counter() - started
+        return value
+
+    def _clear_caches(self):
+        self.classifier.triage_cache.clear()
+        self.predictor.prediction_cache.clear()
+        if self.analyzer.spelling_index is not None:
+            self.analyzer.spelling_index.cache.clear()
+
+    def _optimized(self, check: str, function, *args):
+        """(salida sin caché, salida con caché) del motor optimizado."""
+        self._clear_caches()
+        uncached = self._timed(check, 2, function, *args)
+        return uncached, self._timed(check, 1, function, *args)
+
+    @staticmethod
+    def _differences(expected: Any, outputs) -> Optional[str]:
+        uncached, cached = outputs
+        difference = first_difference(expected, uncached)
+        return f"sin caché {difference}" if difference else first_difference(expected, cached)
+
+    def compare(self, text: str, vital_signs: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """Funciones cuya salida difiere de la referencia para esta entrada."""
+        reference, timed = self.reference, self._timed
+        differences = {}
+
+        expected = timed('extract_symptoms', 0, reference.extract_symptoms, text)
+        actual = self._optimized('extract_symptoms', self.analyzer.extract_symptoms, text)
+        differences['extract_symptoms'] = self._differences(expected, actual)
+
+        # El triaje y la predicción se comparan sobre los síntomas de la referencia
+        symptoms = expected
+        expected = timed('classify_triage', 0, reference.classify_triage, symptoms, vital_signs)
+        actual = self._optimized('classify_triage', self.classifier.classify_triage, symptoms, vital_signs)
+        differences['classify_triage'] = self._differences(expected, actual)
+
+        expected = timed('classify_level', 0, reference.classify_level, symptoms, vital_signs)
+        actual = self._optimized('classify_level', self.classifier.classify_level, symptoms, vital_signs)
+        differences['classify_level'] = self._differences(expected, actual)
+
+        names = [s['symptom'] for s in symptoms]
+        expected = timed('predict_diseases', 0, reference.predict_diseases, names)
+        actual = self._optimized('predict_diseases', self.predictor.predict_diseases, names)
+        differences['predict_diseases'] = self._differences(expected, actual)
+
+        return {check: difference for check, difference in differences.items() if difference}
+
+    def compare_batch(self, texts: List[str]) -> List[Dict[str, str]]:
+        """Funciones por lotes cuya salida difiere de la referencia, por entrada.
+
+        Sin signos vitales. El triaje y la predicción por lotes parten de la
+        extracción por lotes: una divergencia en ella se arrastra a las demás.
+        """
+        reference, timed = self.reference, self._timed
+        expected = [timed('extract_symptoms_batch', 0, reference.extract_symptoms, text) for text in texts]
+        extracted = self._optimized('extract_symptoms_batch', self.analyzer.extract_symptoms_batch, texts)
+        batch = extracted[1]
+
+        expected_levels = [timed('classify_levels_batch', 0, reference.classify_level, symptoms)
+                           for symptoms in expected]
+        levels = self._optimized('classify_levels_batch', self.classifier.classify_levels, batch)
+
+        expected_predictions = [
+            timed('predict_diseases_batch', 0, reference.predict_diseases, [s['symptom'] for s in symptoms])
+            for symptoms in expected
+        ]
+        predictions = self._optimized('predict_diseases_batch', self.predictor.predict_diseases_batch, batch)
+
+        results = []
+        for i in range(len(texts)):
+            differences = {
+                'extract_symptoms_batch': self._differences(expected[i],
+                                                            [output.symptoms(i) for output in extracted]),
+                'classify_levels_batch': self._differences(expected_levels[i], [output[i] for output in levels]),
+                'predict_diseases_batch': self._differences(expected_predictions[i],
+                                                            [output[i] for output in predictions])
+            }
+            results.append({check: difference for check, difference in differences.items() if difference})
+        return results
+
+    def run(self, start: int, stop: int, minimize_limit: int = 3) -> Dict[str, Any]:
+        """Evalúa las entradas [start, stop) y minimiza las primeras divergencias de cada función."""
+        divergences = {check: 0 for check in CHECKS}
+        examples = []
+        minimized = {check: 0 for check in CHECKS}
+
+        def record(index, text, vital_signs, differences):
+            for check, difference in differences.items():
+                divergences[check] += 1
+                if minimized[check] < minimize_limit:
+                    minimized[check] += 1
+                    examples.append({
+                        'check': check,
+                        'index': index,
+                        'text': text,
+                        'vital_signs': vital_signs,
+                        'difference': difference,
+                        'minimized': self.minimize(check, text, vital_signs)
+                    })
+
+        texts = []
+        for index in range(start, stop):
+            text, vital_signs = self.fuzzer.text(index), self.fuzzer.vital_signs(index)
+            texts.append(text)
+            record(index, text, vital_signs, self.compare(text, vital_signs))
+
+        for index, differences in enumerate(self.compare_batch(texts), start):
+            record(index, texts[index - start], None, differences)
+
+        return {'inputs': stop - start, 'divergences': divergences, 'examples': examples,
+                'timings': {check: list(values) for check, values in self.timings.items()}}
+
+    def minimize(self, check: str, text: str, vital_signs: Optional[Dict[str, Any]] = None) -> str:
+        # Sin medir tiempos: la minimización no forma parte de la comparación de velocidad
+        timings, self.timings = self.timings, _empty_timings()
+        try:
+            if check in BATCH_CHECKS:
+                return minimize(text, lambda candidate: check in self.compare_batch([candidate])[0])
+            return minimize(text, lambda candidate: check in self.compare(candidate, vital_signs))
+        finally:
+            self.timings = timings
+
+
+# Arnés del proceso (construido por _init_worker en cada worker)
+_harness: Optional[DifferentialHarness] = None
+
+
+def _init_worker(seed: int, spell_correction: bool):
+    global _harness
+    pipeline = build_pipeline(spell_correction)
+    _harness = DifferentialHarness(pipeline.analyzer, pipeline.predictor, pipeline.classifier, seed)
+
+
+def _run_block(bounds: Tuple[int, int]) -> Dict[str, Any]:
+    # Tiempos por bloque: el arnés acumula entre bloques del mismo proceso
+    _harness.timings = _empty_timings()
+    return _harness.run(*bounds)
+
+
+def run_differential(count: int, workers: int = os.cpu_count() or 1, seed: int = 0,
+                     block_size: int = 2000, spell_correction: bool = False,
+                     max_examples: int = 20) -> Dict[str, Any]:
+    """Ejecuta `count` entradas en paralelo y agrega divergencias y tiempos."""
+    blocks = [(start, min(start + block_size, count)) for start in range(0, count, block_size)]
+    divergences = {check: 0 for check in CHECKS}
+    timings = _empty_timings()
+    examples = []
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(seed, spell_correction)) as executor:
+        for block in executor.map(_run_block, blocks):
+            for check in CHECKS:
+                divergences[check] += block['divergences'][check]
+                for side in range(3):
+                    timings[check][side] += block['timings'][check][side]
+            examples.extend(block['examples'][:max(0, max_examples - len(examples))])
+    elapsed = time.perf_counter() - started
+
+    def speedups(side):
+        return {
+            check: values[0] / values[side] if values[side] > 0 and values[0] > 0 else None
+            for check, values in timings.items()
+        }
+
+    def overall(side):
+        total = sum(values[side] for values in timings.values())
+        return sum(values[0] for values in timings.values()) / total if total else None
+
+    return {
+        'inputs': count,
+        'seed': seed,
+        'equivalent': not any(divergences.values()),
+        'divergences': divergences,
+        'speedup_uncached': speedups(2),
+        'speedup_cached': speedups(1),
+        'overall_speedup_uncached': overall(2),
+        'overall_speedup_cached': overall(1),
+        'timings_s': timings,
+        'elapsed_s': elapsed,
+        'inputs_per_s': count / elapsed if elapsed > 0 else 0.0,
+        'examples': examples
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    verdict = "equivalentes" if report['equivalent'] else "DIVERGENTES"
+    lines = [f"Entradas: {report['inputs']:,} (semilla {report['seed']}) en {report['elapsed_s']:.1f} s "
+             f"({report['inputs_per_s']:,.0f}/s) — motores {verdict}"]
+    lines.append(f"  {'':<22} {'':>20}   aceleración sin caché / con caché")
+
+    def ratio(speedup):
+        return f"x{speedup:.1f}" if speedup is not None else "—"
+
+    for check in CHECKS:
+        lines.append(f"  {check:<22} divergencias {report['divergences'][check]:>7,}   "
+                     f"{ratio(report['speedup_uncached'][check]):>9} / {ratio(report['speedup_cached'][check])}")
+    lines.append(f"  {'total':<22} {'':>20}   {ratio(report['overall_speedup_uncached']):>9} / "
+                 f"{ratio(report['overall_speedup_cached'])}")
+    for example in report['examples']:
+        lines.append(f"\n[{example['check']}] entrada {example['index']}: {example['difference']}")
+        lines.append(f"  original:  {example['text']!r}")
+        lines.append(f"  mínima:    {example['minimized']!r}")
+        if example['vital_signs']:
+            lines.append(f"  signos vitales: {example['vital_signs']}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pruebas diferenciales frente a la referencia congelada")
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--block-size', type=int, default=2000)
+    parser.add_argument('--spell-correction', action='store_true',
+                        help="Activar la corrección ortográfica (desactivada por defecto)")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    report = run_differential(args.count, args.workers, args.seed, args.block_size,
+                              spell_correction=args.spell_correction)
+    print(json.dumps(report, indent=2, ensure_ascii=False) if args.json else format_report(report))
+    raise SystemExit(0 if report['equivalent'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""Evaluación en paralelo sobre casos etiquetados: exactitud clínica y latencia
+
+Cada caso del corpus (JSONL) tiene el texto del paciente, el nivel de triaje
+esperado y, opcionalmente, las enfermedades aceptables. Los casos se reparten
+en fragmentos entre un pool de procesos; cada proceso construye el pipeline
+una sola vez. El informe reúne la matriz de confusión por nivel, la
+exactitud top-k de enfermedades y los percentiles de latencia por caso.
+
+La memoización de las etapas se vacía antes de cada caso: la latencia
+principal es en frío, también con --repeat. Cada caso se ejecuta después una
+segunda vez, con la memoización ya poblada, y su latencia se informa aparte
+como latencia en caliente.
+
+Para comprobar que una optimización no cambia la salida clínica se guardan
+las salidas de una versión (--save-outputs) y se comparan con las de otra
+(--baseline). El proceso termina con código 1 si algún caso cambia de nivel
+o de ranking de enfermedades, o si no se alcanzan los umbrales
+--min-accuracy y --max-under-triage.
+
+Uso: python -m src.data.evaluation [--cases casos.jsonl] [--workers 4]
+     [--save-outputs salidas.jsonl] [--baseline salidas.jsonl]
+     [--min-accuracy 0.25] [--max-under-triage 42]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from ..chatbot.symptom_analyzer import SymptomAnalyzer
+from ..chatbot.disease_predictor import DiseasePredictor
+from ..chatbot.triage_classifier import TriageClassifier
+from ..chatbot.pipeline import TriagePipeline
+from ..utils.language import SUPPORTED_LANGUAGES
+from ..utils.spelling import SymSpellIndex, medical_vocabulary
+from ..utils.text_folding import fold_text
+
+DEFAULT_CASES = os.path.join(os.path.dirname(__file__), 'labeled_cases.jsonl')
+
+TRIAGE_LEVELS = [1, 2, 3, 4, 5]
+TOP_K = (1, 3, 5)
+
+# Pipeline del proceso (construido por _init_worker en cada worker)
+_pipeline: Optional[TriagePipeline] = None
+
+
+def load_cases(path: str = DEFAULT_CASES, repeat: int = 1) -> List[Dict[str, Any]]:
+    """Casos etiquetados; `repeat` los multiplica para estabilizar los percentiles."""
+    with open(path, 'r', encoding='utf-8') as source:
+        cases = [json.loads(line) for line in source if line.strip()]
+    for index, case in enumerate(cases):
+        case.setdefault('id', f'caso-{index + 1:03d}')
+        case.setdefault('expected_diseases', [])
+    return cases * repeat
+
+
+def build_pipeline(spell_correction: bool = False, languages=SUPPORTED_LANGUAGES) -> TriagePipeline:
+    """Pipeline con la misma configuración que la aplicación Streamlit."""
+    analyzer = SymptomAnalyzer(languages=languages)
+    predictor = DiseasePredictor()
+    classifier = TriageClassifier()
+    if spell_correction:
+        analyzer.spelling_index = SymSpellIndex(medical_vocabulary(analyzer, classifier, predictor))
+    return TriagePipeline(analyzer, predictor, classifier)
+
+
+def _init_worker(spell_correction: bool = False):
+    global _pipeline
+    _pipeline = build_pipeline(spell_correction)
+    # Primera llamada fuera de la medición: cargas perezosas (TextBlob, paquetes de idioma)
+    _pipeline.run("dolor de cabeza")
+
+
+def evaluate_shard(cases: List[Dict[str, Any]], top_k: int = max(TOP_K)) -> List[Dict[str, Any]]:
+    """Ejecuta el pipeline del proceso sobre un fragmento de casos."""
+    outputs = []
+    for case in cases:
+        # En frío: sin aciertos de memoización de casos anteriores ni de repeticiones
+        _pipeline.clear_caches()
+        started = time.perf_counter()
+        result = _pipeline.run(case['text'], vital_signs=case.get('vital_signs'))
+        latency_ms = (time.perf_counter() - started) * 1000.0
+
+        started = time.perf_counter()
+        _pipeline.run(case['text'], vital_signs=case.get('vital_signs'))
+        warm_latency_ms = (time.perf_counter() - started) * 1000.0
+
+        outputs.append({
+            'id': case['id'],
+            'triage_level': result['triage']['triage_level'],
+            'diseases': [d['disease'] for d in result['diseases'][:top_k]],
+            'latency_ms': latency_ms,
+            'warm_latency_ms': warm_latency_ms
+        })
+    return outputs
+
+
+def run_evaluation(cases: List[Dict[str, Any]], workers: int = os.cpu_count() or 1,
+                   shards_per_worker: int = 4, spell_correction: bool = False) -> List[Dict[str, Any]]:
+    """Salidas por caso, en el orden de `cases`."""
+    shard_count = max(1, min(len(cases), workers * shards_per_worker))
+    positions = [range(i, len(cases), shard_count) for i in range(shard_count)]
+    shards = [[cases[position] for position in shard] for shard in positions]
+
+    outputs: List[Optional[Dict[str, Any]]] = [None] * len(cases)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(spell_correction,)) as executor:
+        for shard, shard_outputs in zip(positions, executor.map(evaluate_shard, shards)):
+            for position, output in zip(shard, shard_outputs):
+                outputs[position] = output
+    return outputs
+
+
+def disease_key(name: str) -> str:
+    """Clave común para 'Infarto Agudo Miocardio' e 'infarto_agudo_miocardio'."""
+    return fold_text(name).replace(' ', '_')
+
+
+def _top_k_hit(case: Dict[str, Any], output: Dict[str, Any], k: int) -> bool:
+    expected = {disease_key(name) for name in case['expected_diseases']}
+    return any(disease_key(name) in expected for name in output['diseases'][:k])
+
+
+def _percentiles(latencies: Sequence[float]) -> Dict[str, float]:
+    if not len(latencies):
+        return {}
+    latencies = np.array(latencies)
+    return {
+        'p50': float(np.percentile(latencies, 50)),
+        'p90': float(np.percentile(latencies, 90)),
+        'p99': float(np.percentile(latencies, 99)),
+        'max': float(latencies.max())
+    }
+
+
+def build_report(cases: Sequence[Dict[str, Any]], outputs: Sequence[Dict[str, Any]],
+                 elapsed_s: Optional[float] = None) -> Dict[str, Any]:
+    """Matriz de confusión, exactitud top-k de enfermedades y percentiles de latencia."""
+    index = {level: i for i, level in enumerate(TRIAGE_LEVELS)}
+    confusion = np.zeros((len(TRIAGE_LEVELS), len(TRIAGE_LEVELS)), dtype=int)
+    mismatches = []
+    for case, output in zip(cases, outputs):
+        expected, predicted = case['expected_triage'], output['triage_level']
+        confusion[index[expected], index[predicted]] += 1
+        if expected != predicted:
+            mismatches.append({'id': case['id'], 'text': case['text'],
+                               'expected': expected, 'predicted': predicted})
+
+    per_level = {}
+    for level, i in index.items():
+        support = int(confusion[i].sum())
+        predicted = int(confusion[:, i].sum())
+        per_level[level] = {
+            'support': support,
+            'recall': float(confusion[i, i] / support) if support else None,
+            'precision': float(confusion[i, i] / predicted) if predicted else None
+        }
+
+    # Nivel numérico mayor = menos urgente: infratriaje es asignar menos urgencia de la debida
+    under_triage = int(np.triu(confusion, k=1).sum())
+    over_triage = int(np.tril(confusion, k=-1).sum())
+
+    labeled = [(case, output) for case, output in zip(cases, outputs) if case['expected_diseases']]
+    top_k_accuracy = {
+        k: sum(_top_k_hit(case, output, k) for case, output in labeled) / len(labeled) if labeled else None
+        for k in TOP_K
+    }
+
+    report = {
+        'cases': len(cases),
+        'triage_accuracy': float(np.trace(confusion) / len(cases)) if len(cases) else 0.0,
+        'confusion_matrix': confusion.tolist(),
+        'per_level': per_level,
+        'under_triage': under_triage,
+        'over_triage': over_triage,
+        'disease_cases': len(labeled),
+        'top_k_accuracy': top_k_accuracy,
+        'latency_ms': _percentiles([output['latency_ms'] for output in outputs]),
+        'warm_latency_ms': _percentiles([output['warm_latency_ms'] for output in outputs
+                                         if 'warm_latency_ms' in output]),
+        'mismatches': mismatches
+    }
+    if elapsed_s is not None:
+        report['elapsed_s'] = elapsed_s
+        report['throughput_cases_s'] = len(cases) / elapsed_s if elapsed_s > 0 else 0.0
+    return report
+
+
+def save_outputs(path: str, outputs: Sequence[Dict[str, Any]]):
+    """Guarda las salidas clínicas (sin latencias) para compararlas con otra versión."""
+    with open(path, 'w', encoding='utf-8') as target:
+        for output in outputs:
+            clinical = {key: value for key, value in output.items()
+                        if key not in ('latency_ms', 'warm_latency_ms')}
+            target.write(json.dumps(clinical, ensure_ascii=False) + '\n')
+
+
+def compare_outputs(baseline_path: str, outputs: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Casos cuyo nivel de triaje o ranking de enfermedades cambió respecto a la referencia."""
+    with open(baseline_path, 'r', encoding='utf-8') as source:
+        baseline = {record['id']: record for record in map(json.loads, filter(str.strip, source))}
+
+    triage_changed, diseases_changed, missing = [], [], 0
+    for output in outputs:
+        reference = baseline.get(output['id'])
+        if reference is None:
+            missing += 1
+            continue
+        if reference['triage_level'] != output['triage_level']:
+            triage_changed.append({'id': output['id'], 'baseline': reference['triage_level'],
+                                   'current': output['triage_level']})
+        if reference['diseases'] != output['diseases']:
+            diseases_changed.append({'id': output['id'], 'baseline': reference['diseases'],
+                                     'current': output['diseases']})
+
+    return {
+        'compared': len(outputs) - missing,
+        'missing': missing,
+        'triage_changed': triage_changed,
+        'diseases_changed': diseases_changed,
+        'identical': not triage_changed and not diseases_changed and not missing
+    }
+
+
+def check_thresholds(report: Dict[str, Any], min_accuracy: Optional[float] = None,
+                     max_under_triage: Optional[int] = None) -> List[str]:
+    """Umbrales clínicos incumplidos; vacío si el informe los cumple todos."""
+    failures = []
+    if min_accuracy is not None and report['triage_accuracy'] < min_accuracy:
+        failures.append(f"exactitud de triaje {report['triage_accuracy']:.1%} < {min_accuracy:.1%}")
+    if max_under_triage is not None and report['under_triage'] > max_under_triage:
+        failures.append(f"infratriaje {report['under_triage']} > {max_under_triage}")
+    return failures
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [f"Casos: {report['cases']}  Exactitud de triaje: {report['triage_accuracy']:.1%}  "
+             f"(infratriaje {report['under_triage']}, sobretriaje {report['over_triage']})",
+             "",
+             "Matriz de confusión (filas: esperado, columnas: obtenido)",
+             "      " + "".join(f"{level:>5}" for level in TRIAGE_LEVELS)]
+    for level, row in zip(TRIAGE_LEVELS, report['confusion_matrix']):
+        lines.append(f"  N{level}  " + "".join(f"{count:>5}" for count in row))
+
+    lines.append("")
+    lines.append(f"Enfermedades ({report['disease_cases']} casos): " + ", ".join(
+        f"top-{k} {value:.1%}" for k, value in report['top_k_accuracy'].items() if value is not None))
+    if report['latency_ms']:
+        lines.append("Latencia por caso en frío: " + ", ".join(
+            f"{key} {value:.1f} ms" for key, value in report['latency_ms'].items()))
+    if report['warm_latency_ms']:
+        lines.append("Latencia por caso en caliente: " + ", ".join(
+            f"{key} {value:.1f} ms" for key, value in report['warm_latency_ms'].items()))
+    if 'throughput_cases_s' in report:
+        lines.append(f"Rendimiento: {report['throughput_cases_s']:.0f} casos/s en {report['elapsed_s']:.1f} s")
+
+    if report['mismatches']:
+        lines.append("")
+        lines.append("Discrepancias de triaje:")
+        seen = set()
+        for mismatch in report['mismatches']:
+            if mismatch['id'] in seen:
+                continue
+            seen.add(mismatch['id'])
+            lines.append(f"  {mismatch['id']}: esperado {mismatch['expected']}, "
+                         f"obtenido {mismatch['predicted']} — {mismatch['text']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluación del triaje sobre casos etiquetados")
+    parser.add_argument('--cases', default=DEFAULT_CASES)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=1, help='repite el corpus para medir latencias')
+    parser.add_argument('--spell-correction', action='store_true',
+                        help="Activar la corrección ortográfica (desactivada por defecto)")
+    parser.add_argument('--save-outputs', help='guarda las salidas clínicas en este JSONL')
+    parser.add_argument('--baseline', help='compara con salidas guardadas de otra versión')
+    parser.add_argument('--min-accuracy', type=float, help='exactitud de triaje mínima (0-1)')
+    parser.add_argument('--max-under-triage', type=int, help='casos infratriados como máximo')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    cases = load_cases(args.cases, args.repeat)
+    started = time.perf_counter()
+    outputs = run_evaluation(cases, args.workers, spell_correction=args.spell_correction)
+    report = build_report(cases, outputs, elapsed_s=time.perf_counter() - started)
+
+    if args.save_outputs:
+        save_outputs(args.save_outputs, outputs)
+    if args.baseline:
+        report['baseline'] = compare_outputs(args.baseline, outputs)
+    report['threshold_failures'] = check_thresholds(report, args.min_accuracy, args.max_under_triage)
+    passed = not report['threshold_failures'] and report.get('baseline', {}).get('identical', True)
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(format_report(report))
+        if args.baseline:
+            comparison = report['baseline']
+            print(f"\nFrente a la referencia: {comparison['compared']} casos, "
+                  f"{len(comparison['triage_changed'])} con otro nivel, "
+                  f"{len(comparison['diseases_changed'])} con otro ranking de enfermedades, "
+                  f"{comparison['missing']} sin referencia")
+        for failure in report['threshold_failures']:
+            print(f"Umbral incumplido: {failure}")
+    raise SystemExit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
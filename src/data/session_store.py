@@ -0,0 +1,371 @@
+"""Sesiones y estado del paciente en SQLite (WAL), compartidos entre procesos
+
+Cada sesión guarda los datos del paciente, los síntomas acumulados y el
+último resultado de triaje. La base está en modo WAL: los lectores no
+bloquean al escritor y varios procesos de la aplicación pueden usar el mismo
+fichero.
+
+Cada hilo usa su propia conexión, y las sentencias son constantes que
+sqlite3 mantiene preparadas en su caché por conexión. Las escrituras no van
+al disco en el hilo llamante. Cada una queda pendiente en memoria como una
+operación (mezclar datos del paciente, acumular síntomas, guardar el
+resultado, borrar), y un hilo escritor confirma todo lo pendiente en una sola
+transacción cada `flush_interval` segundos. La transacción empieza con BEGIN
+IMMEDIATE, vuelve a leer cada sesión y le aplica las operaciones: lo que otro
+proceso haya confirmado entretanto se conserva. Las lecturas consultan
+primero lo pendiente, así que en el mismo proceso se lee siempre lo último
+escrito. Los demás procesos lo ven tras la siguiente confirmación, o antes si
+se llama a flush(). Si una confirmación falla (base bloqueada más allá de
+`busy_timeout`, disco lleno), el escritor lo registra y la reintenta: nada
+pendiente se pierde mientras el proceso siga vivo.
+
+Datos de salud: la base guarda en claro nombre, edad, síntomas y resultados,
+y la única clave es el identificador de sesión que viaja en la URL. El
+fichero se crea con permisos 0600 y los borrados sobrescriben el contenido
+(secure_delete), pero la protección del fichero (disco cifrado, copias de
+seguridad) corre a cargo del despliegue. Las sesiones sin escrituras en
+`ttl` segundos (24 horas por defecto) caducan: dejan de leerse y se borran
+al abrir el almacén y después, como mucho, cada `purge_interval` segundos.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    patient TEXT NOT NULL,
+    symptoms TEXT NOT NULL,
+    last_result TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions (updated_at);
+"""
+
+SELECT_SESSION = "SELECT patient, symptoms, last_result, updated_at FROM sessions WHERE session_id = ?"
+UPSERT_SESSION = """
+INSERT INTO sessions (session_id, patient, symptoms, last_result, updated_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(session_id) DO UPDATE SET
+    patient = excluded.patient, symptoms = excluded.symptoms,
+    last_result = excluded.last_result, updated_at = excluded.updated_at
+"""
+DELETE_SESSION = "DELETE FROM sessions WHERE session_id = ?"
+DELETE_EXPIRED = "DELETE FROM sessions WHERE updated_at < ?"
+
+DEFAULT_TTL = 24 * 3600.0
+
+# Fila de una sesión borrada que aún no se ha confirmado
+_DELETED = None
+# Operación pendiente de borrado
+_DELETE = object()
+
+
+class _Connection(sqlite3.Connection):
+    """Conexión con referencias débiles: la de un hilo terminado se libera sola."""
+
+
+def _json_default(value):
+    # Confianzas y puntuaciones numpy del pipeline
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+
+def _plain(value):
+    """Copia con los tipos que se guardarán: el llamante puede modificar el original."""
+    return json.loads(_dumps(value))
+
+
+def _accumulate(session: Dict[str, Any], symptoms: List[Dict[str, Any]]):
+    accumulated = {symptom['symptom']: symptom for symptom in session['symptoms']}
+    accumulated.update((symptom['symptom'], dict(symptom)) for symptom in symptoms)
+    session['symptoms'] = list(accumulated.values())
+
+
+def _encode(session: Dict[str, Any]) -> tuple:
+    return (_dumps(session['patient']), _dumps(session['symptoms']),
+            _dumps(session['last_result']) if session['last_result'] is not None else None,
+            session['updated_at'])
+
+
+def empty_session(session_id: str) -> Dict[str, Any]:
+    return {'session_id': session_id, 'patient': {}, 'symptoms': [], 'last_result': None, 'updated_at': None}
+
+
+class SessionStore:
+    """Almacén de sesiones con conexión por hilo y escrituras agrupadas.
+
+    flush_interval=0 confirma cada escritura en el hilo llamante. ttl=None
+    conserva las sesiones indefinidamente.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.02, busy_timeout: float = 5.0,
+                 ttl: Optional[float] = DEFAULT_TTL, purge_interval: float = 300.0,
+                 retry_interval: float = 0.5):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.busy_timeout = busy_timeout
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self.retry_interval = retry_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(path):
+            # Datos de salud: solo el usuario del proceso (WAL y shm heredan los permisos)
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT, 0o600))
+
+        self.writes = 0
+        self.commits = 0
+
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        # session_id -> (operaciones sin confirmar, fila resultante o _DELETED)
+        self._pending: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._closed = False
+
+        self._connection().executescript(SCHEMA)
+        self._next_purge = 0.0
+        self.purge_expired()
+        self._writer = None
+        if flush_interval > 0:
+            self._writer = threading.Thread(target=self._run, name='session-store-writer', daemon=True)
+            self._writer.start()
+
+    # Lectura
+
+    def get(self, session_id: str) -> Dict[str, Any]:
+        """Estado de la sesión; vacío si no existe o ha caducado."""
+        with self._lock:
+            pending = self._pending.get(session_id)
+        if pending is not None:
+            return self._decode(session_id, pending[1])
+        return self._decode(session_id, self._connection().execute(SELECT_SESSION, (session_id,)).fetchone())
+
+    def _decode(self, session_id: str, row) -> Dict[str, Any]:
+        if row is _DELETED or self._expired(row[3]):
+            return empty_session(session_id)
+        patient, symptoms, last_result, updated_at = row
+        return {
+            'session_id': session_id,
+            'patient': json.loads(patient),
+            'symptoms': json.loads(symptoms),
+            'last_result': json.loads(last_result) if last_result is not None else None,
+            'updated_at': updated_at
+        }
+
+    def _expired(self, updated_at: float) -> bool:
+        return self.ttl is not None and updated_at < time.time() - self.ttl
+
+    # Escritura
+
+    def update_patient(self, session_id: str, **fields):
+        """Mezcla datos del paciente (nombre, edad...) en la sesión."""
+        fields = _plain(fields)
+
+        def change(session):
+            session['patient'].update(fields)
+        self._modify(session_id, change)
+
+    def add_symptoms(self, session_id: str, symptoms: List[Dict[str, Any]]):
+        """Acumula síntomas; uno ya presente se sustituye por la lectura más reciente."""
+        symptoms = _plain(symptoms)
+        self._modify(session_id, lambda session: _accumulate(session, symptoms))
+
+    def set_result(self, session_id: str, result: Dict[str, Any]):
+        """Guarda el último resultado de triaje de la sesión."""
+        result = _plain(result)
+
+        def change(session):
+            session['last_result'] = result
+        self._modify(session_id, change)
+
+    def record_result(self, session_id: str, result: Dict[str, Any]):
+        """Resultado del pipeline: acumula sus síntomas y lo guarda como último resultado."""
+        result = _plain(result)
+
+        def change(session):
+            _accumulate(session, result.get('symptoms') or [])
+            session['last_result'] = result
+        self._modify(session_id, change)
+
+    def delete(self, session_id: str):
+        self._modify(session_id, _DELETE)
+
+    def _modify(self, session_id: str, change):
+        if self._closed:
+            raise RuntimeError("El almacén de sesiones está cerrado")
+        operation = (change, time.time())
+        # Aplicar sobre la última fila conocida sin que otro hilo intercale su escritura
+        with self._lock:
+            pending = self._pending.get(session_id)
+            if pending is not None:
+                operations, row = pending
+            else:
+                operations = []
+                row = self._connection().execute(SELECT_SESSION, (session_id,)).fetchone()
+            session = self._apply(session_id, row, [operation])
+            self._pending[session_id] = (operations + [operation],
+                                         _encode(session) if session is not None else _DELETED)
+        self._written()
+
+    def _apply(self, session_id: str, row, operations) -> Optional[Dict[str, Any]]:
+        """Sesión resultante de aplicar las operaciones a la fila; None si queda borrada."""
+        session = self._decode(session_id, row)
+        deleted = row is _DELETED
+        for change, updated_at in operations:
+            if change is _DELETE:
+                session, deleted = empty_session(session_id), True
+            else:
+                change(session)
+                session['updated_at'], deleted = updated_at, False
+        return None if deleted else session
+
+    def _written(self):
+        self.writes += 1
+        if self._writer is None:
+            self.flush()
+        else:
+            self._dirty.set()
+
+    # Confirmación
+
+    def flush(self) -> int:
+        """Confirma ahora todo lo pendiente; devuelve el número de sesiones escritas."""
+        with self._commit_lock:
+            with self._lock:
+                batch = {session_id: operations for session_id, (operations, _) in self._pending.items()}
+            if not batch:
+                self._purge_if_due()
+                return 0
+
+            connection = self._connection()
+            # El bloqueo de escritura se toma antes de releer: nadie confirma entre la lectura y la escritura
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                upserts, deletes = [], []
+                for session_id, operations in batch.items():
+                    row = connection.execute(SELECT_SESSION, (session_id,)).fetchone()
+                    session = self._apply(session_id, row, operations)
+                    if session is None:
+                        deletes.append((session_id,))
+                    else:
+                        upserts.append((session_id, *_encode(session)))
+                if upserts:
+                    connection.executemany(UPSERT_SESSION, upserts)
+                if deletes:
+                    connection.executemany(DELETE_SESSION, deletes)
+                connection.execute("COMMIT")
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            self.commits += 1
+
+            # Las operaciones añadidas durante la transacción siguen pendientes
+            with self._lock:
+                for session_id, operations in batch.items():
+                    current, row = self._pending[session_id]
+                    if len(current) == len(operations):
+                        del self._pending[session_id]
+                    else:
+                        self._pending[session_id] = (current[len(operations):], row)
+            self._purge_if_due()
+            return len(batch)
+
+    def purge_expired(self) -> int:
+        """Borra las sesiones caducadas; devuelve cuántas."""
+        self._next_purge = time.time() + self.purge_interval
+        if self.ttl is None:
+            return 0
+        cursor = self._connection().execute(DELETE_EXPIRED, (time.time() - self.ttl,))
+        return cursor.rowcount
+
+    def _purge_if_due(self):
+        if time.time() < self._next_purge:
+            return
+        try:
+            self.purge_expired()
+        except sqlite3.Error as exc:
+            # Las sesiones caducadas ya no se leen; se reintenta en el siguiente intervalo
+            logger.warning("No se pudieron borrar las sesiones caducadas de %s: %s", self.path, exc)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def close(self):
+        """Confirma lo pendiente, detiene el hilo escritor y cierra las conexiones."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._writer is not None:
+            self._stop.set()
+            self._dirty.set()
+            self._writer.join()
+        self.flush()
+        with self._connections_lock:
+            for connection in list(self._connections):
+                connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Conexiones e hilo escritor
+
+    def _connection(self) -> sqlite3.Connection:
+        """Conexión del hilo actual; se abre al primer uso."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # check_same_thread=False solo para poder cerrarla desde close();
+            # isolation_level=None: las transacciones las abre flush() con BEGIN IMMEDIATE
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, factory=_Connection,
+                                         cached_statements=64, check_same_thread=False,
+                                         isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # En WAL, NORMAL solo sincroniza en los checkpoints; una caída del SO puede perder la última transacción
+            connection.execute("PRAGMA synchronous=NORMAL")
+            # Las sesiones borradas o caducadas no quedan legibles en las páginas libres
+            connection.execute("PRAGMA secure_delete=ON")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.add(connection)
+        return connection
+
+    def _run(self):
+        while not self._closed:
+            self._dirty.wait()
+            if self._closed:
+                break
+            # Esperar el intervalo para agrupar las escrituras que lleguen mientras tanto; close() lo interrumpe
+            self._stop.wait(self.flush_interval)
+            self._dirty.clear()
+            try:
+                self.flush()
+            except Exception as exc:
+                # Lo pendiente se conserva: se reintenta en la siguiente vuelta
+                logger.error("Fallo al confirmar las sesiones en %s: %s", self.path, exc)
+                self._dirty.set()
+                self._stop.wait(self.retry_interval)
@@ -0,0 +1,82 @@
+"""Generación de datos sintéticos de síntomas para pruebas y benchmarks"""
+
+import random
+from typing import List, Dict, Any
+
+SEVERITIES = ['leve', 'moderado', 'severo']
+
+
+def symptom_vocabulary(analyzer, classifier) -> List[str]:
+    """Reúne palabras clave y criterios de triaje como vocabulario de síntomas."""
+    vocabulary = set()
+    
+    for data in analyzer.symptom_keywords.values():
+        vocabulary.update(data['keywords'])
+    
+    for criteria in list(classifier.level_1_criteria.values()) + list(classifier.level_2_criteria.values()):
+        vocabulary.update(criteria)
+    vocabulary.update(classifier.level_3_criteria)
+    vocabulary.update(classifier.level_4_criteria)
+    
+    return sorted(vocabulary)
+
+
+def generate_symptom_sets(analyzer, classifier, count: int, seed: int = 0,
+                          max_symptoms: int = 6) -> List[List[Dict[str, Any]]]:
+    """Genera listas de síntomas aleatorias con el formato de extract_symptoms."""
+    rng = random.Random(seed)
+    vocabulary = symptom_vocabulary(analyzer, classifier)
+    categories = sorted(analyzer.symptom_keywords) + ['']
+    
+    symptom_sets = []
+    for _ in range(count):
+        symptoms = []
+        for _ in range(rng.randint(0, max_symptoms)):
+            symptom = {
+                'symptom': rng.choice(vocabulary),
+                'category': rng.choice(categories),
+                'urgency_level': rng.randint(1, 4)
+            }
+            # Algunas entradas omiten la severidad para cubrir los valores por defecto
+            if rng.random() < 0.9:
+                symptom['severity'] = rng.choice(SEVERITIES)
+            symptoms.append(symptom)
+        symptom_sets.append(symptoms)
+    
+    return symptom_sets
+
+
+def generate_knowledge_base(conditions: int = 10000, vocabulary: int = 50000,
+                            seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Base de conocimiento sintética con el formato de medical_knowledge."""
+    rng = random.Random(seed)
+    words = [f"termino{i}" for i in range(vocabulary)]
+    return {
+        f"condicion_{i}": {
+            'symptoms': rng.sample(words, 12),
+            'severity': 'moderado',
+            'description': ' '.join(rng.sample(words, 40)),
+            'recommendations': []
+        }
+        for i in range(conditions)
+    }
+
+
+COMPLAINT_OPENINGS = ['tengo', 'siento', 'presento', 'mi hijo tiene', 'desde ayer tengo', 'me dio']
+COMPLAINT_DURATIONS = ['', 'desde hace {n} horas', 'desde hace {n} días', 'desde esta mañana']
+
+
+def generate_complaints(analyzer, classifier, count: int, seed: int = 0,
+                        max_symptoms: int = 4) -> List[str]:
+    """Genera textos libres de pacientes a partir del vocabulario de síntomas."""
+    rng = random.Random(seed)
+    vocabulary = symptom_vocabulary(analyzer, classifier)
+    
+    complaints = []
+    for _ in range(count):
+        terms = rng.sample(vocabulary, rng.randint(1, max_symptoms))
+        symptoms = ', '.join(terms[:-1]) + (' y ' if len(terms) > 1 else '') + terms[-1]
+        duration = rng.choice(COMPLAINT_DURATIONS).format(n=rng.randint(1, 12))
+        complaints.append(' '.join(part for part in (rng.choice(COMPLAINT_OPENINGS), symptoms, duration) if part))
+    
+    return complaints
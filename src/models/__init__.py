@@ -1,3 +1,13 @@
 """Machine learning models for medical diagnosis"""
 
-# ML models will be added here in future versions
\ No newline at end of file
+from .shared_knowledge import SharedKnowledgeBase, SharedDiseaseIndex, attach, save_memmap, load_memmap
+from .embedding_index import DenseDiseaseIndex
+
+__all__ = [
+    'SharedKnowledgeBase',
+    'SharedDiseaseIndex',
+    'attach',
+    'save_memmap',
+    'load_memmap',
+    'DenseDiseaseIndex'
+]
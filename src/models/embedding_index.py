@@ -0,0 +1,92 @@
+"""Índice denso de enfermedades con búsqueda top-k por bloques
+
+Proyecta el espacio TF-IDF a un espacio latente (LSA: SVD truncada) que se
+construye offline y se guarda localmente. Los vectores de enfermedad se
+almacenan en float32 normalizados L2, y las consultas se puntúan con
+productos matriciales por bloques y np.argpartition, de modo que la memoria
+por consulta depende del tamaño de bloque y no del número de condiciones.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class DenseDiseaseIndex:
+    """Vectores de enfermedad densos y proyección de consultas TF-IDF."""
+
+    def __init__(self, components: np.ndarray, embeddings: np.ndarray,
+                 disease_names: List[str], block_size: int = 8192):
+        # components: (términos x dimensiones); embeddings: (enfermedades x dimensiones)
+        self.components = np.ascontiguousarray(components, dtype=np.float32)
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        self.disease_names = list(disease_names)
+        self.block_size = block_size
+
+    @classmethod
+    def build(cls, disease_vectors, disease_names: List[str], dimensions: int = 128,
+              block_size: int = 8192, seed: int = 0) -> 'DenseDiseaseIndex':
+        """Construye el índice LSA a partir de la matriz TF-IDF de enfermedades."""
+        n_diseases, n_terms = disease_vectors.shape
+        dimensions = max(1, min(dimensions, n_diseases - 1, n_terms - 1))
+
+        svd = TruncatedSVD(n_components=dimensions, random_state=seed)
+        embeddings = svd.fit_transform(disease_vectors)
+        return cls(svd.components_.T, _normalize_rows(embeddings), disease_names, block_size)
+
+    def save(self, path: str):
+        """Guarda el índice en un archivo .npz local."""
+        np.savez(path, components=self.components, embeddings=self.embeddings,
+                 disease_names=np.array(self.disease_names))
+
+    @classmethod
+    def load(cls, path: str, block_size: int = 8192) -> 'DenseDiseaseIndex':
+        with np.load(path) as stored:
+            return cls(stored['components'], stored['embeddings'],
+                       stored['disease_names'].tolist(), block_size)
+
+    def embed(self, query_vectors) -> np.ndarray:
+        """Proyecta vectores TF-IDF (dispersos, una fila por consulta) al espacio denso."""
+        # La consulta en float32 evita convertir toda la proyección a float64
+        projected = np.asarray(query_vectors.astype(np.float32) @ self.components)
+        return _normalize_rows(projected)
+
+    def search(self, query_vectors, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k enfermedades por consulta, ordenadas por similitud descendente.
+
+        Devuelve (índices, puntuaciones), ambos de forma (consultas x k).
+        """
+        queries = self.embed(query_vectors)
+        n_queries = queries.shape[0]
+        n_diseases = self.embeddings.shape[0]
+        k = min(k, n_diseases)
+
+        best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        best_indices = np.full((n_queries, k), -1, dtype=np.int64)
+
+        for start in range(0, n_diseases, self.block_size):
+            block = self.embeddings[start:start + self.block_size]
+            block_scores = queries @ block.T
+
+            # Mejores k del bloque, luego fusión con los acumulados
+            block_k = min(k, block.shape[0])
+            if block_k < block.shape[0]:
+                top = np.argpartition(-block_scores, block_k - 1, axis=1)[:, :block_k]
+            else:
+                top = np.broadcast_to(np.arange(block.shape[0]), block_scores.shape)
+
+            merged_scores = np.concatenate([best_scores, np.take_along_axis(block_scores, top, axis=1)], axis=1)
+            merged_indices = np.concatenate([best_indices, top + start], axis=1)
+            keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_indices = np.take_along_axis(merged_indices, keep, axis=1)
+
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        return np.take_along_axis(best_indices, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
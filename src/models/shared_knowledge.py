@@ -0,0 +1,211 @@
+"""Matrices de la base de conocimiento compartidas entre procesos
+
+Los buffers de la matriz dispersa de enfermedades (data, indices, indptr),
+el vector IDF y el vocabulario se publican una vez en un bloque de
+multiprocessing.shared_memory o en archivos .npy mapeados en memoria. Cada
+worker adjunta vistas de solo lectura sin copiar nada, por lo que añadir
+workers solo añade la memoria de cada solicitud.
+"""
+
+import json
+import os
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Orden de los arrays dentro del bloque compartido
+KNOWLEDGE_ARRAYS = ('data', 'indices', 'indptr', 'idf', 'terms', 'term_columns')
+
+# Alineación de cada array dentro del bloque
+_ALIGNMENT = 64
+
+
+def export_arrays(predictor) -> Dict[str, np.ndarray]:
+    """Extrae del predictor los arrays que definen su índice TF-IDF."""
+    vectors = predictor.disease_vectors.tocsr()
+    vocabulary = predictor.vectorizer.vocabulary_
+
+    # Términos en orden de bytes UTF-8 para poder buscarlos con searchsorted
+    encoded = sorted((term.encode('utf-8'), column) for term, column in vocabulary.items())
+    width = max((len(term) for term, _ in encoded), default=1)
+
+    return {
+        'data': vectors.data,
+        'indices': vectors.indices,
+        'indptr': vectors.indptr,
+        'idf': predictor.vectorizer.idf_,
+        'terms': np.array([term for term, _ in encoded], dtype=f'S{width}'),
+        'term_columns': np.array([column for _, column in encoded], dtype=np.int64)
+    }
+
+
+def _metadata(predictor) -> Dict[str, Any]:
+    # Solo parámetros serializables en JSON; dtype no afecta al analizador
+    params = predictor.vectorizer.get_params()
+    params.pop('dtype', None)
+    return {
+        'shape': list(predictor.disease_vectors.shape),
+        'disease_names': list(predictor.disease_names),
+        'vectorizer_params': params
+    }
+
+
+def _vectorizer_from_params(params: Dict[str, Any]) -> TfidfVectorizer:
+    params = dict(params)
+    if params.get('ngram_range') is not None:
+        params['ngram_range'] = tuple(params['ngram_range'])
+    return TfidfVectorizer(**params)
+
+
+class SharedDiseaseIndex:
+    """Índice TF-IDF de solo lectura sobre arrays externos (memoria compartida o memmap)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], shape, disease_names: List[str],
+                 vectorizer_params: Dict[str, Any], handle=None):
+        for array in arrays.values():
+            array.flags.writeable = False
+
+        self.arrays = arrays
+        self.disease_names = disease_names
+        self.disease_vectors = csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(shape), copy=False
+        )
+        self.idf = arrays['idf']
+        self.terms = arrays['terms']
+        self.term_columns = arrays['term_columns']
+        self.norm = vectorizer_params.get('norm', 'l2')
+        self.sublinear_tf = vectorizer_params.get('sublinear_tf', False)
+        self._analyzer = _vectorizer_from_params(vectorizer_params).build_analyzer()
+        self._handle = handle
+
+    def transform(self, text: str) -> csr_matrix:
+        """Vector TF-IDF de la consulta, equivalente a TfidfVectorizer.transform."""
+        n_terms = len(self.idf)
+        width = self.terms.dtype.itemsize
+        tokens = [token.encode('utf-8') for token in self._analyzer(text)]
+        # Un token más largo que cualquier término no puede estar en el vocabulario
+        tokens = [token for token in tokens if len(token) <= width]
+
+        columns = np.empty(0, dtype=np.int64)
+        if tokens:
+            encoded = np.array(tokens, dtype=self.terms.dtype)
+            positions = np.searchsorted(self.terms, encoded)
+            positions[positions >= len(self.terms)] = 0
+            found = self.terms[positions] == encoded
+            columns = self.term_columns[positions[found]]
+
+        columns, counts = np.unique(columns, return_counts=True)
+        values = counts.astype(np.float64)
+        if self.sublinear_tf:
+            values = np.log(values) + 1
+        values *= self.idf[columns]
+        if values.size and self.norm == 'l2':
+            values /= np.sqrt(np.dot(values, values))
+        elif values.size and self.norm == 'l1':
+            values /= np.abs(values).sum()
+
+        return csr_matrix((values, columns, [0, len(columns)]), shape=(1, n_terms))
+
+    def similarities(self, text: str) -> np.ndarray:
+        """Similitud coseno con cada enfermedad (los vectores ya están normalizados)."""
+        query = self.transform(text)
+        return (self.disease_vectors @ query.T).toarray().ravel()
+
+    def close(self):
+        """Libera la vista del bloque compartido (no lo destruye)."""
+        self.disease_vectors = None
+        self.arrays = {}
+        self.idf = self.terms = self.term_columns = None
+        if isinstance(self._handle, shared_memory.SharedMemory):
+            self._handle.close()
+        self._handle = None
+
+
+class SharedKnowledgeBase:
+    """Publica los arrays de un DiseasePredictor en un bloque de memoria compartida.
+
+    El proceso que publica es el dueño del bloque y debe llamar a unlink()
+    al terminar. `descriptor` es un diccionario serializable con lo necesario
+    para que otro proceso adjunte el índice con attach().
+    """
+
+    def __init__(self, predictor, name: Optional[str] = None):
+        arrays = export_arrays(predictor)
+
+        layout = {}
+        offset = 0
+        for key in KNOWLEDGE_ARRAYS:
+            array = arrays[key]
+            offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+            layout[key] = {'offset': offset, 'dtype': array.dtype.str, 'shape': array.shape}
+            offset += array.nbytes
+
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=max(offset, 1))
+        for key in KNOWLEDGE_ARRAYS:
+            spec = layout[key]
+            target = np.ndarray(spec['shape'], dtype=spec['dtype'], buffer=self.shm.buf, offset=spec['offset'])
+            target[...] = arrays[key]
+
+        self.descriptor = dict(_metadata(predictor), name=self.shm.name, layout=layout)
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _open_untracked(name: str) -> shared_memory.SharedMemory:
+    """Abre un bloque existente sin registrarlo en el resource_tracker.
+
+    Solo el dueño debe destruir el bloque; en Python < 3.13 abrirlo lo
+    registra y el tracker lo destruiría al terminar el proceso que adjunta.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def attach(descriptor: Dict[str, Any]) -> SharedDiseaseIndex:
+    """Adjunta, sin copiar, el índice publicado por SharedKnowledgeBase."""
+    shm = _open_untracked(descriptor['name'])
+
+    arrays = {
+        key: np.ndarray(spec['shape'], dtype=spec['dtype'], buffer=shm.buf, offset=spec['offset'])
+        for key, spec in descriptor['layout'].items()
+    }
+    return SharedDiseaseIndex(arrays, descriptor['shape'], descriptor['disease_names'],
+                              descriptor['vectorizer_params'], handle=shm)
+
+
+def save_memmap(predictor, directory: str):
+    """Guarda el índice como archivos .npy (más metadata.json) para load_memmap()."""
+    os.makedirs(directory, exist_ok=True)
+    for key, array in export_arrays(predictor).items():
+        np.save(os.path.join(directory, f'{key}.npy'), array)
+    with open(os.path.join(directory, 'metadata.json'), 'w', encoding='utf-8') as output:
+        json.dump(_metadata(predictor), output, ensure_ascii=False)
+
+
+def load_memmap(directory: str) -> SharedDiseaseIndex:
+    """Abre el índice guardado mapeando los archivos en memoria (solo lectura)."""
+    with open(os.path.join(directory, 'metadata.json'), 'r', encoding='utf-8') as source:
+        metadata = json.load(source)
+    arrays = {
+        key: np.load(os.path.join(directory, f'{key}.npy'), mmap_mode='r')
+        for key in KNOWLEDGE_ARRAYS
+    }
+    return SharedDiseaseIndex(arrays, metadata['shape'], metadata['disease_names'],
+                              metadata['vectorizer_params'])
@@ -0,0 +1,5 @@
+"""Service layer: HTTP entry points for the triage pipeline"""
+
+from .prefork import PreforkServer, build_pipeline
+
+__all__ = ['PreforkServer', 'build_pipeline']
@@ -0,0 +1,212 @@
+"""Generador de carga en lazo abierto para medir latencias de cola
+
+Las solicitudes se lanzan en instantes fijados de antemano por un proceso de
+Poisson a la tasa objetivo, sin esperar a que terminen las anteriores. Así
+la cola que se forma cuando el sistema no da abasto se mide en lugar de
+ocultarse (omisión coordinada): la latencia corregida cuenta desde el
+instante previsto de llegada, la de servicio desde que empezó a atenderse.
+
+Las quejas salen de un JSONL grabado (campo text, input, complaint o body),
+de un directorio de auditoría o del generador sintético.
+
+Uso: python -m src.service.loadgen --qps 50 --duration 30 [--source quejas.jsonl]
+     [--url http://127.0.0.1:8000/triage]
+"""
+
+import argparse
+import json
+import random
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+from typing import List, Dict, Any, Callable, Optional
+
+import numpy as np
+
+from ..data.analytics import iter_records
+
+# Campos de texto reconocidos en los registros grabados, por orden de preferencia
+TEXT_FIELDS = ('text', 'input', 'complaint', 'symptoms_text', 'body')
+
+PERCENTILES = (('p50', 50.0), ('p99', 99.0), ('p99.9', 99.9))
+
+# Hubo cola si el p99 corregido supera al de servicio en este factor y este mínimo absoluto
+OMISSION_RATIO = 1.25
+OMISSION_MIN_MS = 1.0
+
+
+def load_complaints(source: str, limit: Optional[int] = None) -> List[str]:
+    """Textos de un JSONL o de un directorio de auditoría."""
+    complaints = []
+    for record in iter_records(source):
+        text = next((record[field] for field in TEXT_FIELDS if isinstance(record.get(field), str)), None)
+        if text:
+            complaints.append(text)
+            if limit is not None and len(complaints) >= limit:
+                break
+    return complaints
+
+
+def poisson_schedule(qps: float, count: int, seed: int = 0) -> List[float]:
+    """Instantes de llegada (segundos desde el inicio) con tasa media `qps`."""
+    rng = random.Random(seed)
+    arrivals = []
+    at = 0.0
+    for _ in range(count):
+        at += rng.expovariate(qps)
+        arrivals.append(at)
+    return arrivals
+
+
+def in_process_target(chatbot, budget_ms: Optional[float] = None) -> Callable[[str], Any]:
+    """Destino que llama directamente a process_patient_input."""
+    return lambda text: chatbot.process_patient_input(text, budget_ms=budget_ms)
+
+
+def http_target(url: str, budget_ms: Optional[float] = None, timeout: float = 30.0) -> Callable[[str], Any]:
+    """Destino que hace POST al servicio (p. ej. /triage de src.service.prefork)."""
+    def send(text: str):
+        body = json.dumps({'text': text, 'budget_ms': budget_ms}).encode('utf-8')
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read()
+    return send
+
+
+def run_open_loop(target: Callable[[str], Any], complaints: List[str], qps: float,
+                  duration: float, concurrency: int = 16, seed: int = 0,
+                  warmup: int = 0) -> Dict[str, Any]:
+    """Lanza `qps * duration` solicitudes a su hora prevista y devuelve el informe.
+
+    El hilo despachador nunca espera a una respuesta; si los `concurrency`
+    workers están ocupados, la solicitud espera en cola y ese tiempo cuenta
+    en la latencia corregida. Las `warmup` primeras quejas se envían antes,
+    en serie y sin medir (cargas perezosas, cachés frías).
+    """
+    if not complaints:
+        raise ValueError("No hay quejas que enviar")
+
+    for text in islice(cycle(complaints), warmup):
+        target(text)
+
+    schedule = poisson_schedule(qps, max(1, int(qps * duration)), seed)
+    texts = list(islice(cycle(complaints), len(schedule)))
+    # (previsto, inicio, fin, error) por solicitud, en segundos relativos
+    samples = [None] * len(schedule)
+    dispatch_lag = 0.0
+
+    def execute(index: int, intended: float, origin: float):
+        started = time.perf_counter() - origin
+        error = None
+        try:
+            target(texts[index])
+        except Exception as exc:
+            error = type(exc).__name__
+        samples[index] = (intended, started, time.perf_counter() - origin, error)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='loadgen') as executor:
+        origin = time.perf_counter()
+        for index, intended in enumerate(schedule):
+            delay = intended - (time.perf_counter() - origin)
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                dispatch_lag = max(dispatch_lag, -delay)
+            executor.submit(execute, index, intended, origin)
+    elapsed = time.perf_counter() - origin
+
+    report = summarize(samples, elapsed, offered_qps=qps)
+    report['max_dispatch_lag_ms'] = dispatch_lag * 1000.0
+    return report
+
+
+def summarize(samples: List[tuple], elapsed: float, offered_qps: float) -> Dict[str, Any]:
+    """Percentiles de servicio y corregidos, rendimiento y errores."""
+    ok = [sample for sample in samples if sample[3] is None]
+    errors = {}
+    for sample in samples:
+        if sample[3] is not None:
+            errors[sample[3]] = errors.get(sample[3], 0) + 1
+
+    report = {
+        'requests': len(samples),
+        'completed': len(ok),
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'offered_qps': offered_qps,
+        'throughput_qps': len(ok) / elapsed if elapsed > 0 else 0.0,
+        'service_ms': {},
+        'queue_ms': {},
+        'corrected_ms': {},
+        'coordinated_omission': False
+    }
+    if not ok:
+        return report
+
+    intended, started, finished = (np.array(column) for column in list(zip(*ok))[:3])
+    service = (finished - started) * 1000.0
+    queue = (started - intended) * 1000.0
+    corrected = (finished - intended) * 1000.0
+    for name, values in (('service_ms', service), ('queue_ms', queue), ('corrected_ms', corrected)):
+        report[name] = {label: float(np.percentile(values, q)) for label, q in PERCENTILES}
+        report[name]['max'] = float(values.max())
+
+    # Con cola, la latencia que ve el paciente es mayor que el tiempo de servicio
+    service_p99, corrected_p99 = report['service_ms']['p99'], report['corrected_ms']['p99']
+    report['coordinated_omission'] = bool(
+        corrected_p99 > service_p99 * OMISSION_RATIO and corrected_p99 - service_p99 > OMISSION_MIN_MS
+    )
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"Solicitudes: {report['completed']}/{report['requests']} completadas en {report['elapsed_s']:.1f} s",
+        f"Rendimiento: {report['throughput_qps']:.1f} sol/s (objetivo {report['offered_qps']:.1f})",
+    ]
+    for name, label in (('service_ms', 'Servicio '), ('queue_ms', 'Espera   '), ('corrected_ms', 'Corregida')):
+        values = report[name]
+        if values:
+            lines.append(f"{label}: " + ', '.join(f"{key} {values[key]:.1f} ms" for key in ('p50', 'p99', 'p99.9', 'max')))
+    if report['errors']:
+        lines.append("Errores: " + ', '.join(f"{name} x{count}" for name, count in report['errors'].items()))
+    if report['coordinated_omission']:
+        lines.append("⚠️ Hubo cola: la latencia corregida es la que vería el paciente")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga en lazo abierto para el triaje")
+    parser.add_argument('--qps', type=float, default=20.0)
+    parser.add_argument('--duration', type=float, default=30.0, help='segundos')
+    parser.add_argument('--source', help='JSONL o directorio de auditoría con quejas grabadas')
+    parser.add_argument('--synthetic', type=int, default=500, help='quejas sintéticas si no hay --source')
+    parser.add_argument('--url', help='URL del servicio; sin ella se usa MedicalTriageChatbot en proceso')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--budget-ms', type=float)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=10, help='solicitudes previas sin medir')
+    parser.add_argument('--json', action='store_true', help='imprime el informe como JSON')
+    args = parser.parse_args()
+
+    if args.source:
+        complaints = load_complaints(args.source)
+    else:
+        from ..chatbot import SymptomAnalyzer, TriageClassifier
+        from ..data.synthetic import generate_complaints
+        complaints = generate_complaints(SymptomAnalyzer(), TriageClassifier(), args.synthetic, args.seed)
+
+    if args.url:
+        target = http_target(args.url, args.budget_ms)
+    else:
+        from main import MedicalTriageChatbot
+        target = in_process_target(MedicalTriageChatbot(), args.budget_ms)
+
+    report = run_open_loop(target, complaints, args.qps, args.duration, args.concurrency, args.seed,
+                           args.warmup)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == "__main__":
+    main()
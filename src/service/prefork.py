@@ -0,0 +1,333 @@
+"""Servidor HTTP pre-fork que comparte los modelos cargados entre workers
+
+El proceso padre construye SymptomAnalyzer, DiseasePredictor y
+TriageClassifier una sola vez, llama a gc.freeze() y luego hace fork de N
+workers. Los objetos congelados quedan fuera de las pasadas del recolector,
+de modo que los workers no tocan sus cabeceras y las páginas siguen
+compartidas por copy-on-write. Cada worker se recicla tras atender
+`max_requests` solicitudes.
+
+Con --tenant-packs, un mismo proceso atiende a varios hospitales: cada
+solicitud elige el suyo con el campo 'tenant' (ver src.chatbot.tenants).
+
+Uso: python -m src.service.prefork --workers 4 --port 8000 [--tenant-packs src/data/tenant_packs]
+"""
+
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import List, Dict, Any, Callable
+
+from ..chatbot.symptom_analyzer import SymptomAnalyzer
+from ..chatbot.disease_predictor import DiseasePredictor
+from ..chatbot.triage_classifier import TriageClassifier
+from ..chatbot.pipeline import TriagePipeline
+from ..chatbot.tenants import TenantRegistry
+from ..chatbot.vital_signs import VITAL_SIGN_FIELDS, CONSCIOUSNESS_LEVELS
+
+
+def build_pipeline() -> TriagePipeline:
+    """Construye el pipeline completo con sus modelos."""
+    return TriagePipeline(SymptomAnalyzer(), DiseasePredictor(), TriageClassifier())
+
+
+def _json_default(value):
+    # Escalares de NumPy que no heredan de tipos nativos
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def encode_json(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_request(request: Any) -> Dict[str, Any]:
+    """Valida el cuerpo de una solicitud de triaje; ValueError con el motivo si no es válido."""
+    if not isinstance(request, dict):
+        raise ValueError("Se esperaba un objeto JSON")
+    text = request.get('text')
+    if not isinstance(text, str):
+        raise ValueError("Se esperaba un JSON con el campo 'text' (texto)")
+    tenant = request.get('tenant')
+    if tenant is not None and not isinstance(tenant, str):
+        raise ValueError("'tenant' debe ser un texto")
+    budget_ms = request.get('budget_ms')
+    if budget_ms is not None and (not _is_number(budget_ms) or budget_ms < 0):
+        raise ValueError("'budget_ms' debe ser un número no negativo")
+
+    vital_signs = request.get('vital_signs')
+    if vital_signs is not None:
+        if not isinstance(vital_signs, dict):
+            raise ValueError("'vital_signs' debe ser un objeto")
+        unknown = set(vital_signs) - set(VITAL_SIGN_FIELDS)
+        if unknown:
+            raise ValueError(f"Signos vitales desconocidos: {sorted(unknown)}")
+        for field, value in vital_signs.items():
+            if value is None:
+                continue
+            if field == 'consciousness':
+                valid = value in CONSCIOUSNESS_LEVELS
+            elif field == 'on_oxygen':
+                valid = isinstance(value, bool)
+            else:
+                valid = _is_number(value)
+            if not valid:
+                raise ValueError(f"Valor no válido para '{field}': {value!r}")
+
+    return {'text': text, 'tenant': tenant, 'budget_ms': budget_ms, 'vital_signs': vital_signs}
+
+
+class TriageRequestHandler(BaseHTTPRequestHandler):
+    """POST /triage (resultado completo), POST /triage/stream (NDJSON por etapa), GET /health."""
+
+    server_version = 'MedicalTriage/1.0'
+
+    def do_GET(self):
+        if self.path != '/health':
+            self.send_error(404)
+            return
+        self._send_json(200, {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'requests': self.server.requests_handled,
+            'cache': self.server.pipeline.cache_stats(),
+            'tenants': self.server.tenants.names() if self.server.tenants is not None else []
+        })
+
+    def do_POST(self):
+        if self.path not in ('/triage', '/triage/stream'):
+            self.send_error(404)
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = parse_request(json.loads(self.rfile.read(length) or b'{}'))
+            pipeline = self.server.pipeline_for(request.pop('tenant'))
+        except ValueError as exc:
+            # Incluye JSON mal formado (json.JSONDecodeError es un ValueError)
+            self._send_json(400, {'error': str(exc)})
+            return
+
+        text = request.pop('text')
+        if self.path == '/triage':
+            try:
+                result = pipeline.run(text, **request)
+            except Exception as exc:
+                self._send_json(500, {'error': f"Error interno: {type(exc).__name__}"})
+                return
+            self._send_json(200, result)
+            return
+
+        # Una línea JSON por etapa, enviada en cuanto termina; un fallo a mitad
+        # se comunica como última línea, porque la cabecera 200 ya salió
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.end_headers()
+        try:
+            for stage, value in pipeline.stream(text, **request):
+                self.wfile.write(encode_json({'stage': stage, 'result': value}) + b'\n')
+                self.wfile.flush()
+        except OSError:
+            # El cliente cerró la conexión
+            return
+        except Exception as exc:
+            self.wfile.write(encode_json({'stage': 'error', 'error': f"Error interno: {type(exc).__name__}"}) + b'\n')
+
+    def _send_json(self, status: int, payload: Dict[str, Any]):
+        body = encode_json(payload)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class WorkerHTTPServer(HTTPServer):
+    """HTTPServer que acepta conexiones sobre un socket heredado del padre."""
+
+    def __init__(self, listen_socket: socket.socket, pipeline: TriagePipeline,
+                 tenants: TenantRegistry = None):
+        super().__init__(listen_socket.getsockname(), TriageRequestHandler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = listen_socket
+        self.pipeline = pipeline
+        self.tenants = tenants
+        self.requests_handled = 0
+
+    def pipeline_for(self, tenant: str = None) -> TriagePipeline:
+        """Pipeline del hospital indicado (sin hospital, el de la base)."""
+        if tenant is None:
+            return self.pipeline
+        if self.tenants is None:
+            raise ValueError("Este servidor no tiene paquetes de hospital")
+        return self.tenants.pipeline(tenant)
+
+    def process_request(self, request, client_address):
+        self.requests_handled += 1
+        super().process_request(request, client_address)
+
+
+class PreforkServer:
+    """Supervisor pre-fork: carga una vez, congela el heap y mantiene N workers."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8000, workers: int = 4,
+                 max_requests: int = 1000, freeze: bool = True,
+                 build_app: Callable[[], TriagePipeline] = build_pipeline,
+                 tenant_packs: str = None):
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.max_requests = max_requests
+        self.freeze = freeze
+        self.build_app = build_app
+        self.tenant_packs = tenant_packs
+
+        self.socket = None
+        self.pipeline = None
+        self.tenants = None
+        self.workers: List[int] = []
+        self.respawned = 0
+        self._stopping = False
+
+    def start(self):
+        """Abre el socket, carga los modelos y arranca los workers."""
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(128)
+        self.port = self.socket.getsockname()[1]
+
+        # Sin recolección durante la carga: los objetos quedan compactos y
+        # gc.freeze() los mueve a la generación permanente antes del fork.
+        if self.freeze:
+            gc.disable()
+        try:
+            self.pipeline = self.build_app()
+            if self.tenant_packs:
+                self.tenants = TenantRegistry.from_directory(self.pipeline, self.tenant_packs)
+            if self.freeze:
+                gc.freeze()
+        finally:
+            # El padre sigue vivo supervisando: vuelve a recolectar
+            if self.freeze:
+                gc.enable()
+
+        for _ in range(self.worker_count):
+            self._spawn_worker()
+
+    def serve_forever(self):
+        """Supervisa los workers y recrea los que terminan (reciclaje)."""
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.stop())
+        signal.signal(signal.SIGINT, lambda signum, frame: self.stop())
+
+        while self.workers:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            if pid in self.workers:
+                self.workers.remove(pid)
+                if not self._stopping:
+                    self.respawned += 1
+                    self._spawn_worker()
+
+    def stop(self):
+        """Detiene todos los workers."""
+        self._stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def close(self):
+        self.stop()
+        for pid in list(self.workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.workers = []
+        if self.socket is not None:
+            self.socket.close()
+
+    def memory_report(self) -> List[Dict[str, Any]]:
+        """Memoria única (USS) y proporcional (PSS) de cada worker."""
+        return [dict(process_memory(pid), pid=pid) for pid in self.workers]
+
+    def _spawn_worker(self):
+        pid = os.fork()
+        if pid:
+            self.workers.append(pid)
+            return
+
+        # Proceso hijo
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            server = WorkerHTTPServer(self.socket, self.pipeline, self.tenants)
+            while server.requests_handled < self.max_requests:
+                server.handle_request()
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """Lee /proc/<pid>/smaps_rollup (Linux) y devuelve la memoria en KiB."""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup', 'r') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+
+    return {
+        'rss_kb': fields.get('Rss', 0),
+        'pss_kb': fields.get('Pss', 0),
+        'uss_kb': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+        'shared_kb': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor pre-fork del sistema de triaje")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--max-requests', type=int, default=1000,
+                        help="Solicitudes atendidas antes de reciclar un worker")
+    parser.add_argument('--no-freeze', action='store_true', help="No llamar a gc.freeze() antes del fork")
+    parser.add_argument('--tenant-packs', help="Directorio con los paquetes JSON de cada hospital")
+    args = parser.parse_args()
+
+    server = PreforkServer(args.host, args.port, args.workers, args.max_requests,
+                           freeze=not args.no_freeze, tenant_packs=args.tenant_packs)
+    server.start()
+    print(f"Servidor de triaje en http://{args.host}:{server.port} "
+          f"({args.workers} workers, gc.freeze={'no' if args.no_freeze else 'sí'})", flush=True)
+    try:
+        server.serve_forever()
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
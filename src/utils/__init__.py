@@ -1,5 +1,13 @@
 """Utility functions and helpers for the medical triage system"""
 
-from .preprocessing import MedicalTextPreprocessor
+from .preprocessing import MedicalTextPreprocessor, MedicalTermMatcher
+from .lemmatizer import Lemmatizer
+from .spelling import SymSpellIndex, medical_vocabulary
+from .text_folding import fold_text
+from .memoization import MemoCache, freeze
+from .profiling import RequestProfiler
+from .term_matrix import TermCorpus
 
-__all__ = ['MedicalTextPreprocessor']
\ No newline at end of file
+__all__ = ['MedicalTextPreprocessor', 'MedicalTermMatcher', 'Lemmatizer', 'SymSpellIndex', 'medical_vocabulary',
+           'fold_text', 'MemoCache', 'freeze',
+           'RequestProfiler', 'TermCorpus']
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""Enrutado por idioma con perfiles de n-gramas y paquetes de vocabulario perezosos
+
+El identificador puntúa los trigramas de caracteres del texto con perfiles
+precalculados (log-probabilidades) de cada idioma: es determinista y no
+necesita modelos externos. Los textos demasiado cortos no se puntúan y van
+al idioma por defecto, y otro idioma solo gana si supera al de por defecto
+por un margen por trigrama: el español y el portugués comparten muchos
+trigramas y una queja corta en español no debe perder su vocabulario.
+
+Cada idioma distinto del español tiene un paquete JSON que traduce sus
+palabras clave, indicadores de severidad, criterios de triaje y sinónimos
+al vocabulario canónico en español, de modo que el resto del sistema no
+cambia. La traducción se añade al texto original en lugar de sustituirlo,
+así que un texto mal detectado conserva sus términos en español. Los paquetes se cargan la primera vez que se necesitan.
+
+Uso (regenerar perfiles): python -m src.utils.language
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Tuple, Iterable
+
+from .text_folding import fold_text
+
+PACKS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'language_packs')
+PROFILES_PATH = os.path.join(PACKS_DIR, 'profiles.json')
+
+DEFAULT_LANGUAGE = 'es'
+SUPPORTED_LANGUAGES = ('es', 'en', 'pt')
+
+# Secciones de un paquete que se traducen al vocabulario canónico
+PACK_SECTIONS = ('symptom_keywords', 'severity_indicators', 'urgency_terms', 'triage_criteria', 'synonyms')
+
+_NON_LETTERS = re.compile(r"[^\w']+|[\d_]+")
+
+
+def _trigrams(text: str) -> Counter:
+    """Trigramas de caracteres por palabra, con espacios como delimitadores."""
+    counts = Counter()
+    for word in _NON_LETTERS.sub(' ', text.lower()).split():
+        padded = f' {word} '
+        for i in range(len(padded) - 2):
+            counts[padded[i:i + 3]] += 1
+    return counts
+
+
+def build_profile(text: str, size: int = 400) -> Dict[str, float]:
+    """Log-probabilidades de los `size` trigramas más frecuentes del texto."""
+    counts = _trigrams(text)
+    total = sum(counts.values())
+    return {gram: math.log(count / total) for gram, count in counts.most_common(size)}
+
+
+class LanguageIdentifier:
+    """Identificador de idioma por trigramas de caracteres (Naive Bayes)."""
+
+    def __init__(self, profiles: Dict[str, Dict[str, float]], default: str = DEFAULT_LANGUAGE,
+                 min_letters: int = 12, margin: float = 0.3):
+        self.languages = tuple(sorted(profiles))
+        self.default = default
+        self.min_letters = min_letters
+        # Ventaja media por trigrama que necesita otro idioma para ganar al de por defecto
+        self.margin = margin
+
+        # Trigrama -> puntuación por idioma; los ausentes reciben la mínima del perfil menos un margen
+        self._floor = tuple(min(profiles[lang].values()) - 1.0 for lang in self.languages)
+        grams = set().union(*(profiles[lang] for lang in self.languages))
+        self._table = {
+            gram: tuple(profiles[lang].get(gram, floor) for lang, floor in zip(self.languages, self._floor))
+            for gram in grams
+        }
+
+    def scores(self, text: str) -> Dict[str, float]:
+        totals = [0.0] * len(self.languages)
+        for gram, count in _trigrams(text).items():
+            row = self._table.get(gram)
+            if row is None:
+                continue
+            for i, value in enumerate(row):
+                totals[i] += value * count
+        return dict(zip(self.languages, totals))
+
+    def identify(self, text: str) -> str:
+        """Idioma más probable; los textos cortos van al idioma por defecto."""
+        if len(self.languages) < 2 or sum(c.isalpha() for c in text) < self.min_letters:
+            return self.default
+        scores = self.scores(text)
+        best = max(self.languages, key=lambda lang: scores[lang])
+        # Sin trigramas conocidos todas las puntuaciones son 0
+        if scores[best] == 0.0:
+            return self.default
+        if self.default not in scores:
+            return best
+        grams = sum(_trigrams(text).values())
+        return best if scores[best] - scores[self.default] > self.margin * grams else self.default
+
+
+class LanguagePack:
+    """Traductor de frases de un idioma al vocabulario canónico en español."""
+
+    def __init__(self, language: str, phrases: Dict[str, str]):
+        self.language = language
+        self.phrases = {fold_text(phrase): canonical for phrase, canonical in phrases.items()}
+        # Alternancia con las frases más largas primero: "chest pain" antes que "chest"
+        ordered = sorted(self.phrases, key=len, reverse=True)
+        self._pattern = re.compile(r"(?<![\w'])(?:%s)(?![\w'])" % '|'.join(map(re.escape, ordered)))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'LanguagePack':
+        with open(path, 'r', encoding='utf-8') as source:
+            data = json.load(source)
+        return cls(data['language'], _flatten(data))
+
+    def translate(self, text: str) -> str:
+        """Frases reconocidas, en orden de aparición, como texto canónico en español."""
+        text = fold_text(text).replace('’', "'")
+        return ' '.join(self.phrases[match.group()] for match in self._pattern.finditer(text))
+
+
+def _flatten(data: Dict) -> Dict[str, str]:
+    # Las secciones pueden agrupar por categoría ({categoría: {frase: canónico}}) o no
+    phrases = {}
+    for section in PACK_SECTIONS:
+        for key, value in data.get(section, {}).items():
+            if isinstance(value, dict):
+                phrases.update(value)
+            else:
+                phrases[key] = value
+    return phrases
+
+
+@lru_cache(maxsize=None)
+def load_language_pack(language: str) -> LanguagePack:
+    """Carga (una sola vez por proceso) el paquete de un idioma."""
+    return LanguagePack.from_file(os.path.join(PACKS_DIR, f'{language}.json'))
+
+
+@lru_cache(maxsize=None)
+def load_profiles() -> Dict[str, Dict[str, float]]:
+    with open(PROFILES_PATH, 'r', encoding='utf-8') as source:
+        return json.load(source)
+
+
+class LanguageRouter:
+    """Detecta el idioma de cada entrada y la traduce con el paquete correspondiente.
+
+    Con un solo idioma habilitado no se carga ningún perfil ni paquete.
+    """
+
+    def __init__(self, languages: Iterable[str] = SUPPORTED_LANGUAGES, default: str = DEFAULT_LANGUAGE):
+        self.languages = tuple(languages)
+        unknown = set(self.languages) - set(SUPPORTED_LANGUAGES)
+        if unknown:
+            raise ValueError(f"Idiomas no soportados: {sorted(unknown)}")
+        self.default = default
+
+        self.identifier = None
+        if len(self.languages) > 1:
+            profiles = load_profiles()
+            self.identifier = LanguageIdentifier({lang: profiles[lang] for lang in self.languages}, default)
+
+    def detect(self, text: str) -> str:
+        if self.identifier is None:
+            return self.default
+        return self.identifier.identify(text)
+
+    def route(self, text: str) -> Tuple[str, str]:
+        """(idioma, texto original más su traducción al vocabulario canónico)."""
+        language = self.detect(text)
+        if language == DEFAULT_LANGUAGE:
+            return language, text
+        translation = load_language_pack(language).translate(text)
+        return language, f'{text} {translation}' if translation else text
+
+
+def build_profiles(size: int = 800) -> Dict[str, Dict[str, float]]:
+    """Calcula los perfiles a partir de los textos de muestra en language_packs/corpus."""
+    profiles = {}
+    for language in SUPPORTED_LANGUAGES:
+        with open(os.path.join(PACKS_DIR, 'corpus', f'{language}.txt'), 'r', encoding='utf-8') as corpus:
+            profiles[language] = {gram: round(value, 4) for gram, value in build_profile(corpus.read(), size).items()}
+    return profiles
+
+
+if __name__ == "__main__":
+    with open(PROFILES_PATH, 'w', encoding='utf-8') as output:
+        json.dump(build_profiles(), output, ensure_ascii=False, sort_keys=True)
+    print(f"Perfiles guardados en {PROFILES_PATH}")
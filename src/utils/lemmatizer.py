@@ -0,0 +1,89 @@
+"""Lematización por lotes con spaCy y caché LRU de token a lema"""
+
+from collections import OrderedDict
+from typing import List, Optional
+
+# Componentes que la lematización no necesita
+DISABLED_COMPONENTS = ('parser', 'ner')
+
+
+class Lemmatizer:
+    """Lematiza textos con nlp.pipe sin parser ni NER.
+
+    Los lemas se guardan por token en una caché LRU: un texto cuyos tokens ya
+    están todos en caché no pasa por el modelo. El lema cacheado es el del
+    primer contexto en que apareció el token.
+    """
+
+    def __init__(self, nlp=None, model: str = 'es_core_news_sm',
+                 cache_size: int = 50000, batch_size: int = 256):
+        if nlp is None:
+            import spacy
+            nlp = spacy.load(model, exclude=list(DISABLED_COMPONENTS))
+        self.nlp = nlp
+        self.disabled = [name for name in DISABLED_COMPONENTS if name in nlp.pipe_names]
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.cache = OrderedDict()
+
+        # Textos resueltos desde la caché / textos que pasaron por el modelo
+        self.hits = 0
+        self.misses = 0
+
+    def lemmatize(self, text: str) -> List[str]:
+        """Lemas (en minúsculas) de los tokens de un texto."""
+        return self.lemmatize_batch([text])[0]
+
+    def lemmatize_batch(self, texts: List[str], n_process: int = 1) -> List[List[str]]:
+        """Lematiza varios textos; solo los que tienen tokens nuevos pasan por el modelo.
+
+        Con n_process > 1, spaCy reparte los lotes entre varios procesos.
+        """
+        results: List[Optional[List[str]]] = []
+        pending = []
+
+        # El tokenizador basado en reglas es barato comparado con el pipeline
+        for text in texts:
+            tokens = [token.lower_ for token in self.nlp.tokenizer(text)]
+            lemmas = self._cached(tokens)
+            if lemmas is None:
+                pending.append(len(results))
+            else:
+                self.hits += 1
+            results.append(lemmas)
+
+        if pending:
+            documents = self.nlp.pipe((texts[i] for i in pending), batch_size=self.batch_size,
+                                      n_process=n_process, disable=self.disabled)
+            for i, document in zip(pending, documents):
+                lemmas = []
+                for token in document:
+                    lemma = token.lemma_.lower() or token.lower_
+                    self._store(token.lower_, lemma)
+                    lemmas.append(lemma)
+                results[i] = lemmas
+            self.misses += len(pending)
+
+        return results
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def _cached(self, tokens: List[str]) -> Optional[List[str]]:
+        lemmas = []
+        for token in tokens:
+            lemma = self.cache.get(token)
+            if lemma is None:
+                return None
+            self.cache.move_to_end(token)
+            lemmas.append(lemma)
+        return lemmas
+
+    def _store(self, token: str, lemma: str):
+        if token in self.cache:
+            self.cache.move_to_end(token)
+            return
+        self.cache[token] = lemma
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
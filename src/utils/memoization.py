@@ -0,0 +1,80 @@
+"""Caché LRU acotada y resultados inmutables compartidos entre solicitudes"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+# Marca de ausencia (None puede ser un resultado válido)
+MISSING = object()
+
+
+class FrozenDict(dict):
+    """Diccionario de solo lectura; sigue siendo un dict para JSON y Streamlit."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Resultado compartido de solo lectura; copie con dict() para modificarlo")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # pickle reconstruye los dict con __setitem__; aquí se pasa el contenido al constructor
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Copia profunda inmutable: dict -> FrozenDict, list -> tuple."""
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class MemoCache:
+    """Caché LRU acotada con contadores de aciertos; maxsize=0 la desactiva."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Valor cacheado o MISSING."""
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is MISSING:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Invalida todas las entradas (las reglas o la base de conocimiento cambiaron)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'maxsize': self.maxsize
+        }
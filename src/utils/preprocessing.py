@@ -2,13 +2,86 @@
 
 import re
 import string
-from typing import List, Dict, Any
-from textblob import TextBlob
+from typing import List, Dict, Any, Iterable
+
+from .term_matrix import SEPARATOR
+from .text_folding import fold_text
+
+# Palabras (con decimales y apóstrofos internos: 39.5, l'hopital) y finales de oración.
+# El texto ya está plegado, así que '…' llega como '...'
+_TOKENS = re.compile(r"(\w+(?:[.,']\w+)*)|[.!?]+")
+
+
+class MedicalTermMatcher:
+    """Léxico de términos médicos precompilado para contar cuáles aparecen en un texto.
+    
+    Mismo criterio que buscar cada término como subcadena del texto plegado,
+    pero con una sola expresión de anticipación por grupo de términos: las
+    coincidencias pueden solaparse y un término que es prefijo de otro va en
+    otro grupo, porque en una misma posición la alternancia solo devuelve la
+    primera opción que encaja. Con el léxico por defecto hay un único grupo.
+    """
+    
+    def __init__(self, terms: Iterable[str]):
+        self.terms = tuple(sorted(set(fold_text(term) for term in terms if term)))
+        
+        groups: List[List[str]] = []
+        for term in self.terms:
+            for group in groups:
+                if not any(term.startswith(other) or other.startswith(term) for other in group):
+                    group.append(term)
+                    break
+            else:
+                groups.append([term])
+        self._patterns = tuple(
+            re.compile('(?=(%s))' % '|'.join(map(re.escape, group))) for group in groups
+        )
+    
+    def find(self, folded_text: str) -> set:
+        """Términos distintos del léxico presentes en un texto ya plegado."""
+        found = set()
+        for pattern in self._patterns:
+            found.update(pattern.findall(folded_text))
+        return found
+
+
+def scan_text(folded_text: str, matcher: MedicalTermMatcher) -> Dict[str, Any]:
+    """Palabras, oraciones y términos médicos distintos de un texto ya plegado.
+    
+    Recorre el texto dos veces: una con _TOKENS para contar palabras y
+    oraciones, y otra con las expresiones del léxico (MedicalTermMatcher),
+    porque los términos se buscan como subcadenas que pueden solaparse y no
+    coinciden con los límites de las palabras.
+    """
+    word_count = 0
+    sentence_count = 0
+    open_sentence = False
+    for word in _TOKENS.findall(folded_text):
+        if word:
+            word_count += 1
+            open_sentence = True
+        elif open_sentence:
+            # Varios signos seguidos (?!, ...) cierran una sola oración
+            sentence_count += 1
+            open_sentence = False
+    if open_sentence:
+        sentence_count += 1
+    
+    return {
+        'word_count': word_count,
+        'sentence_count': sentence_count,
+        'avg_words_per_sentence': round(word_count / max(sentence_count, 1), 2),
+        'medical_terms_count': len(matcher.find(folded_text))
+    }
+
 
 class MedicalTextPreprocessor:
     """Preprocesador especializado para texto médico."""
     
-    def __init__(self):
+    def __init__(self, spelling_index=None):
+        # Índice de corrección ortográfica opcional (SymSpellIndex)
+        self.spelling_index = spelling_index
+        
         # Abreviaciones médicas comunes
         self.medical_abbreviations = {
             'iam': 'infarto agudo miocardio',
@@ -41,18 +114,29 @@ class MedicalTextPreprocessor:
         
         # Patrones de limpieza
         self.cleaning_patterns = [
-            (r'[^\w\sáéíóúñü]', ' '),  # Caracteres especiales
+            (r'[^\w\s]', ' '),  # Caracteres especiales (el texto ya está sin acentos)
             (r'\d+', ' '),  # Números
             (r'\s+', ' '),  # Espacios múltiples
         ]
+        
+        self._compile_lexicon()
+    
+    def _compile_lexicon(self):
+        """Precompila el léxico de términos médicos (abreviaciones y sinónimos).
+        
+        Debe llamarse de nuevo si se modifican esas tablas.
+        """
+        self.term_matcher = MedicalTermMatcher(
+            list(self.medical_abbreviations) + list(self.medical_synonyms)
+        )
     
     def clean_text(self, text: str) -> str:
         """Limpia y normaliza texto médico."""
         if not text:
             return ""
         
-        # Convertir a minúsculas
-        text = text.lower().strip()
+        # Convertir a minúsculas y quitar acentos
+        text = fold_text(text).strip()
         
         # Expandir abreviaciones
         text = self._expand_abbreviations(text)
@@ -120,7 +204,7 @@ class MedicalTextPreprocessor:
         ]
         
         # Extraer entidades
-        words = text.lower().split()
+        words = fold_text(text).split()
         
         for word in words:
             if any(symptom in word for symptom in symptom_words):
@@ -182,10 +266,14 @@ class MedicalTextPreprocessor:
             'mareos': 'mareo'
         }
         
-        corrected_text = text.lower()
+        corrected_text = fold_text(text)
         for error, correction in corrections.items():
             corrected_text = corrected_text.replace(error, correction)
         
+        # Errores fuera de la tabla: término más cercano del vocabulario médico
+        if self.spelling_index is not None:
+            corrected_text = self.spelling_index.correct_text(corrected_text)
+        
         return corrected_text
     
     def analyze_text_complexity(self, text: str) -> Dict[str, Any]:
@@ -193,11 +281,28 @@ class MedicalTextPreprocessor:
         if not text:
             return {'complexity': 'low', 'word_count': 0, 'sentence_count': 0}
         
-        blob = TextBlob(text)
-        
-        word_count = len(blob.words)
-        sentence_count = len(blob.sentences)
-        avg_words_per_sentence = word_count / max(sentence_count, 1)
+        return self._with_complexity(scan_text(fold_text(text), self.term_matcher))
+    
+    def analyze_text_complexity_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """analyze_text_complexity para muchas notas, con un solo plegado para todo el lote."""
+        joined = SEPARATOR.join(text or '' for text in texts)
+        if texts and joined.count(SEPARATOR) == len(texts) - 1:
+            folded = fold_text(joined).split(SEPARATOR)
+        else:
+            # Algún texto contiene el separador: se pliega texto a texto
+            folded = [fold_text(text or '') for text in texts]
+        
+        matcher = self.term_matcher
+        return [
+            self._with_complexity(scan_text(folded_text, matcher)) if text
+            else {'complexity': 'low', 'word_count': 0, 'sentence_count': 0}
+            for text, folded_text in zip(texts, folded)
+        ]
+    
+    def _with_complexity(self, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Añade el nivel de complejidad a las estadísticas del texto."""
+        avg_words_per_sentence = stats['avg_words_per_sentence']
+        word_count = stats['word_count']
         
         # Determinar complejidad
         if avg_words_per_sentence > 15 or word_count > 50:
@@ -207,23 +312,8 @@ class MedicalTextPreprocessor:
         else:
             complexity = 'low'
         
-        return {
-            'complexity': complexity,
-            'word_count': word_count,
-            'sentence_count': sentence_count,
-            'avg_words_per_sentence': round(avg_words_per_sentence, 2),
-            'medical_terms_count': self._count_medical_terms(text)
-        }
+        return {'complexity': complexity, **stats}
     
     def _count_medical_terms(self, text: str) -> int:
         """Cuenta términos médicos en el texto."""
-        medical_terms = list(self.medical_abbreviations.keys()) + list(self.medical_synonyms.keys())
-        
-        count = 0
-        text_lower = text.lower()
-        
-        for term in medical_terms:
-            if term in text_lower:
-                count += 1
-        
-        return count
\ No newline at end of file
+        return scan_text(fold_text(text), self.term_matcher)['medical_terms_count']
\ No newline at end of file
@@ -0,0 +1,283 @@
+"""Perfilado bajo demanda de solicitudes con cProfile y tracemalloc
+
+Se activa al arrancar con TRIAGE_PROFILE_SAMPLE=N (perfila 1 de cada N
+llamadas) o en caliente con SIGUSR2, que alterna el muestreo en procesos
+donde se pudo instalar el manejador. Solo el hilo principal puede hacerlo y
+solo un perfilador por proceso lo recibe; Streamlit ejecuta el script en
+otro hilo, así que allí solo funciona la variable de entorno.
+
+call() perfila una llamada y stream() el consumo completo de un generador
+por etapas (TriagePipeline.stream); en este caso el perfil de CPU solo cubre
+el trabajo del generador, no lo que hace el consumidor entre etapas.
+
+Cada llamada muestreada deja en TRIAGE_PROFILE_DIR, agrupado por clase de
+solicitud (nivel de triaje):
+  - <clase>-<pid>-<n>.pstats: árbol de llamadas de cProfile
+  - <clase>.folded: pilas colapsadas acumuladas (flamegraph.pl, speedscope)
+  - allocations.jsonl: bytes asignados durante la llamada por componente
+
+Desactivado, el coste es una comprobación de atributo por solicitud.
+"""
+
+import cProfile
+import inspect
+import itertools
+import json
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+
+PROFILE_SAMPLE_ENV = 'TRIAGE_PROFILE_SAMPLE'
+PROFILE_DIR_ENV = 'TRIAGE_PROFILE_DIR'
+
+# Frecuencia usada cuando el muestreo se activa por señal sin variable de entorno
+DEFAULT_SAMPLE_EVERY = 1000
+
+# Marcos guardados por asignación: los suficientes para llegar al componente desde el código llamado
+TRACEBACK_FRAMES = 32
+
+FunctionKey = Tuple[str, int, str]
+
+
+def request_class(result: Dict[str, Any]) -> str:
+    """Clase de una solicitud para agrupar perfiles: su nivel de triaje."""
+    triage = result.get('triage') or {}
+    return f"nivel_{triage.get('triage_level', 'x')}"
+
+
+def _frame_label(function: FunctionKey) -> str:
+    filename, line, name = function
+    if filename == '~':
+        # Funciones internas: ('~', 0, "<built-in method time.perf_counter>")
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def collapsed_stacks(stats: pstats.Stats, max_depth: int = 64) -> Dict[str, int]:
+    """Pilas colapsadas (marcos separados por ';' -> microsegundos propios).
+
+    cProfile solo guarda aristas llamador -> llamado, así que cada pila se
+    reconstruye recorriendo el grafo desde las raíces y asignando a cada
+    arista su tiempo medido, como hacen los conversores de pstats a flame graph.
+    """
+    callees: Dict[FunctionKey, Dict[FunctionKey, Tuple[float, float]]] = {}
+    roots = []
+    for function, (_, calls, total_time, cumulative, callers) in stats.stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[function] = (edge[2], edge[3])
+        # Llamadas sin llamador registrado: raíces. Además de las de nivel
+        # superior, las hechas desde un marco anterior a profile.enable(), como
+        # next() al reanudar un generador perfilado por tramos
+        if calls > sum(edge[0] for edge in callers.values()):
+            roots.append((function, total_time - sum(edge[2] for edge in callers.values()),
+                          cumulative - sum(edge[3] for edge in callers.values())))
+
+    stacks: Dict[str, int] = {}
+
+    def walk(function, own_time, path, depth):
+        path = path + (_frame_label(function),)
+        micros = int(round(own_time * 1e6))
+        if micros > 0:
+            key = ';'.join(path)
+            stacks[key] = stacks.get(key, 0) + micros
+        if depth >= max_depth:
+            return
+        for callee, (edge_own, _) in callees.get(function, {}).items():
+            # Las recursiones se cortan para no recorrer ciclos del grafo
+            if _frame_label(callee) not in path:
+                walk(callee, edge_own, path, depth + 1)
+
+    for function, total_time, _ in roots:
+        walk(function, total_time, (), 0)
+    return stacks
+
+
+def _traced_bytes(snapshot: tracemalloc.Snapshot, component_files: Dict[str, str]) -> Dict[str, int]:
+    """Bytes vivos en total y por componente (alguno de sus marcos en el módulo).
+
+    Una sola pasada con comparación exacta de rutas: Snapshot.filter_traces()
+    aplica fnmatch a cada marco y compare_to() agrupa por traceback, ambos
+    mucho más lentos.
+    """
+    modules = {filename: name for name, filename in component_files.items()}
+    totals = dict.fromkeys(('total', *component_files), 0)
+    for trace in snapshot.traces:
+        totals['total'] += trace.size
+        for name in {modules[frame.filename] for frame in trace.traceback if frame.filename in modules}:
+            totals[name] += trace.size
+    return totals
+
+
+class RequestProfiler:
+    """Muestrea 1 de cada `sample_every` llamadas y guarda su perfil.
+
+    `components` asocia un nombre (SymptomAnalyzer, ...) con la clase cuyo
+    módulo recibe las asignaciones: una asignación cuenta para un componente
+    si alguno de sus marcos está en ese módulo. Solo se perfila una llamada a
+    la vez; si otra muestreada coincide en el tiempo se ejecuta sin perfilar.
+    """
+
+    def __init__(self, output_dir: str = 'profiles', sample_every: int = 0,
+                 components: Iterable[type] = (),
+                 classify: Callable[[Any], str] = request_class):
+        self.output_dir = output_dir
+        self.sample_every = sample_every if sample_every > 0 else DEFAULT_SAMPLE_EVERY
+        self.enabled = sample_every > 0
+        self.classify = classify
+        self.component_files = {cls.__name__: inspect.getsourcefile(cls) for cls in components}
+
+        self.samples = 0
+        self._calls = itertools.count(1)
+        self._capture = threading.Lock()
+        self._write = threading.Lock()
+
+    @classmethod
+    def from_env(cls, components: Iterable[type] = (), **kwargs) -> 'RequestProfiler':
+        sample_every = int(os.environ.get(PROFILE_SAMPLE_ENV, '0') or 0)
+        output_dir = os.environ.get(PROFILE_DIR_ENV, 'profiles')
+        return cls(output_dir, sample_every, components, **kwargs)
+
+    def toggle(self) -> bool:
+        self.enabled = not self.enabled
+        return self.enabled
+
+    def install_signal_handler(self, signum: int = getattr(signal, 'SIGUSR2', 0)) -> bool:
+        """Alterna el muestreo con una señal; False si no es posible en este hilo o plataforma.
+
+        Debe llamarse una vez por proceso, desde el hilo principal: un segundo
+        perfilador que la instale sustituye al primero.
+        """
+        if not signum or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, lambda received, frame: self.toggle())
+        return True
+
+    def should_sample(self) -> bool:
+        """Cuenta la llamada y decide si se perfila (llamar solo con enabled)."""
+        return next(self._calls) % self.sample_every == 0
+
+    def call(self, function: Callable, *args, **kwargs) -> Any:
+        """Ejecuta la función perfilándola; sin perfil si ya hay otra captura en curso."""
+        if not self._capture.acquire(blocking=False):
+            return function(*args, **kwargs)
+        try:
+            return self._profiled(function, args, kwargs)
+        finally:
+            self._capture.release()
+
+    def stream(self, function: Callable, *args, **kwargs) -> Iterator[Tuple[str, Any]]:
+        """Consume function(*args, **kwargs), que produce (etapa, valor), perfilando todas las etapas.
+
+        La clase de la solicitud se calcula con el diccionario etapa -> valor.
+        """
+        if not self._capture.acquire(blocking=False):
+            yield from function(*args, **kwargs)
+            return
+        try:
+            yield from self._profiled_stream(function, args, kwargs)
+        finally:
+            self._capture.release()
+
+    def _profiled(self, function: Callable, args, kwargs) -> Any:
+        was_tracing, before = self._start_tracing()
+        profile = cProfile.Profile()
+
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            after, peak = self._stop_tracing(was_tracing)
+
+        self._save(self.classify(result), profile, before, after, peak, elapsed_ms)
+        return result
+
+    def _profiled_stream(self, function: Callable, args, kwargs) -> Iterator[Tuple[str, Any]]:
+        was_tracing, before = self._start_tracing()
+        profile = cProfile.Profile()
+        result = {}
+        elapsed = 0.0
+        completed = False
+        try:
+            stages = function(*args, **kwargs)
+            while True:
+                # Solo se mide mientras el generador trabaja; entre etapas manda el consumidor
+                started = time.perf_counter()
+                profile.enable()
+                try:
+                    stage, value = next(stages)
+                except StopIteration:
+                    completed = True
+                    break
+                finally:
+                    profile.disable()
+                    elapsed += time.perf_counter() - started
+                result[stage] = value
+                yield stage, value
+        finally:
+            after, peak = self._stop_tracing(was_tracing)
+
+        if completed:
+            self._save(self.classify(result), profile, before, after, peak, elapsed * 1000.0)
+
+    @staticmethod
+    def _start_tracing() -> Tuple[bool, tracemalloc.Snapshot]:
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start(TRACEBACK_FRAMES)
+        tracemalloc.reset_peak()
+        return was_tracing, tracemalloc.take_snapshot()
+
+    @staticmethod
+    def _stop_tracing(was_tracing: bool) -> Tuple[tracemalloc.Snapshot, int]:
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+        return after, peak
+
+    def allocations(self, before: tracemalloc.Snapshot,
+                    after: tracemalloc.Snapshot) -> Dict[str, int]:
+        """Bytes asignados (netos) durante la llamada, en total y por componente."""
+        start = _traced_bytes(before, self.component_files)
+        end = _traced_bytes(after, self.component_files)
+        return {name: end[name] - start[name] for name in end}
+
+    def _save(self, klass: str, profile: cProfile.Profile, before, after, peak: int,
+              elapsed_ms: float):
+        stats = pstats.Stats(profile)
+        stacks = collapsed_stacks(stats)
+        allocations = self.allocations(before, after)
+
+        with self._write:
+            self.samples += 1
+            os.makedirs(self.output_dir, exist_ok=True)
+            stem = os.path.join(self.output_dir, f"{klass}-{os.getpid()}-{self.samples}")
+            stats.dump_stats(stem + '.pstats')
+            with open(os.path.join(self.output_dir, f"{klass}.folded"), 'a', encoding='utf-8') as folded:
+                folded.writelines(f"{stack} {micros}\n" for stack, micros in stacks.items())
+            with open(os.path.join(self.output_dir, 'allocations.jsonl'), 'a', encoding='utf-8') as log:
+                log.write(json.dumps({
+                    'class': klass,
+                    'profile': os.path.basename(stem) + '.pstats',
+                    'elapsed_ms': round(elapsed_ms, 3),
+                    'peak_bytes': peak,
+                    'allocated_bytes': allocations
+                }) + '\n')
+
+
+def list_profiles(output_dir: str, klass: Optional[str] = None) -> List[str]:
+    """Rutas .pstats guardadas (de una clase o de todas), para pstats.Stats(*rutas)."""
+    if not os.path.isdir(output_dir):
+        return []
+    prefix = f"{klass}-" if klass else ''
+    return sorted(
+        os.path.join(output_dir, name) for name in os.listdir(output_dir)
+        if name.endswith('.pstats') and name.startswith(prefix)
+    )
@@ -0,0 +1,191 @@
+"""Corrección ortográfica de términos de síntomas con borrado simétrico (SymSpell)
+
+Cada término del vocabulario se indexa por todas las variantes que resultan
+de borrarle hasta `max_distance` caracteres. Para corregir un token basta
+generar sus propios borrados y buscarlos en el índice: el coste depende de
+la longitud del token y no del tamaño del vocabulario. Los candidatos se
+verifican con la distancia de Damerau-Levenshtein (alineación óptima).
+"""
+
+import os
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Iterable, Optional, Set
+
+from .text_folding import fold_text
+
+# Diccionario de frecuencias del español (palabras plegadas, escala Zipf)
+SPANISH_FREQUENCIES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'spanish_frequencies.txt')
+
+# Frecuencia mínima para considerar una palabra conocida (y no corregirla):
+# 2.5 es unas 3 apariciones por millón de palabras; deja fuera faltas
+# habituales como caveza (1.6) o cabesa (1.9)
+KNOWN_WORD_ZIPF = 2.5
+
+_WORD = re.compile(r'\w+')
+
+
+def medical_vocabulary(analyzer, classifier, predictor) -> Set[str]:
+    """Palabras de las palabras clave, los criterios de triaje y los síntomas de enfermedades."""
+    phrases = []
+    for data in analyzer.symptom_keywords.values():
+        phrases.extend(data['keywords'])
+    for table in (classifier.level_1_criteria, classifier.level_2_criteria):
+        for criteria in table.values():
+            phrases.extend(criteria)
+    phrases.extend(classifier.level_3_criteria)
+    phrases.extend(classifier.level_4_criteria)
+    for data in predictor.medical_knowledge.values():
+        phrases.extend(data['symptoms'])
+
+    return {word for phrase in phrases for word in _WORD.findall(fold_text(phrase))}
+
+
+@lru_cache(maxsize=4)
+def load_word_frequencies(path: str = SPANISH_FREQUENCIES) -> Dict[str, float]:
+    """Palabra -> frecuencia Zipf del diccionario (se lee una vez por proceso)."""
+    frequencies = {}
+    with open(path, 'r', encoding='utf-8') as source:
+        for line in source:
+            if line.startswith('#') or not line.strip():
+                continue
+            word, zipf = line.split('\t')
+            frequencies[word] = float(zipf)
+    return frequencies
+
+
+def spanish_words(min_zipf: float = KNOWN_WORD_ZIPF) -> frozenset:
+    """Palabras del diccionario de frecuencias con al menos `min_zipf`."""
+    return frozenset(word for word, zipf in load_word_frequencies().items() if zipf >= min_zipf)
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """Todas las variantes de `word` con hasta `max_distance` caracteres borrados."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            candidate[:i] + candidate[i + 1:]
+            for candidate in frontier if len(candidate) > 1
+            for i in range(len(candidate))
+        }
+        variants |= frontier
+    return variants
+
+
+def edit_distance(source: str, target: str, limit: int) -> int:
+    """Distancia de alineación óptima; devuelve limit + 1 si la supera."""
+    if abs(len(source) - len(target)) > limit:
+        return limit + 1
+
+    previous_previous = None
+    previous = list(range(len(target) + 1))
+    for i in range(1, len(source) + 1):
+        current = [i] + [0] * len(target)
+        row_minimum = i
+        for j in range(1, len(target) + 1):
+            cost = 0 if source[i - 1] == target[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and source[i - 1] == target[j - 2] and source[i - 2] == target[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_minimum = min(row_minimum, value)
+        if row_minimum > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+class SymSpellIndex:
+    """Índice de borrado simétrico sobre un vocabulario de términos médicos.
+
+    Solo se corrigen tokens desconocidos: las palabras del vocabulario y las
+    de `known_words` (por defecto, las del diccionario de frecuencias del
+    español) se dejan como están, porque una palabra bien escrita nunca debe
+    cambiar el triaje (martes no es mareo, ni comida es coma). Los tokens
+    cortos admiten menos errores: ninguno hasta 4 letras, uno hasta 7.
+    """
+
+    def __init__(self, vocabulary: Iterable[str], max_distance: int = 2,
+                 prefix_length: int = 7, known_words: Optional[Iterable[str]] = None,
+                 cache_size: int = 50000):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.terms = sorted({term for term in vocabulary if term})
+        self._term_set = frozenset(self.terms)
+        if known_words is None:
+            known_words = spanish_words()
+        self.known_words = frozenset(known_words) | self._term_set
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+        # Variante (sobre el prefijo) -> términos que la producen
+        self.deletes: Dict[str, List[str]] = {}
+        for term in self.terms:
+            for variant in _deletes(term[:prefix_length], max_distance):
+                self.deletes.setdefault(variant, []).append(term)
+
+    def allowed_distance(self, token: str) -> int:
+        if len(token) <= 4:
+            return 0
+        if len(token) <= 7:
+            return min(1, self.max_distance)
+        return self.max_distance
+
+    def lookup(self, token: str) -> Optional[str]:
+        """Término más cercano dentro de la distancia permitida, o None."""
+        cached = self.cache.get(token)
+        if cached is not None:
+            self.cache.move_to_end(token)
+            return cached or None
+
+        correction = self._lookup(token)
+        self.cache[token] = correction or ''
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return correction
+
+    def correct(self, token: str) -> str:
+        """Token corregido, o el mismo token si no hay corrección."""
+        return self.lookup(token) or token
+
+    def correct_text(self, text: str) -> str:
+        """Corrige cada palabra del texto conservando separadores y puntuación."""
+        return _WORD.sub(lambda match: self.correct(match.group()), text)
+
+    def _lookup(self, token: str) -> Optional[str]:
+        if token in self.known_words:
+            return token if token in self._term_set else None
+
+        limit = self.allowed_distance(token)
+        if limit == 0 or token.isdigit():
+            return None
+
+        best = None
+        best_key = None
+        seen = set()
+        for variant in _deletes(token[:self.prefix_length], limit):
+            for term in self.deletes.get(variant, ()):
+                if term in seen:
+                    continue
+                seen.add(term)
+                distance = edit_distance(token, term, limit)
+                if distance > limit:
+                    continue
+                # Menor distancia; a igualdad, el prefijo común más largo
+                key = (distance, -len(_common_prefix(token, term)), term)
+                if best_key is None or key < best_key:
+                    best, best_key = term, key
+        return best
+
+
+def _common_prefix(first: str, second: str) -> str:
+    length = 0
+    for a, b in zip(first, second):
+        if a != b:
+            break
+        length += 1
+    return first[:length]
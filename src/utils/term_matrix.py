@@ -0,0 +1,79 @@
+"""Matrices dispersas documento x término por búsqueda de subcadenas
+
+Las reglas del analizador y del clasificador buscan cada término como
+subcadena del texto plegado. Para un lote, en lugar de comprobar cada par
+(texto, término) en Python, los textos se unen en un único corpus separado
+por un carácter que ningún término contiene y cada término se busca con
+str.find (o con el patrón compilado) saltando al documento siguiente tras
+cada acierto. El trabajo en Python es proporcional a los aciertos, no a
+textos x términos.
+"""
+
+import re
+from bisect import bisect_right
+from typing import List, Sequence
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+# Ningún término ni patrón de las tablas contiene este carácter
+SEPARATOR = '\x00'
+
+
+class TermCorpus:
+    """Textos de un lote unidos en una sola cadena para buscar términos."""
+
+    def __init__(self, texts: Sequence[str]):
+        self.size = len(texts)
+        self.text = SEPARATOR.join(texts) + SEPARATOR
+        # starts[i]: inicio del documento i; starts[size]: fin del corpus
+        self.starts = [0]
+        for text in texts:
+            self.starts.append(self.starts[-1] + len(text) + 1)
+
+    def documents(self, term: str) -> List[int]:
+        """Documentos (en orden) que contienen el término como subcadena."""
+        if not term:
+            return list(range(self.size))
+        starts, find = self.starts, self.text.find
+        found = []
+        position = find(term)
+        while position >= 0:
+            document = bisect_right(starts, position) - 1
+            found.append(document)
+            position = find(term, starts[document + 1])
+        return found
+
+    def pattern_documents(self, pattern: re.Pattern) -> List[int]:
+        """Documentos con al menos una coincidencia del patrón."""
+        starts, search = self.starts, pattern.search
+        found = []
+        match = search(self.text)
+        while match is not None:
+            document = bisect_right(starts, match.start()) - 1
+            found.append(document)
+            match = search(self.text, starts[document + 1])
+        return found
+
+    def matrix(self, terms: Sequence[str]) -> csr_matrix:
+        """Presencia (documentos x términos) con un 1 donde el término aparece."""
+        # Un término repetido en varias columnas se busca una sola vez
+        found = {}
+        columns = []
+        for term in terms:
+            if term not in found:
+                found[term] = self.documents(term)
+            columns.append(found[term])
+        return self._to_matrix(columns)
+
+    def pattern_matrix(self, patterns: Sequence[re.Pattern]) -> csr_matrix:
+        """Presencia (documentos x patrones) de patrones compilados."""
+        return self._to_matrix([self.pattern_documents(pattern) for pattern in patterns])
+
+    def _to_matrix(self, columns: List[List[int]]) -> csr_matrix:
+        rows = np.fromiter((row for documents in columns for row in documents), dtype=np.int64)
+        cols = np.repeat(np.arange(len(columns)), [len(documents) for documents in columns])
+        values = np.ones(len(rows), dtype=np.int8)
+        matrix = csr_matrix((values, (rows, cols)), shape=(self.size, len(columns)))
+        matrix.sort_indices()
+        return matrix
@@ -0,0 +1,77 @@
+"""Plegado de acentos y minúsculas en una sola pasada de traducción
+
+Las tablas se precalculan al importar el módulo: para cada carácter latino,
+de puntuación o de ancho completo se guarda su descomposición NFKD sin
+marcas diacríticas y en minúsculas (Á -> a, ñ -> n, ﬁ -> fi, ＡＢ -> ab).
+El texto que cabe en Latin-1 (casi todo el español) se pliega con
+bytes.translate y una tabla de 256 bytes; el resto, con str.translate y la
+tabla completa. Ambos evitan normalize() más un recorrido en Python
+filtrando los caracteres combinantes.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List
+
+# Bloques que contienen caracteres con descomposición relevante para texto en español
+_FOLDED_RANGES = (
+    (0x0041, 0x005A),   # A-Z
+    (0x00A0, 0x024F),   # Latin-1, Latin Extended-A/B
+    (0x0300, 0x036F),   # Marcas combinantes (texto ya descompuesto)
+    (0x1E00, 0x1EFF),   # Latin Extended Additional
+    (0x2000, 0x206F),   # Puntuación general (espacios especiales, comillas, …)
+    (0xFB00, 0xFB06),   # Ligaduras latinas
+    (0xFF01, 0xFF5E),   # Formas de ancho completo
+)
+
+
+def _fold_char(char: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', char)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def _build_fold_table() -> Dict[int, str]:
+    table = {}
+    for start, end in _FOLDED_RANGES:
+        for code in range(start, end + 1):
+            char = chr(code)
+            folded = _fold_char(char)
+            if folded != char:
+                table[code] = folded
+    return table
+
+
+def _build_latin1_table():
+    """Tabla de bytes para Latin-1 y expresión con los caracteres que no caben en ella."""
+    table = bytearray(range(256))
+    expanding = []
+    for code in range(256):
+        folded = FOLD_TABLE.get(code, chr(code))
+        if len(folded) == 1 and ord(folded) < 256:
+            table[code] = ord(folded)
+        else:
+            # µ -> μ, ½ -> 1⁄2: requieren la tabla completa
+            expanding.append(chr(code))
+    return bytes(table), re.compile('[%s]' % re.escape(''.join(expanding)))
+
+
+FOLD_TABLE = _build_fold_table()
+_LATIN1_TABLE, _LATIN1_EXPANDING = _build_latin1_table()
+
+
+def fold_text(text: str) -> str:
+    """Texto en minúsculas y sin acentos (corazón -> corazon)."""
+    if text.isascii():
+        return text.lower()
+    try:
+        data = text.encode('latin-1')
+    except UnicodeEncodeError:
+        return text.translate(FOLD_TABLE)
+    if _LATIN1_EXPANDING.search(text):
+        return text.translate(FOLD_TABLE)
+    return data.translate(_LATIN1_TABLE).decode('latin-1')
+
+
+def fold_terms(terms: Iterable[str]) -> List[str]:
+    """Pliega una lista de términos de una tabla de reglas o palabras clave."""
+    return [fold_text(term) for term in terms]
@@ -62,14 +62,8 @@ def test_medical_triage_system():
         print(f"  Tiempo máximo: {triage_result['max_wait_time']}")
         print(f"  Recomendación: {triage_result['recommendation']}")
         
-        # Verificar si coincide con lo esperado
-        expected = case['expected_triage']
-        actual = triage_result['triage_level']
-        
-        if actual == expected:
-            print(f"\n✅ RESULTADO CORRECTO (Esperado: {expected}, Obtenido: {actual})")
-        else:
-            print(f"\n⚠️ RESULTADO DIFERENTE (Esperado: {expected}, Obtenido: {actual})")
+        # El nivel esperado se comprueba en tests/test_evaluation.py, sobre el corpus etiquetado
+        print(f"  Esperado: {case['expected_triage']}")
         
         print("\n" + "=" * 50 + "\n")
     
@@ -0,0 +1,69 @@
+"""Pruebas de la analítica columnar de decisiones"""
+
+import json
+import random
+
+from src.data.analytics import TriageAnalytics, daily_report, iter_chunks
+from src.data.audit_log import AuditLog
+
+DAY = 86400.0
+
+
+def _records(count, seed=32):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(count):
+        records.append({
+            'timestamp': 1.7e9 + rng.uniform(0, 3 * DAY),
+            'triage_level': rng.randint(1, 5),
+            'diseases': [{'disease': rng.choice(['Migrana', 'Neumonia', 'Asma Bronquial']), 'confidence': 0.4}]
+            if rng.random() < 0.8 else [],
+            'symptoms': [
+                {'symptom': rng.choice(['dolor', 'tos', 'pecho', 'mareo']),
+                 'category': rng.choice(['dolor', 'respiratorio', 'neurologico']),
+                 'severity': rng.choice(['leve', 'moderado', 'severo'])}
+                for _ in range(rng.randint(0, 4))
+            ],
+            'rules_version': 'test'
+        })
+    return records
+
+
+def test_agregados_coinciden_con_conteo_directo():
+    records = _records(2000)
+    analytics = TriageAnalytics()
+    for chunk in iter_chunks(records, 250):
+        analytics.update(chunk)
+    report = analytics.report(top_n=None)
+
+    assert report['decision_count'] == 2000
+    assert int(report['level_distribution'].to_numpy().sum()) == 2000
+    assert int(report['level_distribution'][1].sum()) == sum(r['triage_level'] == 1 for r in records)
+
+    symptom_counts = {}
+    for record in records:
+        for symptom in record['symptoms']:
+            symptom_counts[symptom['symptom']] = symptom_counts.get(symptom['symptom'], 0) + 1
+    assert report['top_symptoms'].to_dict() == symptom_counts
+
+    disease_counts = {}
+    for record in records:
+        if record['diseases']:
+            name = record['diseases'][0]['disease']
+            disease_counts[name] = disease_counts.get(name, 0) + 1
+    assert report['top_diseases'].to_dict() == disease_counts
+
+
+def test_lectura_por_bloques_desde_jsonl_y_auditoria(tmp_path):
+    records = _records(600)
+    jsonl = tmp_path / 'decisions.jsonl'
+    jsonl.write_text('\n'.join(json.dumps(r) for r in records), encoding='utf-8')
+    with AuditLog(str(tmp_path / 'audit')) as log:
+        for record in records:
+            log.record(record)
+
+    from_jsonl = daily_report(str(jsonl), chunk_size=100)
+    from_audit = daily_report(str(tmp_path / 'audit'), chunk_size=1000)
+
+    assert from_jsonl['level_distribution'].equals(from_audit['level_distribution'])
+    assert from_jsonl['level_1_rate'].between(0, 1).all()
@@ -0,0 +1,106 @@
+"""Pruebas del registro de auditoría segmentado"""
+
+import os
+import threading
+
+import pytest
+
+from src.data.audit_log import AuditLog, AuditLogError, replay, list_segments
+
+
+def test_registros_se_reproducen_en_orden(tmp_path):
+    with AuditLog(str(tmp_path), fsync_interval=0.01) as log:
+        for i in range(500):
+            log.record({'case': i, 'input': f'dolor {i}', 'triage_level': i % 5 + 1})
+        assert log.flush(timeout=5)
+
+    assert [record['case'] for record in replay(str(tmp_path))] == list(range(500))
+
+
+def test_rotacion_de_segmentos_y_reapertura(tmp_path):
+    with AuditLog(str(tmp_path), max_segment_bytes=2048) as log:
+        for i in range(200):
+            log.record({'case': i, 'input': 'dificultad para respirar ' * 3})
+
+    segments = list_segments(str(tmp_path))
+    assert len(segments) > 1
+
+    # Una nueva instancia continúa en un segmento nuevo
+    with AuditLog(str(tmp_path)) as log:
+        log.record({'case': 200})
+
+    assert len(list_segments(str(tmp_path))) >= len(segments) + 1
+    assert [record['case'] for record in replay(str(tmp_path))] == list(range(201))
+
+
+def test_cola_truncada_se_ignora(tmp_path):
+    with AuditLog(str(tmp_path)) as log:
+        log.record({'case': 0})
+        log.record({'case': 1})
+
+    last_segment = list_segments(str(tmp_path))[-1]
+    with open(last_segment, 'r+b') as segment:
+        segment.truncate(os.path.getsize(last_segment) - 3)
+
+    assert [record['case'] for record in replay(str(tmp_path))] == [0]
+
+
+def test_dos_escritores_no_comparten_segmento(tmp_path):
+    first = AuditLog(str(tmp_path))
+    second = AuditLog(str(tmp_path))
+    for i in range(100):
+        first.record({'writer': 1, 'case': i})
+        second.record({'writer': 2, 'case': i})
+    first.close()
+    second.close()
+
+    records = list(replay(str(tmp_path)))
+    assert len(list_segments(str(tmp_path))) == 2
+    for writer in (1, 2):
+        assert [r['case'] for r in records if r['writer'] == writer] == list(range(100))
+
+
+def test_fallo_de_escritura_se_notifica_y_se_reintenta(tmp_path):
+    log = AuditLog(str(tmp_path), fsync_interval=0.01, retry_interval=0.01)
+    failures = [OSError(28, 'No space left on device')] * 2
+    sync = log._sync
+
+    def failing_sync():
+        if failures:
+            raise failures.pop()
+        sync()
+
+    log._sync = failing_sync
+    log.record({'case': 0})
+    assert not log.flush(timeout=5)
+    assert log.error is not None and log.error.errno == 28
+    with pytest.raises(AuditLogError):
+        log.record({'case': 1})
+
+    # Se reintenta hasta recuperarse; lo no sincronizado se reescribe una sola vez
+    while not log.flush(timeout=5):
+        pass
+    assert log.error is None
+    log.record({'case': 2})
+    log.close()
+    assert [record['case'] for record in replay(str(tmp_path))] == [0, 2]
+
+
+def test_cola_acotada_si_el_disco_no_da_abasto(tmp_path):
+    log = AuditLog(str(tmp_path), max_pending=10, put_timeout=0.01)
+    disk = threading.Event()
+    sync = log._sync
+    log._sync = lambda: disk.wait() and sync()
+
+    log.record({'case': 0})
+    log.flush(timeout=0.05)  # el escritor queda bloqueado en el fsync
+    accepted = 1
+    with pytest.raises(AuditLogError):
+        for i in range(1, 100):
+            log.record({'case': i})
+            accepted += 1
+    assert accepted <= 12
+
+    disk.set()
+    log.close()
+    assert [record['case'] for record in replay(str(tmp_path))] == list(range(accepted))
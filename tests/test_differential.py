@@ -0,0 +1,64 @@
+"""Pruebas del arnés diferencial frente a la referencia congelada"""
+
+from src.chatbot import SymptomAnalyzer, DiseasePredictor, TriageClassifier
+from src.data.differential import (DifferentialHarness, ComplaintFuzzer, first_difference,
+                                   minimize, run_differential)
+
+
+def _harness():
+    return DifferentialHarness(SymptomAnalyzer(), DiseasePredictor(), TriageClassifier(), seed=7)
+
+
+def test_motores_actuales_equivalentes_a_la_referencia():
+    report = run_differential(600, workers=2, seed=3, block_size=150)
+    assert report['equivalent'], report['examples']
+    assert report['inputs'] == 600
+    assert all(speedup is not None for speedup in report['speedup_uncached'].values())
+    assert all(speedup is not None for speedup in report['speedup_cached'].values())
+
+
+def test_generador_reproducible():
+    analyzer, classifier = SymptomAnalyzer(), TriageClassifier()
+    first = ComplaintFuzzer(analyzer, classifier, seed=1)
+    second = ComplaintFuzzer(analyzer, classifier, seed=1)
+    assert [first.text(i) for i in range(50)] == [second.text(i) for i in range(50)]
+    assert [first.vital_signs(i) for i in range(50)] == [second.vital_signs(i) for i in range(50)]
+    assert first.text(0) != ComplaintFuzzer(analyzer, classifier, seed=2).text(0)
+
+
+def test_detecta_y_minimiza_una_regla_rota():
+    harness = _harness()
+    # Motor "optimizado" con una regla de nivel 4 perdida
+    harness.classifier._level_4_terms = tuple(t for t in harness.classifier._level_4_terms if t != 'tos')
+
+    text = 'mi hijo tiene tos, un poco de fiebre por la noche'
+    assert 'classify_level' in harness.compare(text)
+    assert harness.minimize('classify_level', text) == 'tos'
+
+
+def test_referencia_independiente_de_las_reglas_en_uso():
+    # La referencia lee la instantánea: una regla perdida en las tablas del motor se detecta
+    classifier = TriageClassifier()
+    classifier.level_4_criteria.remove('tos')
+    classifier._compile_level_rules()
+    harness = DifferentialHarness(SymptomAnalyzer(), DiseasePredictor(), classifier, seed=7)
+
+    assert 'tos' in harness.reference.level_4_criteria
+    assert 'classify_level' in harness.compare('tos')
+
+
+def test_tiempos_con_y_sin_cache_por_separado():
+    harness = _harness()
+    harness.compare('dolor de pecho y fiebre')
+    # [referencia, con caché, sin caché]: la segunda llamada acierta en la memoización
+    assert all(len(sides) == 3 and all(sides) for sides in
+               (harness.timings[check] for check in ('classify_triage', 'predict_diseases')))
+    assert harness.classifier.triage_cache.hits >= 1
+
+
+def test_diferencias_estructurales_y_flotantes():
+    assert first_difference({'a': [1, 2.0]}, {'a': (1, 2.0 + 1e-13)}) is None
+    assert first_difference({'a': [1, 2]}, {'a': [1, 3]}) == '$.a[1]: 2 != 3'
+    assert first_difference({'a': 1}, {'b': 1}).startswith('$ claves')
+    assert first_difference('3', 3).startswith('$: tipo')
+    assert minimize('uno dos tres cuatro', lambda text: 'tres' in text) == 'tres'
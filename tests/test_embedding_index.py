@@ -0,0 +1,54 @@
+"""Pruebas del índice denso de enfermedades"""
+
+import numpy as np
+import pytest
+
+from src.chatbot import DiseasePredictor
+from src.data.synthetic import generate_knowledge_base
+from src.models.embedding_index import DenseDiseaseIndex
+
+
+@pytest.fixture(scope='module')
+def large_predictor():
+    predictor = DiseasePredictor()
+    predictor.medical_knowledge = generate_knowledge_base(conditions=500, vocabulary=2000)
+    predictor._prepare_disease_vectors()
+    return predictor
+
+
+def test_busqueda_por_bloques_igual_a_fuerza_bruta(large_predictor):
+    index = DenseDiseaseIndex.build(large_predictor.disease_vectors, large_predictor.disease_names,
+                                    dimensions=32, block_size=64)
+    queries = large_predictor.vectorizer.transform(['termino1 termino7 termino30', 'termino999', 'nada'])
+
+    indices, scores = index.search(queries, 10)
+
+    expected = index.embed(queries) @ index.embeddings.T
+    for row in range(queries.shape[0]):
+        assert np.allclose(scores[row], np.sort(expected[row])[::-1][:10], atol=1e-6)
+        assert np.allclose(expected[row, indices[row]], scores[row], atol=1e-6)
+
+
+def test_guardar_y_cargar(tmp_path, large_predictor):
+    index = DenseDiseaseIndex.build(large_predictor.disease_vectors, large_predictor.disease_names, dimensions=16)
+    path = tmp_path / 'embeddings.npz'
+    index.save(path)
+    loaded = DenseDiseaseIndex.load(path)
+
+    assert loaded.embeddings.dtype == np.float32
+    assert np.allclose(np.linalg.norm(loaded.embeddings, axis=1), 1.0, atol=1e-5)
+    assert loaded.disease_names == index.disease_names
+    query = large_predictor.vectorizer.transform(['termino5 termino6'])
+    assert np.array_equal(loaded.search(query, 5)[0], index.search(query, 5)[0])
+
+
+def test_predictor_en_modo_denso():
+    exact = DiseasePredictor()
+    dense = DiseasePredictor(retrieval='dense', top_k=5)
+
+    predictions = dense.predict_diseases(['dolor', 'pecho', 'respirar', 'sudor'])
+    assert 0 < len(predictions) <= 5
+    assert predictions[0]['disease'] == exact.predict_diseases(['dolor', 'pecho', 'respirar', 'sudor'])[0]['disease']
+
+    with pytest.raises(ValueError):
+        DiseasePredictor(retrieval='aproximado')
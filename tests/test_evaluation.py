@@ -0,0 +1,98 @@
+"""Pruebas del arnés de evaluación sobre casos etiquetados"""
+
+import pytest
+
+from src.data import evaluation
+from src.data.evaluation import (load_cases, run_evaluation, build_report, save_outputs,
+                                 compare_outputs, check_thresholds, build_pipeline, TRIAGE_LEVELS)
+from src.utils.language import SUPPORTED_LANGUAGES
+
+# Línea base medida con build_pipeline() (es, en, pt habilitados): 17/65 casos con el
+# nivel etiquetado y 42 infratriados. Los 60 casos originales daban 17/60 (16/60 solo en
+# español) antes y después de la serie; caso-061 a caso-065 son quejas cortas que el
+# identificador confundía con portugués. Una regresión de cualquiera de las dos cifras
+# falla; si una mejora las supera, hay que ajustar estos umbrales
+BASELINE_ACCURACY = 17 / 65
+BASELINE_UNDER_TRIAGE = 42
+
+# Casos del corpus que no están en español; el resto debe detectarse como 'es'
+CASE_LANGUAGES = {'caso-053': 'en', 'caso-054': 'en', 'caso-055': 'pt', 'caso-056': 'pt'}
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    return build_pipeline()
+
+
+def test_corpus_no_empeora_la_linea_base(pipeline, monkeypatch):
+    monkeypatch.setattr(evaluation, '_pipeline', pipeline)
+    cases = load_cases()
+
+    report = build_report(cases, evaluation.evaluate_shard(cases))
+    assert check_thresholds(report, min_accuracy=BASELINE_ACCURACY,
+                            max_under_triage=BASELINE_UNDER_TRIAGE) == []
+
+
+def test_corpus_se_enruta_a_su_idioma(pipeline):
+    assert pipeline.analyzer.router.languages == SUPPORTED_LANGUAGES
+    misrouted = [case['id'] for case in load_cases()
+                 if pipeline.analyzer.router.detect(case['text']) != CASE_LANGUAGES.get(case['id'], 'es')]
+    assert misrouted == []
+
+
+def test_informe_en_paralelo_coincide_con_el_secuencial(tmp_path):
+    cases = load_cases()[:12]
+    parallel = run_evaluation(cases, workers=2)
+    sequential = run_evaluation(cases, workers=1, shards_per_worker=1)
+
+    assert [o['id'] for o in parallel] == [c['id'] for c in cases]
+    assert [(o['triage_level'], o['diseases']) for o in parallel] == \
+           [(o['triage_level'], o['diseases']) for o in sequential]
+
+    report = build_report(cases, parallel)
+    assert sum(map(sum, report['confusion_matrix'])) == len(cases)
+    assert len(report['confusion_matrix']) == len(TRIAGE_LEVELS)
+    assert report['triage_accuracy'] == pytest.approx(1 - len(report['mismatches']) / len(cases))
+    assert report['top_k_accuracy'][1] <= report['top_k_accuracy'][3] <= report['top_k_accuracy'][5]
+    assert report['latency_ms']['p50'] <= report['latency_ms']['p99']
+    assert report['warm_latency_ms']['p50'] <= report['warm_latency_ms']['p99']
+
+    path = str(tmp_path / 'salidas.jsonl')
+    save_outputs(path, parallel)
+    assert compare_outputs(path, sequential)['identical']
+
+    changed = [dict(o, triage_level=5) if o['id'] == cases[0]['id'] else o for o in parallel]
+    comparison = compare_outputs(path, changed)
+    assert not comparison['identical']
+    assert [entry['id'] for entry in comparison['triage_changed']] == [cases[0]['id']]
+
+
+def test_infratriaje_y_sobretriaje():
+    cases = [{'id': 'a', 'text': '', 'expected_triage': 1, 'expected_diseases': []},
+             {'id': 'b', 'text': '', 'expected_triage': 4, 'expected_diseases': ['resfriado_comun']}]
+    outputs = [{'id': 'a', 'triage_level': 3, 'diseases': [], 'latency_ms': 1.0},
+               {'id': 'b', 'triage_level': 2, 'diseases': ['Resfriado Comun'], 'latency_ms': 2.0}]
+
+    report = build_report(cases, outputs)
+    assert report['under_triage'] == 1 and report['over_triage'] == 1
+    assert report['top_k_accuracy'][1] == 1.0
+
+
+def test_umbrales_clinicos():
+    report = {'triage_accuracy': 0.5, 'under_triage': 3}
+    assert check_thresholds(report) == []
+    assert check_thresholds(report, min_accuracy=0.5, max_under_triage=3) == []
+    failures = check_thresholds(report, min_accuracy=0.6, max_under_triage=2)
+    assert len(failures) == 2 and failures[0].startswith('exactitud')
+
+
+def test_repeticiones_se_miden_en_frio(monkeypatch):
+    pipeline = build_pipeline()
+    monkeypatch.setattr(evaluation, '_pipeline', pipeline)
+    cases = load_cases()[:2] * 3
+
+    outputs = evaluation.evaluate_shard(cases)
+    assert all('warm_latency_ms' in output for output in outputs)
+    # Cada pasada en frío falla en la memoización y solo la segunda ejecución del caso acierta
+    assert pipeline.cache_stats()['triage']['misses'] == len(cases)
+    assert pipeline.cache_stats()['triage']['hits'] == len(cases)
@@ -0,0 +1,128 @@
+"""Pruebas del enrutado por idioma y los paquetes de vocabulario"""
+
+import re
+
+import pytest
+
+from src.chatbot import SymptomAnalyzer, TriageClassifier
+from src.utils.language import (LanguageRouter, load_language_pack, SUPPORTED_LANGUAGES,
+                                DEFAULT_LANGUAGE)
+from src.utils.text_folding import fold_text
+
+SAMPLES = {
+    'es': ["Mi abuelo tiene dolor en el pecho y le cuesta respirar",
+           "llevo dos días con diarrea y dolor de barriga"],
+    'en': ["My grandfather has chest pain and struggles to breathe",
+           "I have had diarrhea and a stomach ache for two days"],
+    'pt': ["Meu avô está com dor no peito e dificuldade para respirar",
+           "estou com diarreia e dor de barriga há dois dias"],
+}
+
+
+@pytest.fixture(scope='module')
+def router():
+    return LanguageRouter()
+
+
+@pytest.mark.parametrize('language', SUPPORTED_LANGUAGES)
+def test_identifica_el_idioma(router, language):
+    for text in SAMPLES[language]:
+        assert router.detect(text) == language
+
+
+def test_textos_cortos_van_al_idioma_por_defecto(router):
+    assert router.detect("help") == DEFAULT_LANGUAGE
+    assert router.detect("") == DEFAULT_LANGUAGE
+
+
+def test_solo_espanol_no_carga_nada():
+    load_language_pack.cache_clear()
+    router = LanguageRouter(('es',))
+
+    assert router.identifier is None
+    assert router.route(SAMPLES['en'][0]) == ('es', SAMPLES['en'][0])
+    assert load_language_pack.cache_info().currsize == 0
+
+
+def test_paquete_se_carga_al_primer_uso(router):
+    load_language_pack.cache_clear()
+    router.route(SAMPLES['pt'][0])
+    router.route(SAMPLES['pt'][1])
+
+    assert load_language_pack.cache_info().currsize == 1
+    assert load_language_pack.cache_info().misses == 1
+
+
+def test_vocabulario_canonico_existe_en_espanol():
+    analyzer = SymptomAnalyzer()
+    classifier = TriageClassifier()
+    words = set()
+    for data in analyzer.symptom_keywords.values():
+        words.update(data['keywords'])
+        for indicators in data['severity_indicators'].values():
+            words.update(w for phrase in indicators for w in phrase.split())
+    for table in (classifier.level_1_criteria, classifier.level_2_criteria):
+        for criteria in table.values():
+            words.update(w for phrase in criteria for w in phrase.split())
+    for criterion in classifier.level_3_criteria + classifier.level_4_criteria:
+        words.update(criterion.split())
+    for pattern in analyzer.urgency_patterns:
+        words.update(re.findall(r'[a-z]+', pattern.replace(r'\b', ' ')))
+
+    for language in ('en', 'pt'):
+        for canonical in load_language_pack(language).phrases.values():
+            missing = set(fold_text(canonical).split()) - words
+            assert not missing, (language, canonical)
+
+
+def test_analizador_multilingue():
+    analyzer = SymptomAnalyzer(languages=SUPPORTED_LANGUAGES)
+    classifier = TriageClassifier()
+
+    for text in ("I have severe chest pain and I can't breathe",
+                 "Tenho uma dor forte no peito e não consigo respirar"):
+        symptoms = analyzer.extract_symptoms(text)
+        assert {'dolor', 'pecho', 'respirar'} <= {s['symptom'] for s in symptoms}
+        assert classifier.classify_level(symptoms) == 1
+
+
+# Quejas en español que comparten muchos trigramas con el portugués
+SPANISH_COMPLAINTS = [
+    "dificultad para respirar",
+    "tengo mucha dificultad para respirar",
+    "vomito con sangre",
+    "ardor al orinar",
+    "perdida de conciencia",
+    "sangrado abundante que no para",
+    "dolor de pecho y dificultad para respirar",
+    "tos con sangre desde ayer",
+    "tengo convulsiones y fiebre alta",
+    "dolor abdominal muy fuerte",
+    "vision borrosa y dolor de cabeza",
+    "estoy mareada y vomitando",
+]
+
+
+@pytest.fixture(scope='module')
+def analyzers():
+    return SymptomAnalyzer(), SymptomAnalyzer(languages=SUPPORTED_LANGUAGES)
+
+
+@pytest.mark.parametrize('text', SPANISH_COMPLAINTS)
+def test_quejas_en_espanol_no_cambian_con_varios_idiomas(router, analyzers, text):
+    spanish, multilingual = analyzers
+    classifier = TriageClassifier()
+
+    assert router.detect(text) == 'es'
+    expected = spanish.extract_symptoms(text)
+    symptoms = multilingual.extract_symptoms(text)
+    assert [s['symptom'] for s in symptoms] == [s['symptom'] for s in expected]
+    assert classifier.classify_level(symptoms) == classifier.classify_level(expected)
+
+
+def test_traduccion_se_anade_al_texto_original(router):
+    language, routed = router.route(SAMPLES['pt'][0])
+
+    assert language == 'pt'
+    assert routed.startswith(SAMPLES['pt'][0])
+    assert 'respirar' in routed.split()
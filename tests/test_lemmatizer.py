@@ -0,0 +1,48 @@
+"""Pruebas de la lematización opcional del analizador de síntomas"""
+
+import pytest
+
+spacy = pytest.importorskip('spacy')
+if not spacy.util.is_package('es_core_news_sm'):
+    pytest.skip("Modelo es_core_news_sm no instalado", allow_module_level=True)
+
+from src.chatbot import SymptomAnalyzer
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return SymptomAnalyzer(lemmatize=True)
+
+
+def test_reconoce_formas_flexionadas(analyzer):
+    plain = SymptomAnalyzer()
+    text = "estoy mareada desde ayer"
+
+    assert 'mareado' not in [s['symptom'] for s in plain.extract_symptoms(text)]
+    assert 'mareado' in [s['symptom'] for s in analyzer.extract_symptoms(text)]
+
+
+def test_cache_evita_el_modelo(analyzer):
+    lemmatizer = analyzer.lemmatizer
+    lemmas = lemmatizer.lemmatize("me duelen las piernas")
+    misses = lemmatizer.misses
+
+    # Mismos tokens en otro orden: se resuelve desde la caché
+    cached = lemmatizer.lemmatize_batch(["me duelen las piernas", "las piernas me duelen"])
+    assert cached[0] == lemmas
+    assert sorted(cached[1]) == sorted(lemmas)
+    assert lemmatizer.misses == misses
+
+
+def test_verbo_de_un_sustantivo_clave(analyzer):
+    symptoms = [s['symptom'] for s in analyzer.extract_symptoms("estoy mareada y vomitando")]
+    assert 'mareado' in symptoms and 'vomito' in symptoms
+
+
+def test_lote_en_varios_procesos(analyzer):
+    # Textos con tokens nuevos: pasan por el modelo, repartido entre dos procesos
+    texts = ["mi abuela jadeaba anoche", "el niño sudaba y tosía", "", "me desmayé en la calle"]
+    misses = analyzer.lemmatizer.misses
+    batch = analyzer.extract_symptoms_batch(texts, n_process=2)
+    assert analyzer.lemmatizer.misses > misses
+    assert [batch.symptoms(i) for i in range(len(texts))] == [analyzer.extract_symptoms(t) for t in texts]
@@ -0,0 +1,46 @@
+"""Pruebas del generador de carga en lazo abierto"""
+
+import json
+import time
+
+from src.chatbot import SymptomAnalyzer, TriageClassifier
+from src.data.synthetic import generate_complaints
+from src.service.loadgen import load_complaints, poisson_schedule, run_open_loop
+
+
+def test_llegadas_poisson_con_la_tasa_pedida():
+    arrivals = poisson_schedule(200.0, 4000, seed=1)
+    assert arrivals == sorted(arrivals)
+    assert abs(len(arrivals) / arrivals[-1] - 200.0) < 10.0
+
+
+def test_quejas_grabadas_y_sinteticas(tmp_path):
+    path = tmp_path / 'quejas.jsonl'
+    records = [{'text': 'dolor de pecho'}, {'input': 'fiebre alta', 'symptoms': []},
+               {'body': 'tos seca'}, {'symptoms': ['sin texto']}]
+    path.write_text('\n'.join(json.dumps(r, ensure_ascii=False) for r in records), encoding='utf-8')
+    assert load_complaints(str(path)) == ['dolor de pecho', 'fiebre alta', 'tos seca']
+
+    complaints = generate_complaints(SymptomAnalyzer(), TriageClassifier(), 20, seed=3)
+    assert len(complaints) == 20
+    assert complaints == generate_complaints(SymptomAnalyzer(), TriageClassifier(), 20, seed=3)
+
+
+def test_sobrecarga_se_refleja_en_la_latencia_corregida():
+    # Un solo worker de 10 ms frente a 200 sol/s: la cola crece y solo la latencia corregida la ve
+    report = run_open_loop(lambda text: time.sleep(0.01), ['dolor'], qps=200.0,
+                           duration=0.5, concurrency=1)
+
+    assert report['completed'] == report['requests'] == 100
+    assert report['service_ms']['p99'] < 50
+    assert report['corrected_ms']['p99'] > 200
+    assert report['coordinated_omission']
+
+
+def test_errores_del_destino_se_cuentan():
+    def target(text):
+        raise ConnectionError()
+
+    report = run_open_loop(target, ['dolor'], qps=100.0, duration=0.1)
+    assert report['completed'] == 0
+    assert report['errors'] == {'ConnectionError': 10}
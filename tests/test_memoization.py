@@ -0,0 +1,72 @@
+"""Pruebas de la memoización por etapa de predicción y triaje"""
+
+import json
+import pickle
+
+import pytest
+
+from src.chatbot import DiseasePredictor, TriageClassifier
+from src.utils.memoization import MemoCache, freeze
+
+SYMPTOMS = [
+    {'symptom': 'dolor', 'category': 'dolor', 'severity': 'moderado'},
+    {'symptom': 'pecho', 'category': 'respiratorio', 'severity': 'moderado'},
+]
+
+
+def test_resultados_congelados_siguen_siendo_serializables():
+    frozen = freeze({'a': [1, {'b': 2}], 'c': 'x'})
+
+    with pytest.raises(TypeError):
+        frozen['a'] = 0
+    with pytest.raises(TypeError):
+        frozen['a'][1].update(b=3)
+    assert json.loads(json.dumps(frozen)) == {'a': [1, {'b': 2}], 'c': 'x'}
+    assert pickle.loads(pickle.dumps(frozen)) == frozen
+
+
+def test_cache_lru_acotada():
+    cache = MemoCache(maxsize=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert len(cache) == 2
+    assert cache.get('b') is not None and cache.stats()['misses'] == 1
+
+
+def test_prediccion_compartida_e_invalidada_al_reentrenar():
+    predictor = DiseasePredictor()
+    first = predictor.predict_diseases(['dolor', 'pecho', 'sudor'])
+    second = predictor.predict_diseases(['sudor', 'dolor', 'pecho'])
+
+    assert first is second
+    assert predictor.prediction_cache.stats()['hits'] == 1
+    with pytest.raises(TypeError):
+        first[0]['confidence'] = 1.0
+
+    predictor._prepare_disease_vectors()
+    assert len(predictor.prediction_cache) == 0
+
+
+def test_triaje_compartido_y_signos_vitales_no_lo_modifican():
+    classifier = TriageClassifier()
+    cached = classifier.classify_triage(SYMPTOMS)
+
+    assert classifier.classify_triage([dict(s) for s in SYMPTOMS]) is cached
+
+    with_vitals = classifier.classify_triage(SYMPTOMS, vital_signs={'respiratory_rate': 30})
+    assert with_vitals is not cached
+    assert 'vital_signs' not in cached
+
+
+def test_recompilar_reglas_invalida_la_cache():
+    classifier = TriageClassifier()
+    symptoms = [{'symptom': 'hipo', 'category': '', 'severity': 'leve'}]
+    assert classifier.classify_triage(symptoms)['triage_level'] == 5
+
+    classifier.level_4_criteria.append('hipo')
+    classifier._compile_level_rules()
+
+    assert classifier.classify_triage(symptoms)['triage_level'] == 4
@@ -0,0 +1,69 @@
+"""Pruebas del pipeline de triaje con presupuesto de latencia"""
+
+from src.chatbot import SymptomAnalyzer, DiseasePredictor, TriageClassifier, TriagePipeline
+
+CRITICAL_CASE = 'dolor de pecho severo, dificultad para respirar, sudoración, nausea'
+
+
+def _pipeline(**kwargs):
+    return TriagePipeline(SymptomAnalyzer(), DiseasePredictor(), TriageClassifier(), **kwargs)
+
+
+def test_sin_presupuesto_ejecuta_todas_las_etapas():
+    result = _pipeline().run(CRITICAL_CASE)
+
+    assert result['symptoms']
+    assert result['diseases']
+    assert result['advice']
+    assert result['pipeline']['degraded_stages'] == []
+
+
+def test_presupuesto_agotado_mantiene_etapas_obligatorias():
+    pipeline = _pipeline()
+    expected = pipeline.classifier.classify_triage(pipeline.analyzer.extract_symptoms(CRITICAL_CASE))
+
+    result = pipeline.run(CRITICAL_CASE, budget_ms=0)
+
+    assert result['triage']['triage_level'] == expected['triage_level']
+    assert result['diseases'] == []
+    assert result['sentiment'] is None
+    assert result['advice'] == result['triage']['recommendation']
+    degraded = {d['stage']: d['status'] for d in result['pipeline']['degraded_stages']}
+    assert degraded == {'diseases': 'skipped', 'sentiment': 'skipped', 'advice': 'truncated'}
+
+
+def test_nivel_1_omite_ranking_de_enfermedades():
+    result = _pipeline(skip_diseases_on_level_1=True).run(CRITICAL_CASE)
+
+    assert result['triage']['triage_level'] == 1
+    assert result['diseases'] == []
+    assert {'stage': 'diseases', 'status': 'skipped', 'reason': 'level_1'} in \
+        result['pipeline']['degraded_stages']
+
+
+def test_etapas_opcionales_configurables():
+    result = _pipeline(optional_stages=('diseases',)).run(CRITICAL_CASE)
+
+    assert 'sentiment' not in result
+    assert 'advice' not in result
+    assert result['diseases']
+
+
+def test_stream_entrega_triaje_antes_que_enfermedades():
+    stages = [stage for stage, _ in _pipeline().stream(CRITICAL_CASE)]
+
+    assert stages == ['symptoms', 'triage', 'diseases', 'advice', 'sentiment', 'pipeline']
+
+
+def test_astream_equivale_a_stream():
+    import asyncio
+
+    pipeline = _pipeline(optional_stages=('diseases',))
+
+    async def collect():
+        return [item async for item in pipeline.astream(CRITICAL_CASE)]
+
+    streamed = asyncio.run(collect())
+
+    assert [stage for stage, _ in streamed] == ['symptoms', 'triage', 'diseases', 'pipeline']
+    assert dict(streamed)['triage'] == pipeline.run(CRITICAL_CASE)['triage']
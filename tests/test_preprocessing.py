@@ -0,0 +1,56 @@
+"""Pruebas del análisis de complejidad en una sola pasada"""
+
+from src.utils.preprocessing import MedicalTextPreprocessor, MedicalTermMatcher
+from src.utils.text_folding import fold_text
+
+TEXTS = [
+    "Tengo fiebre de 39.5 grados. Me duele la cabeza!! ¿Es grave?",
+    "",
+    "   ",
+    "dolor… mucho",
+    "IAM previo, HTA y DM. Cefalea y vómitos",
+    "Paciente con " + "dolor abdominal intenso y " * 20 + "fiebre.",
+]
+
+
+def _substring_count(preprocessor, text):
+    """Criterio original: cada término del léxico buscado como subcadena."""
+    folded = fold_text(text)
+    terms = list(preprocessor.medical_abbreviations) + list(preprocessor.medical_synonyms)
+    return sum(1 for term in terms if term in folded)
+
+
+def test_conteos_en_una_pasada():
+    preprocessor = MedicalTextPreprocessor()
+    result = preprocessor.analyze_text_complexity(TEXTS[0])
+    assert result == {'complexity': 'low', 'word_count': 11, 'sentence_count': 3,
+                      'avg_words_per_sentence': 3.67, 'medical_terms_count': 1}
+    assert preprocessor.analyze_text_complexity('') == {'complexity': 'low', 'word_count': 0, 'sentence_count': 0}
+    assert preprocessor.analyze_text_complexity(TEXTS[3])['sentence_count'] == 2
+    assert preprocessor.analyze_text_complexity(TEXTS[5])['complexity'] == 'high'
+
+
+def test_lexico_precompilado_equivale_a_subcadenas():
+    preprocessor = MedicalTextPreprocessor()
+    for text in TEXTS + ["cefaleas y dolorosos", "hta-dm", "me duelen los huesos"]:
+        assert preprocessor._count_medical_terms(text) == _substring_count(preprocessor, text)
+
+    # Términos que son prefijo de otro y términos con espacios
+    matcher = MedicalTermMatcher(['dolor', 'doloroso', 'dolo', 'dolor de pecho'])
+    assert matcher.find('dolorosos') == {'dolo', 'dolor', 'doloroso'}
+    assert matcher.find('mucho dolor de pecho') == {'dolo', 'dolor', 'dolor de pecho'}
+
+    preprocessor.medical_synonyms['tos'] = 'tos'
+    preprocessor._compile_lexicon()
+    assert preprocessor._count_medical_terms("tos seca") == 1
+
+
+def test_lote_equivale_a_texto_a_texto():
+    preprocessor = MedicalTextPreprocessor()
+    assert preprocessor.analyze_text_complexity_batch(TEXTS) == [
+        preprocessor.analyze_text_complexity(text) for text in TEXTS
+    ]
+    assert preprocessor.analyze_text_complexity_batch(["a\x00b", "c"]) == [
+        preprocessor.analyze_text_complexity(text) for text in ["a\x00b", "c"]
+    ]
+    assert preprocessor.analyze_text_complexity_batch([]) == []
@@ -0,0 +1,75 @@
+"""Pruebas del perfilado por muestreo"""
+
+import json
+import pstats
+
+from src.chatbot import SymptomAnalyzer, DiseasePredictor, TriageClassifier
+from src.chatbot.pipeline import TriagePipeline
+from src.utils.profiling import RequestProfiler, list_profiles, PROFILE_SAMPLE_ENV, PROFILE_DIR_ENV
+
+
+def test_desactivado_por_defecto(tmp_path, monkeypatch):
+    monkeypatch.delenv(PROFILE_SAMPLE_ENV, raising=False)
+    profiler = RequestProfiler.from_env()
+    assert not profiler.enabled
+
+    monkeypatch.setenv(PROFILE_SAMPLE_ENV, '3')
+    monkeypatch.setenv(PROFILE_DIR_ENV, str(tmp_path))
+    profiler = RequestProfiler.from_env()
+    assert profiler.enabled
+    assert [profiler.should_sample() for _ in range(6)] == [False, False, True] * 2
+
+
+def test_llamada_muestreada_deja_perfil_pilas_y_asignaciones(tmp_path):
+    pipeline = TriagePipeline(SymptomAnalyzer(), DiseasePredictor(), TriageClassifier())
+    profiler = RequestProfiler(str(tmp_path), sample_every=1,
+                               components=(SymptomAnalyzer, DiseasePredictor, TriageClassifier))
+
+    result = profiler.call(pipeline.run, "tengo dolor de pecho y dificultad para respirar")
+    assert result['triage']['triage_level'] in (1, 2)
+
+    klass = f"nivel_{result['triage']['triage_level']}"
+    paths = list_profiles(str(tmp_path), klass)
+    assert len(paths) == 1
+    assert pstats.Stats(paths[0]).total_calls > 0
+
+    with open(tmp_path / f"{klass}.folded", encoding='utf-8') as folded:
+        lines = folded.read().splitlines()
+    assert lines and all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any('classify_triage' in line for line in lines)
+
+    with open(tmp_path / 'allocations.jsonl', encoding='utf-8') as log:
+        record = json.loads(log.readline())
+    assert record['class'] == klass
+    assert set(record['allocated_bytes']) == {'total', 'SymptomAnalyzer', 'DiseasePredictor', 'TriageClassifier'}
+    assert record['peak_bytes'] > 0
+
+
+def test_stream_perfila_todas_las_etapas(tmp_path):
+    pipeline = TriagePipeline(SymptomAnalyzer(), DiseasePredictor(), TriageClassifier())
+    profiler = RequestProfiler(str(tmp_path), sample_every=1, components=(SymptomAnalyzer,))
+
+    stages = list(profiler.stream(pipeline.stream, "tengo dolor de pecho y dificultad para respirar"))
+    assert [stage for stage, _ in stages] == [stage for stage, _ in pipeline.stream("tengo dolor de pecho y dificultad para respirar")]
+
+    klass = f"nivel_{dict(stages)['triage']['triage_level']}"
+    assert len(list_profiles(str(tmp_path), klass)) == 1
+    with open(tmp_path / f"{klass}.folded", encoding='utf-8') as folded:
+        text = folded.read()
+    assert 'classify_triage' in text and 'extract_symptoms' in text
+
+    # Un consumo abandonado libera la captura sin guardar perfil
+    partial = profiler.stream(pipeline.stream, "fiebre")
+    next(partial)
+    partial.close()
+    assert profiler.samples == 1 and profiler._capture.acquire(blocking=False)
+
+
+def test_senal_solo_desde_el_hilo_principal():
+    import threading
+    profiler = RequestProfiler()
+    installed = []
+    thread = threading.Thread(target=lambda: installed.append(profiler.install_signal_handler()))
+    thread.start()
+    thread.join()
+    assert installed == [False]
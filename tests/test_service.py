@@ -0,0 +1,108 @@
+"""Pruebas del servicio HTTP de triaje"""
+
+import gc
+import json
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.chatbot.tenants import TenantRegistry
+from src.service.prefork import PreforkServer, WorkerHTTPServer, build_pipeline
+
+
+def _serve(requests, tenants=False, pipeline=None):
+    listen_socket = socket.socket()
+    listen_socket.bind(('127.0.0.1', 0))
+    listen_socket.listen(8)
+    pipeline = pipeline or build_pipeline()
+    registry = TenantRegistry.from_directory(pipeline) if tenants else None
+    server = WorkerHTTPServer(listen_socket, pipeline, registry)
+
+    def handle():
+        for _ in range(requests):
+            server.handle_request()
+
+    thread = threading.Thread(target=handle, daemon=True)
+    thread.start()
+    return f"http://127.0.0.1:{listen_socket.getsockname()[1]}", thread, listen_socket
+
+
+def _post(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode('utf-8'))
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.read().decode('utf-8')
+
+
+def test_triage_y_stream_por_http():
+    base, thread, listen_socket = _serve(requests=2)
+    text = 'dolor de pecho severo, dificultad para respirar, sudoración'
+
+    result = json.loads(_post(base + '/triage', {'text': text}))
+    lines = [json.loads(line) for line in _post(base + '/triage/stream', {'text': text}).splitlines()]
+
+    thread.join(timeout=10)
+    listen_socket.close()
+    assert result['triage']['triage_level'] == 1
+    assert [line['stage'] for line in lines][:2] == ['symptoms', 'triage']
+    assert lines[1]['result']['triage_level'] == 1
+
+
+def test_hospital_por_solicitud():
+    base, thread, listen_socket = _serve(requests=3, tenants=True)
+    text = 'mi hijo tiene tos con silbido'
+
+    default = json.loads(_post(base + '/triage', {'text': text}))
+    pediatric = json.loads(_post(base + '/triage', {'text': text, 'tenant': 'hospital_pediatrico'}))
+    with pytest.raises(urllib.error.HTTPError) as error:
+        _post(base + '/triage', {'text': text, 'tenant': 'desconocido'})
+
+    thread.join(timeout=10)
+    listen_socket.close()
+    assert pediatric['triage']['triage_level'] < default['triage']['triage_level']
+    assert error.value.code == 400
+
+
+
+def _status(url, body: bytes):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=body), timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_solicitudes_invalidas_y_errores_internos():
+    invalid = [b'[1, 2]', b'{"text": 5}', b'{"text": "tos", "vital_signs": {"pulso": 80}}',
+               b'{"text": "tos", "vital_signs": {"spo2": "bajo"}}', b'{"text": "tos", "budget_ms": -1}',
+               b'no es json']
+    pipeline = build_pipeline()
+    base, thread, listen_socket = _serve(requests=len(invalid) + 2, pipeline=pipeline)
+    statuses = [_status(base + '/triage', body) for body in invalid]
+
+    # Un fallo del pipeline llega al cliente como 500, no como conexión cortada
+    def broken(*args, **kwargs):
+        raise TypeError('fallo')
+    pipeline.run = broken
+    status, body = _status(base + '/triage', b'{"text": "tos"}')
+    pipeline.stream = broken
+    stream = _post(base + '/triage/stream', {'text': 'tos'})
+
+    thread.join(timeout=10)
+    listen_socket.close()
+    assert [code for code, _ in statuses] == [400] * len(invalid)
+    assert all('error' in payload for _, payload in statuses)
+    assert status == 500 and body['error'] == 'Error interno: TypeError'
+    assert json.loads(stream)['stage'] == 'error'
+
+
+def test_el_padre_vuelve_a_recolectar_tras_congelar():
+    server = PreforkServer(port=0, workers=0, build_app=build_pipeline)
+    server.start()
+    try:
+        assert gc.isenabled()
+    finally:
+        server.close()
+        gc.unfreeze()
@@ -0,0 +1,137 @@
+"""Pruebas del almacén de sesiones en SQLite"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from src.data.session_store import SessionStore
+
+SYMPTOMS = [
+    {'symptom': 'dolor', 'category': 'dolor', 'severity': 'moderado', 'urgency_level': 2},
+    {'symptom': 'fiebre', 'category': 'general', 'severity': 'moderado', 'urgency_level': 2},
+]
+
+
+def test_lectura_de_lo_escrito_antes_de_confirmar(tmp_path):
+    # Intervalo largo: nada llega a la base durante la prueba salvo con flush()
+    with SessionStore(str(tmp_path / 'sessions.db'), flush_interval=60) as store:
+        assert store.get('s1')['patient'] == {}
+        store.update_patient('s1', name='Ana', age=34)
+        store.add_symptoms('s1', SYMPTOMS[:1])
+        store.record_result('s1', {'symptoms': [dict(SYMPTOMS[0], severity='severo'), SYMPTOMS[1]],
+                                   'triage': {'triage_level': np.int64(3)},
+                                   'diseases': [{'disease': 'Gripe', 'confidence': np.float32(0.5)}]})
+        assert store.pending_count() == 1
+
+        session = store.get('s1')
+        assert session['patient'] == {'name': 'Ana', 'age': 34}
+        assert [s['symptom'] for s in session['symptoms']] == ['dolor', 'fiebre']
+        assert session['symptoms'][0]['severity'] == 'severo'
+        assert session['last_result']['triage'] == {'triage_level': 3}
+
+        # Otro proceso (otra instancia) solo lo ve tras confirmar
+        other = SessionStore(str(tmp_path / 'sessions.db'), flush_interval=0)
+        assert other.get('s1')['last_result'] is None
+        assert store.flush() == 1 and store.pending_count() == 0
+        assert other.get('s1') == store.get('s1')
+        other.close()
+
+        store.delete('s1')
+        assert store.get('s1')['patient'] == {}
+
+
+def test_persistencia_tras_reinicio(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    with SessionStore(path) as store:
+        store.update_patient('s2', name='Luis')
+        store.set_result('s2', {'triage': {'triage_level': 2}})
+
+    with SessionStore(path) as store:
+        session = store.get('s2')
+        assert session['patient'] == {'name': 'Luis'}
+        assert session['last_result'] == {'triage': {'triage_level': 2}}
+
+
+def test_escrituras_concurrentes_se_agrupan_sin_perdidas(tmp_path):
+    with SessionStore(str(tmp_path / 'sessions.db'), flush_interval=0.01) as store:
+        def worker(thread):
+            for i in range(50):
+                store.add_symptoms('compartida', [{'symptom': f's{thread}-{i}'}])
+                store.update_patient(f'propia-{thread}', visits=i + 1)
+                assert store.get(f'propia-{thread}')['patient']['visits'] == i + 1
+
+        threads = [threading.Thread(target=worker, args=(t,)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        store.flush()
+
+        assert len(store.get('compartida')['symptoms']) == 200
+        assert store.commits < store.writes
+
+
+def test_dos_procesos_no_pierden_actualizaciones(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    first = SessionStore(path, flush_interval=60)
+    second = SessionStore(path, flush_interval=60)
+    first.update_patient('s3', name='Eva')
+    first.flush()
+
+    # Cada instancia parte de la misma fila y modifica campos distintos
+    assert second.get('s3')['patient'] == {'name': 'Eva'}
+    first.add_symptoms('s3', SYMPTOMS)
+    second.set_result('s3', {'triage': {'triage_level': 4}})
+    second.update_patient('s3', age=51)
+    first.flush()
+    second.flush()
+
+    with SessionStore(path, flush_interval=0) as store:
+        session = store.get('s3')
+        assert session['patient'] == {'name': 'Eva', 'age': 51}
+        assert [s['symptom'] for s in session['symptoms']] == ['dolor', 'fiebre']
+        assert session['last_result'] == {'triage': {'triage_level': 4}}
+    first.close()
+    second.close()
+
+
+def test_escritor_sobrevive_a_una_base_bloqueada(tmp_path, caplog):
+    path = str(tmp_path / 'sessions.db')
+    with SessionStore(path, flush_interval=0.01, busy_timeout=0.05, retry_interval=0.01) as store:
+        blocker = sqlite3.connect(path, isolation_level=None)
+        blocker.execute("BEGIN IMMEDIATE")
+        store.update_patient('s4', name='Rosa')
+        time.sleep(0.3)
+        assert store.pending_count() == 1
+        assert any('Fallo al confirmar' in record.getMessage() for record in caplog.records)
+
+        blocker.execute("ROLLBACK")
+        blocker.close()
+        deadline = time.time() + 5
+        while store.pending_count() and time.time() < deadline:
+            time.sleep(0.01)
+        assert store.pending_count() == 0 and store._writer.is_alive()
+
+    with SessionStore(path, flush_interval=0) as store:
+        assert store.get('s4')['patient'] == {'name': 'Rosa'}
+
+
+def test_sesiones_caducadas(tmp_path):
+    path = str(tmp_path / 'sessions.db')
+    with SessionStore(path, flush_interval=0, ttl=3600) as store:
+        store.update_patient('antigua', name='Pedro')
+        store.update_patient('reciente', name='Marta')
+        connection = sqlite3.connect(path)
+        with connection:
+            connection.execute("UPDATE sessions SET updated_at = ? WHERE session_id = 'antigua'",
+                               (time.time() - 7200,))
+        connection.close()
+
+        # Caducada: ya no se lee aunque siga en la base, y se borra al purgar
+        assert store.get('antigua')['patient'] == {}
+        assert store.purge_expired() == 1
+        assert store.get('reciente')['patient'] == {'name': 'Marta'}
+    assert os.stat(path).st_mode & 0o777 == 0o600
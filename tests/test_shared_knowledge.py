@@ -0,0 +1,64 @@
+"""Pruebas del índice de conocimiento compartido entre procesos"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from src.chatbot import DiseasePredictor
+from src.models.shared_knowledge import SharedKnowledgeBase, attach, save_memmap, load_memmap
+
+QUERIES = [
+    ['dolor', 'pecho', 'respirar', 'sudor'],
+    ['tos', 'silbido', 'aire'],
+    ['cabeza', 'vision', 'nausea'],
+    ['vomito', 'diarrea', 'estomago', 'fiebre'],
+    ['palabra_desconocida'],
+]
+
+
+def _assert_same_predictions(expected, actual):
+    assert [p['disease'] for p in actual] == [p['disease'] for p in expected]
+    assert np.allclose([p['confidence'] for p in actual], [p['confidence'] for p in expected])
+
+
+def _predict_in_child(descriptor, queue):
+    index = attach(descriptor)
+    predictor = DiseasePredictor(shared_index=index)
+    queue.put([[p['disease'] for p in predictor.predict_diseases(q)] for q in QUERIES])
+    index.close()
+
+
+def test_memoria_compartida_reproduce_predicciones():
+    reference = DiseasePredictor()
+    knowledge_base = SharedKnowledgeBase(reference)
+    try:
+        index = attach(knowledge_base.descriptor)
+        shared = DiseasePredictor(shared_index=index)
+
+        for query in QUERIES:
+            _assert_same_predictions(reference.predict_diseases(query), shared.predict_diseases(query))
+        with pytest.raises(ValueError):
+            index.idf[0] = 0.0
+
+        # Un proceso lanzado con 'spawn' adjunta el mismo bloque
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        child = context.Process(target=_predict_in_child, args=(knowledge_base.descriptor, queue))
+        child.start()
+        child_result = queue.get(timeout=60)
+        child.join(timeout=60)
+        assert child_result == [[p['disease'] for p in reference.predict_diseases(q)] for q in QUERIES]
+        index.close()
+    finally:
+        knowledge_base.unlink()
+
+
+def test_archivos_mapeados_reproducen_predicciones(tmp_path):
+    reference = DiseasePredictor()
+    save_memmap(reference, str(tmp_path))
+
+    shared = DiseasePredictor(shared_index=load_memmap(str(tmp_path)))
+
+    for query in QUERIES:
+        _assert_same_predictions(reference.predict_diseases(query), shared.predict_diseases(query))
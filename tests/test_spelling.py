@@ -0,0 +1,76 @@
+"""Pruebas de la corrección ortográfica por borrado simétrico"""
+
+import random
+
+import pytest
+
+from src.chatbot import SymptomAnalyzer, DiseasePredictor, TriageClassifier
+from src.utils.preprocessing import MedicalTextPreprocessor
+from src.utils.spelling import SymSpellIndex, medical_vocabulary, edit_distance
+
+
+@pytest.fixture(scope='module')
+def index():
+    analyzer = SymptomAnalyzer()
+    return SymSpellIndex(medical_vocabulary(analyzer, TriageClassifier(), DiseasePredictor()))
+
+
+@pytest.mark.parametrize('typo, expected', [
+    ('caveza', 'cabeza'),
+    ('respirrar', 'respirar'),
+    ('corason', 'corazon'),
+    ('fievre', 'fiebre'),
+    ('diarea', 'diarrea'),
+    ('palpitasiones', 'palpitaciones'),
+])
+def test_corrige_errores_frecuentes(index, typo, expected):
+    assert index.lookup(typo) == expected
+
+
+def test_no_corrige_palabras_comunes(index):
+    text = "he hecho mucho trabajo con la mano toda la semana"
+    assert index.correct_text(text) == text
+
+    # Palabras bien escritas cercanas a términos de triaje (mareo, coma, paro, pecho...)
+    words = "martes comida parado techo siempre mejor herida mordida hinchado"
+    assert index.correct_text(words) == words
+
+
+def test_la_correccion_no_cambia_el_triaje_de_texto_bien_escrito(index):
+    classifier = TriageClassifier()
+    plain, corrected = SymptomAnalyzer(), SymptomAnalyzer(spelling_index=index)
+    for text in ["tengo tos desde el martes", "me cai parado y me duele el techo de la boca",
+                 "despues de la comida tengo una herida hinchada"]:
+        assert corrected.extract_symptoms(text) == plain.extract_symptoms(text)
+        assert classifier.classify_level(corrected.extract_symptoms(text)) == \
+            classifier.classify_level(plain.extract_symptoms(text))
+
+
+def test_igual_que_busqueda_exhaustiva(index):
+    rng = random.Random(0)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    for _ in range(300):
+        term = list(rng.choice(index.terms))
+        for _ in range(rng.randint(1, 2)):
+            position = rng.randrange(len(term))
+            term[position] = rng.choice(letters)
+        token = ''.join(term)
+        if token in index.known_words:
+            continue
+
+        limit = index.allowed_distance(token)
+        expected = min((edit_distance(token, t, limit) for t in index.terms), default=limit + 1)
+        correction = index.lookup(token)
+        if expected > limit or limit == 0:
+            assert correction is None
+        else:
+            assert edit_distance(token, correction, limit) == expected
+
+
+def test_analizador_y_preprocesador_usan_el_indice(index):
+    analyzer = SymptomAnalyzer(spelling_index=index)
+    symptoms = [s['symptom'] for s in analyzer.extract_symptoms("me duele la caveza y el corason")]
+    assert 'cabeza' in symptoms and 'corazon' in symptoms
+
+    preprocessor = MedicalTextPreprocessor(spelling_index=index)
+    assert preprocessor.correct_medical_spelling("Fievre y diarea") == "fiebre y diarrea"
@@ -0,0 +1,53 @@
+"""Pruebas de la extracción por lotes con matrices dispersas"""
+
+import re
+
+from src.chatbot import SymptomAnalyzer, DiseasePredictor, TriageClassifier
+from src.data.differential import first_difference
+from src.utils.term_matrix import TermCorpus
+
+TEXTS = [
+    "Tengo un dolor de pecho insoportable y no puedo respirar",
+    "",
+    "   ",
+    "me duele la cabeza, un poco de mareo",
+    "nausea y vomito constante desde ayer, es urgente, hay sangre",
+    "CORAZÓN muy rápido, sudoración",
+    "quiero pedir una cita",
+]
+
+
+def test_corpus_busca_subcadenas_por_documento():
+    corpus = TermCorpus(["dolor doloroso", "", "tos", "gastos"])
+    assert corpus.documents('dolor') == [0]
+    assert corpus.documents('tos') == [2, 3]
+    assert corpus.documents('') == [0, 1, 2, 3]
+
+    matrix = corpus.matrix(['tos', 'dolor', 'tos'])
+    assert matrix.shape == (4, 3)
+    assert matrix.toarray().tolist() == [[0, 1, 0], [0, 0, 0], [1, 0, 1], [1, 0, 1]]
+    assert corpus.pattern_documents(re.compile(r'\btos\b')) == [2]
+
+
+def test_lote_equivale_a_extraccion_por_texto():
+    analyzer = SymptomAnalyzer()
+    batch = analyzer.extract_symptoms_batch(TEXTS)
+
+    assert len(batch) == len(TEXTS)
+    assert batch.to_lists() == [analyzer.extract_symptoms(text) for text in TEXTS]
+    assert batch.symptom_names(1) == []
+
+
+def test_lote_alimenta_triaje_y_prediccion_sin_diccionarios():
+    analyzer, predictor, classifier = SymptomAnalyzer(), DiseasePredictor(), TriageClassifier()
+    batch = analyzer.extract_symptoms_batch(TEXTS)
+    per_text = [analyzer.extract_symptoms(text) for text in TEXTS]
+
+    assert classifier.classify_levels(batch) == [classifier.classify_level(s) for s in per_text]
+    news_level = classifier.vital_signs_scorer.score({'spo2': 85})['triage_level']
+    assert classifier.classify_levels(batch, vital_signs={'spo2': [85] * len(TEXTS)})[-1] == news_level < 5
+
+    predictions = predictor.predict_diseases_batch(batch)
+    expected = [predictor.predict_diseases([s['symptom'] for s in symptoms]) for symptoms in per_text]
+    # Las predicciones memorizadas son tuplas de solo lectura; las del lote, listas
+    assert first_difference(expected, predictions) is None
@@ -0,0 +1,103 @@
+"""Pruebas de los paquetes de reglas y conocimiento por hospital"""
+
+import copy
+
+import pytest
+
+from src.chatbot import SymptomAnalyzer, DiseasePredictor, TriageClassifier, TriagePipeline
+from src.chatbot.tenants import TenantRegistry, DEFAULT_TENANT, apply_list_override
+from src.data.differential import ComplaintFuzzer, first_difference
+
+PACK = {
+    'triage': {
+        'level_2_criteria': {'respiratory': {'add': ['silbido']}, 'pediatria': ['jadeo']},
+        'level_3_criteria': {'add': ['diarrea'], 'remove': ['infección']},
+        'dangerous_combinations': {'add': [[['vomito'], ['diarrea']]]}
+    },
+    'knowledge': {
+        'bronquiolitis': {'symptoms': ['tos', 'silbido', 'respirar'], 'severity': 'alto',
+                          'description': 'Infección viral de las vías respiratorias pequeñas',
+                          'recommendations': ['Valorar saturación']},
+        'diabetes_descompensada': None
+    }
+}
+
+
+def _base():
+    return TriagePipeline(SymptomAnalyzer(), DiseasePredictor(), TriageClassifier())
+
+
+def test_operaciones_sobre_listas():
+    assert apply_list_override(['a', 'b'], None) == ['a', 'b']
+    assert apply_list_override(['a', 'b'], ['c']) == ['c']
+    assert apply_list_override(['a', 'b'], {'add': ['c', 'a'], 'remove': ['b']}) == ['a', 'c']
+
+
+def test_hospital_equivale_a_instancias_propias_con_los_cambios():
+    base = _base()
+    registry = TenantRegistry(base, {'pediatria': PACK})
+    tenant = registry.get('pediatria')
+
+    # Lo mismo configurado a mano en instancias independientes
+    classifier = TriageClassifier()
+    classifier.level_2_criteria['respiratory'].append('silbido')
+    classifier.level_2_criteria['pediatria'] = ['jadeo']
+    classifier.level_3_criteria = [c for c in classifier.level_3_criteria if c != 'infeccion'] + ['diarrea']
+    classifier.dangerous_combinations.append((['vomito'], ['diarrea']))
+    classifier._compile_level_rules()
+    predictor = DiseasePredictor()
+    predictor.medical_knowledge['bronquiolitis'] = copy.deepcopy(PACK['knowledge']['bronquiolitis'])
+    del predictor.medical_knowledge['diabetes_descompensada']
+    predictor._prepare_disease_vectors()
+
+    assert tenant.rules_version == classifier.rules_version != base.classifier.rules_version
+    fuzzer = ComplaintFuzzer(base.analyzer, base.classifier, seed=11)
+    texts = [fuzzer.text(i) for i in range(300)] + ['tos con silbido', 'vomito y diarrea']
+    for text in texts:
+        symptoms = base.analyzer.extract_symptoms(text)
+        names = [s['symptom'] for s in symptoms]
+        assert tenant.classifier.classify_triage(symptoms) == classifier.classify_triage(symptoms)
+        assert tenant.classifier.classify_level(symptoms) == classifier.classify_level(symptoms)
+        assert first_difference(predictor.predict_diseases(names), tenant.predictor.predict_diseases(names)) is None
+
+    assert tenant.pipeline.run('tos con silbido')['triage']['triage_level'] == 2
+    assert base.run('tos con silbido')['triage']['triage_level'] > 2
+
+
+def test_estructuras_compartidas_y_base_intacta():
+    base = _base()
+    base_rules = copy.deepcopy((base.classifier.level_2_criteria, base.classifier.level_3_criteria))
+    base_knowledge = copy.deepcopy(base.predictor.medical_knowledge)
+    priors_only = {'priors': {'gastroenteritis': 2.0}}
+    registry = TenantRegistry(base, {'a': PACK, 'b': priors_only, 'c': priors_only, 'd': PACK})
+
+    assert registry.get(None) is registry.get(DEFAULT_TENANT)
+    assert registry.get(None).pipeline is base
+    assert (base.classifier.level_2_criteria, base.classifier.level_3_criteria) == base_rules
+    assert base.predictor.medical_knowledge == base_knowledge
+
+    a, b, c, d = (registry.get(name) for name in 'abcd')
+    # Sin cambios en el texto indexado, la matriz TF-IDF es la de la base
+    assert b.predictor.disease_vectors is base.predictor.disease_vectors
+    assert a.predictor.disease_vectors is d.predictor.disease_vectors
+    assert registry.shared_stats()['disease_indexes'] == 2
+    assert b.classifier._level_1_terms is a.classifier._level_1_terms
+    assert a.classifier._level_3_terms is d.classifier._level_3_terms
+    assert b.predictor.medical_knowledge['migrana'] is base.predictor.medical_knowledge['migrana']
+
+    # El factor a priori solo cambia la confianza de su enfermedad
+    names = ['nausea', 'vomito', 'diarrea']
+    boosted = {p['disease']: p['confidence'] for p in b.predictor.predict_diseases(names)}
+    plain = {p['disease']: p['confidence'] for p in base.predictor.predict_diseases(names)}
+    assert boosted['Gastroenteritis'] == pytest.approx(min(plain['Gastroenteritis'] * 2.0, 1.0))
+    assert boosted['Intoxicacion Alimentaria'] == plain['Intoxicacion Alimentaria']
+
+    with pytest.raises(ValueError):
+        registry.get('desconocido')
+    with pytest.raises(ValueError):
+        TenantRegistry(base, {'x': {'priors': {'no_existe': 1.5}}})
+
+
+def test_paquetes_incluidos():
+    registry = TenantRegistry.from_directory(_base())
+    assert {'hospital_pediatrico', 'hospital_tropical'} <= set(registry.names())
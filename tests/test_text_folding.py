@@ -0,0 +1,39 @@
+"""Pruebas del plegado de acentos compartido entre etapas"""
+
+import unicodedata
+
+from src.chatbot import SymptomAnalyzer, TriageClassifier
+from src.utils.preprocessing import MedicalTextPreprocessor
+from src.utils.text_folding import fold_text
+
+
+def _reference(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def test_equivale_a_normalize_en_texto_latino():
+    text = ''.join(chr(code) for code in range(0x20, 0x250))
+    assert fold_text(text) == _reference(text)
+    assert fold_text("CORAZÓN, Náusea y DIFÍCIL") == "corazon, nausea y dificil"
+
+
+def test_entrada_con_acentos_coincide_con_las_tablas():
+    analyzer = SymptomAnalyzer()
+    symptoms = analyzer.extract_symptoms("Tengo náuseas y palpitación en el corazón, es muy difícil respirar")
+    names = {s['symptom'] for s in symptoms}
+
+    assert {'nausea', 'palpitacion', 'corazon', 'respirar'} <= names
+    assert next(s for s in symptoms if s['symptom'] == 'respirar')['severity'] == 'severo'
+
+
+def test_tablas_de_criterios_plegadas():
+    classifier = TriageClassifier()
+    assert 'cardiaco' in classifier.level_1_criteria['cardiovascular_critical']
+    assert 'migrana severa' in classifier.level_2_criteria['neurological']
+    assert classifier.classify_level([{'symptom': 'Cardíaco', 'severity': 'leve'}]) == 1
+
+
+def test_preprocesador_quita_acentos():
+    preprocessor = MedicalTextPreprocessor()
+    assert preprocessor.clean_text("¡Dolor en el CORAZÓN!") == "dolor en el corazon"
@@ -0,0 +1,27 @@
+"""Pruebas de la ruta rápida de nivel de triaje"""
+
+from src.chatbot import SymptomAnalyzer, TriageClassifier
+from src.data.synthetic import generate_symptom_sets
+
+
+def test_classify_level_coincide_con_classify_triage():
+    classifier = TriageClassifier()
+    corpus = generate_symptom_sets(SymptomAnalyzer(), classifier, count=20000, seed=28)
+
+    expected = [classifier.classify_triage(symptoms)['triage_level'] for symptoms in corpus]
+
+    assert classifier.classify_levels(corpus) == expected
+    # El corpus debe cubrir todos los niveles para que la comparación tenga sentido
+    assert set(expected) == {1, 2, 3, 4, 5}
+
+
+def test_explain_level_genera_razonamientos_bajo_demanda():
+    classifier = TriageClassifier()
+    symptoms = [
+        {'symptom': 'tos', 'category': 'respiratorio', 'severity': 'leve'},
+    ]
+
+    full = classifier.classify_triage(symptoms)
+
+    assert classifier.classify_level(symptoms) == full['triage_level']
+    assert classifier.explain_level(symptoms) == list(full['reasoning'])
@@ -0,0 +1,92 @@
+"""Pruebas de la cola de prioridad de la sala de espera"""
+
+import random
+
+import pytest
+
+from src.chatbot.triage_queue import TriageQueue
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_extrae_por_nivel_y_llegada():
+    queue = TriageQueue(clock=FakeClock())
+    queue.push('a', 3, arrival_time=1000)
+    queue.push('b', 2, arrival_time=1005)
+    queue.push('c', 3, arrival_time=990)
+    queue.push('d', 5, arrival_time=900)
+
+    assert [queue.pop().patient_id for _ in range(4)] == ['b', 'c', 'a', 'd']
+    with pytest.raises(IndexError):
+        queue.pop()
+
+
+def test_reprioritize_y_remove_mantienen_el_orden():
+    rng = random.Random(30)
+    queue = TriageQueue(clock=FakeClock())
+    expected = {}
+    for i in range(2000):
+        level, arrival = rng.randint(1, 5), rng.uniform(0, 1000)
+        queue.push(str(i), level, arrival_time=arrival)
+        expected[str(i)] = (level, arrival, i + 1)
+
+    for patient_id in rng.sample(sorted(expected), 500):
+        level = rng.randint(1, 5)
+        queue.reprioritize(patient_id, level)
+        expected[patient_id] = (level,) + expected[patient_id][1:]
+    for patient_id in rng.sample(sorted(expected), 300):
+        queue.remove(patient_id)
+        del expected[patient_id]
+
+    popped = [queue.pop().patient_id for _ in range(len(queue))]
+
+    assert popped == sorted(expected, key=expected.get)
+
+
+def test_detecta_esperas_vencidas_una_sola_vez():
+    clock = FakeClock(0.0)
+    queue = TriageQueue(clock=clock)
+    queue.push('urgente', 2, arrival_time=0.0)      # plazo: 10 min
+    queue.push('menor', 4, arrival_time=0.0)        # plazo: 60 min
+    queue.push('atendido', 3, arrival_time=0.0)     # plazo: 30 min
+    queue.remove('atendido')
+
+    assert queue.check_overdue(now=9 * 60) == []
+    assert [e.patient_id for e in queue.check_overdue(now=11 * 60)] == ['urgente']
+    assert queue.check_overdue(now=40 * 60) == []
+    assert [e.patient_id for e in queue.overdue()] == ['urgente']
+
+    # Una reevaluación a nivel 2 deja al paciente menor fuera de plazo
+    queue.reprioritize('menor', 2)
+    assert [e.patient_id for e in queue.check_overdue(now=41 * 60)] == ['menor']
+
+    queue.pop()
+    assert [e.patient_id for e in queue.overdue()] == ['menor']
+
+
+def test_pausa_mas_larga_que_la_rueda():
+    queue = TriageQueue(clock=FakeClock(0.0), wheel_slots=16)
+    queue.push('p', 5, arrival_time=0.0)
+
+    assert queue.check_overdue(now=60.0) == []
+    assert [e.patient_id for e in queue.check_overdue(now=3 * 3600)] == ['p']
+
+
+def test_reevaluar_a_un_paciente_ya_vencido():
+    queue = TriageQueue(clock=FakeClock(0.0))
+    queue.push('a', 2, arrival_time=0.0)
+    assert [e.patient_id for e in queue.check_overdue(now=7000)] == ['a']
+
+    # El personal lo reevalúa: el plazo del nuevo nivel ya ha pasado
+    queue.reprioritize('a', 1)
+    assert queue.overdue() == []
+    assert [e.patient_id for e in queue.check_overdue(now=7001)] == ['a']
+    queue.reprioritize('a', 5)
+    assert queue.check_overdue(now=7002) == []
+    assert queue.pop().patient_id == 'a'
@@ -0,0 +1,77 @@
+"""Pruebas de la puntuación NEWS2 y su integración con el triaje"""
+
+import numpy as np
+
+from src.chatbot import TriageClassifier
+from src.chatbot.vital_signs import VitalSignsScorer
+
+NORMAL = {'heart_rate': 80, 'respiratory_rate': 16, 'spo2': 98, 'temperature': 37.0,
+          'systolic_bp': 120, 'consciousness': 'A'}
+
+
+def test_limites_de_cada_parametro():
+    scorer = VitalSignsScorer()
+    batch = scorer.score_batch(
+        respiratory_rate=[8, 9, 11, 12, 20, 21, 24, 25],
+        temperature=[35.0, 35.1, 36.0, 36.1, 38.0, 38.1, 39.0, 39.1]
+    )
+
+    assert batch['components']['respiratory_rate'].tolist() == [3, 1, 1, 0, 0, 2, 2, 3]
+    assert batch['components']['temperature'].tolist() == [3, 1, 1, 0, 0, 1, 1, 2]
+
+
+def test_lectura_normal_no_escala():
+    news = VitalSignsScorer().score(NORMAL)
+
+    assert news['news2_score'] == 0
+    assert news['triage_level'] == 5
+
+
+def test_valores_ausentes_no_puntuan():
+    batch = VitalSignsScorer().score_batch(heart_rate=[None, np.nan, 135], consciousness=[None, 'A', 'V'])
+
+    assert batch['total'].tolist() == [0, 0, 6]
+    assert batch['red_flag'].tolist() == [False, False, True]
+
+
+def test_signos_vitales_escalan_el_triaje():
+    classifier = TriageClassifier()
+    symptoms = [{'symptom': 'tos', 'category': 'respiratorio', 'severity': 'leve'}]
+    deteriorating = dict(NORMAL, respiratory_rate=26, spo2=91, heart_rate=120)
+
+    assert classifier.classify_triage(symptoms, vital_signs=NORMAL)['triage_level'] == 4
+    result = classifier.classify_triage(symptoms, vital_signs=deteriorating)
+
+    assert result['triage_level'] == 1
+    assert result['vital_signs']['news2_score'] == 8
+    assert classifier.classify_level(symptoms, vital_signs=deteriorating) == 1
+
+
+def test_edad_sola_no_es_una_valoracion():
+    classifier = TriageClassifier()
+    symptoms = [{'symptom': 'tos', 'category': 'respiratorio', 'severity': 'leve'}]
+
+    result = classifier.classify_triage(symptoms, vital_signs={'age': 80, 'on_oxygen': False})
+    assert 'vital_signs' not in result
+    assert classifier.classify_triage(symptoms, vital_signs={'age': 80, 'spo2': 98})['vital_signs']['news2_score'] == 1
+
+
+def test_lote_coincide_con_lecturas_individuales():
+    scorer = VitalSignsScorer()
+    rng = np.random.default_rng(29)
+    columns = {
+        'heart_rate': rng.integers(30, 160, 500),
+        'respiratory_rate': rng.integers(5, 35, 500),
+        'spo2': rng.integers(85, 101, 500),
+        'temperature': rng.uniform(34.0, 41.0, 500).round(1),
+        'systolic_bp': rng.integers(70, 240, 500),
+        'age': rng.integers(0, 100, 500)
+    }
+
+    batch = scorer.score_batch(**columns)
+    singles = [
+        scorer.score({field: values[i].item() for field, values in columns.items()})['news2_score']
+        for i in range(500)
+    ]
+
+    assert batch['total'].tolist() == singles